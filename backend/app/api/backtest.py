@@ -1,25 +1,82 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from functools import partial
+import asyncio
+import json
+import os
+import pandas as pd
 from ..services.polygon_service import PolygonService
 from ..services.backtest_service import BacktestService
+from ..services.backtest_executor import BacktestExecutor, ExecutorBusyError, run_backtest_job, run_portfolio_job, run_profiled_backtest_job
+from ..services.bar_cache import BarCache
+from ..services.bulk_fetcher import FetchError
+from ..services.downsampling import lttb_indices
+from ..services.execution import normalize_execution
+from ..services.instrumentation import timed
+from ..services.portfolio import MAX_PORTFOLIO_SYMBOLS, align_closes
+from ..services.resampling import DEFAULT_INTERVAL, parse_interval
+from ..services.result_cache import bar_fingerprint
+from .formats import ARROW_MEDIA_TYPE, RAW_MEDIA_TYPE, encode_arrow, encode_raw, negotiate_media_type
+from ..services.job_service import JobService, TERMINAL_STATUSES
+from ..models.database import SessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-polygon_service = PolygonService()
+polygon_service = PolygonService(cache=BarCache())
 backtest_service = BacktestService()
+backtest_executor = BacktestExecutor()
+job_service = JobService(SessionLocal, backtest_executor, polygon_service)
+
+# Interval between status checks on the job event stream
+JOB_EVENT_POLL_SECONDS = 0.5
+# Share of the request timeout a portfolio's bar download may take at the Polygon rate
+# limit; the rest is left for the backtest itself
+PORTFOLIO_FETCH_TIMEOUT_FRACTION = 0.5
+
+class ExecutionSettings(BaseModel):
+    # Cost per unit of notional traded, in basis points
+    commission_bps: float = 0.0
+    slippage_bps: float = 0.0
+    # Fraction of equity per unit of signal, and the cap on gross exposure
+    position_size: float = 1.0
+    max_leverage: float = 1.0
+    allow_short: bool = True
+    # Exit a trade once it has lost / gained this fraction since entry
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
 
 class BacktestRequest(BaseModel):
     symbol: str
     strategy_name: str
     start_date: datetime
     end_date: datetime
+    # Bar size: 1d, or an intraday interval such as 1m, 5m, 15m or 1h
+    interval: str = DEFAULT_INTERVAL
     parameters: Dict[str, Any] = {}
+    # Simulate costs, sizing and stops instead of trading the raw signals for free
+    execution: Optional[ExecutionSettings] = None
+
+class ExtendedMetrics(BaseModel):
+    # Metrics beyond total return, Sharpe ratio and max drawdown
+    cagr: Optional[float] = None
+    volatility: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    calmar_ratio: Optional[float] = None
+    # Longest stretch below a previous equity peak, in bars
+    max_drawdown_duration: Optional[int] = None
+    win_rate: Optional[float] = None
+    # Annualized notional traded and share of bars holding a position
+    turnover: Optional[float] = None
+    exposure: Optional[float] = None
 
-class BacktestResponse(BaseModel):
+EXTENDED_METRICS = tuple(ExtendedMetrics.model_fields)
+
+class BacktestResponse(ExtendedMetrics):
     symbol: str
     strategy_name: str
     strategy_display_name: str
@@ -28,59 +85,571 @@ class BacktestResponse(BaseModel):
     max_drawdown: float
     signals: List[float]
     equity_curve: List[float]
+    # Bar positions of the returned points when the series were downsampled
+    index: Optional[List[int]] = None
+    # Set when the request had execution settings
+    trades: Optional[int] = None
+    costs: Optional[float] = None
+
+class SweepRequest(BaseModel):
+    symbol: str
+    strategy_name: str
+    start_date: datetime
+    end_date: datetime
+    # Bar size: 1d, or an intraday interval such as 1m, 5m, 15m or 1h
+    interval: str = DEFAULT_INTERVAL
+    parameter_grid: Dict[str, List[Any]]
+    n_samples: Optional[int] = None
+    seed: Optional[int] = None
+    rank_by: str = "sharpe_ratio"
+    include_signals: bool = False
+
+class SweepResult(ExtendedMetrics):
+    parameters: Dict[str, Any]
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+    signals: Optional[List[float]] = None
+    equity_curve: Optional[List[float]] = None
+
+class SweepError(BaseModel):
+    parameters: Dict[str, Any]
+    error: str
+
+class SweepResponse(BaseModel):
+    symbol: str
+    strategy_name: str
+    strategy_display_name: str
+    combinations: int
+    results: List[SweepResult]
+    errors: List[SweepError]
+
+class WalkForwardRequest(BaseModel):
+    symbol: str
+    strategy_name: str
+    start_date: datetime
+    end_date: datetime
+    # Bar size: 1d, or an intraday interval such as 1m, 5m, 15m or 1h
+    interval: str = DEFAULT_INTERVAL
+    parameter_grid: Dict[str, List[Any]]
+    method: str = "walk_forward"
+    # Bar counts for walk_forward windows
+    train_size: Optional[int] = None
+    test_size: Optional[int] = None
+    anchored: bool = False
+    # Fold count and purge width for purged_kfold
+    n_splits: int = 5
+    purge: int = 0
+    n_samples: Optional[int] = None
+    seed: Optional[int] = None
+    rank_by: str = "sharpe_ratio"
+
+class FoldMetrics(ExtendedMetrics):
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+
+class FoldResult(BaseModel):
+    fold: int
+    train_ranges: List[Tuple[datetime, datetime]]
+    test_start: datetime
+    test_end: datetime
+    parameters: Dict[str, Any]
+    train_metrics: FoldMetrics
+    test_metrics: FoldMetrics
+
+class WalkForwardResponse(ExtendedMetrics):
+    symbol: str
+    strategy_name: str
+    strategy_display_name: str
+    method: str
+    combinations: int
+    folds: List[FoldResult]
+    # Out-of-sample metrics and equity over the stitched test windows
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+    equity_curve: List[float]
+
+class PortfolioRequest(BaseModel):
+    symbols: List[str]
+    strategy_name: str
+    start_date: datetime
+    end_date: datetime
+    # Bar size: 1d, or an intraday interval such as 1m, 5m, 15m or 1h
+    interval: str = DEFAULT_INTERVAL
+    parameters: Dict[str, Any] = {}
+
+class SymbolMetrics(ExtendedMetrics):
+    symbol: str
+    bars: int
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+
+class PortfolioResponse(ExtendedMetrics):
+    strategy_name: str
+    strategy_display_name: str
+    symbols: List[SymbolMetrics]
+    # Requested symbols without any bars in the date range
+    missing_symbols: List[str]
+    # Symbols whose bars could not be downloaded or that the strategy rejected, with the reason
+    errors: Dict[str, str] = {}
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+    equity_curve: List[float]
+
+class JobResponse(BaseModel):
+    job_id: int
+    symbol: str
+    strategy_name: str
+    status: str
+    progress: float
+    deduplicated: bool = False
+    error: Optional[str] = None
+    result: Optional[BacktestResponse] = None
+
+def job_response(job: Dict[str, Any]) -> JobResponse:
+    """Build the API view of a stored job"""
+    result = None
+    if job["results"] is not None:
+        result = BacktestResponse(
+            symbol=job["symbol"],
+            strategy_name=job["strategy_name"],
+            total_return=job["total_return"],
+            sharpe_ratio=job["sharpe_ratio"],
+            max_drawdown=job["max_drawdown"],
+            **job["results"],
+        )
+    return JobResponse(
+        job_id=job["job_id"],
+        symbol=job["symbol"],
+        strategy_name=job["strategy_name"],
+        status=job["status"],
+        progress=job["progress"] or 0.0,
+        deduplicated=job.get("deduplicated", False),
+        error=job["error"],
+        result=result,
+    )
+
+def encode_backtest_response(request: BacktestRequest, results: Dict[str, Any], max_points: Optional[int], dtype: str, media_type: str):
+    """Downsample the series if asked to and serialize them in the negotiated format"""
+    signals, equity_curve = results["signals"], results["equity_curve"]
+    index = None
+    if max_points is not None and max_points < len(equity_curve):
+        index = lttb_indices(equity_curve, max_points)
+        signals, equity_curve = signals[index], equity_curve[index]
+
+    if media_type == ARROW_MEDIA_TYPE or media_type == RAW_MEDIA_TYPE:
+        columns = {} if index is None else {"index": index}
+        columns["signals"] = signals.astype(dtype)
+        columns["equity_curve"] = equity_curve.astype(dtype)
+        metadata = {
+            "symbol": request.symbol,
+            "strategy_name": request.strategy_name,
+            "strategy_display_name": results["strategy_display_name"],
+            "total_return": repr(results["total_return"]),
+            "sharpe_ratio": repr(results["sharpe_ratio"]),
+            "max_drawdown": repr(results["max_drawdown"]),
+        }
+        for key in EXTENDED_METRICS + ("trades", "costs"):
+            if key in results:
+                metadata[key] = repr(results[key])
+
+        if media_type == ARROW_MEDIA_TYPE:
+            try:
+                content = encode_arrow(columns, metadata)
+            except ImportError:
+                raise HTTPException(status_code=406, detail="Arrow responses need pyarrow installed on the server")
+            return Response(content=content, media_type=ARROW_MEDIA_TYPE)
+
+        content, layout = encode_raw(columns)
+        headers = {f"X-{key.replace('_', '-').title()}": value for key, value in metadata.items() if key != "strategy_display_name"}
+        headers["X-Columns"] = layout
+        headers["X-Length"] = str(len(signals))
+        return Response(content=content, media_type=RAW_MEDIA_TYPE, headers=headers)
 
-@router.post("/run", response_model=BacktestResponse)
-async def run_backtest(request: BacktestRequest):
+    return BacktestResponse(
+        symbol=request.symbol,
+        strategy_name=request.strategy_name,
+        strategy_display_name=results["strategy_display_name"],
+        total_return=results["total_return"],
+        sharpe_ratio=results["sharpe_ratio"],
+        max_drawdown=results["max_drawdown"],
+        signals=signals.tolist(),
+        equity_curve=equity_curve.tolist(),
+        index=None if index is None else index.tolist(),
+        trades=results.get("trades"),
+        costs=results.get("costs"),
+        **{name: results.get(name) for name in EXTENDED_METRICS},
+    )
+
+def execution_settings(request: BacktestRequest) -> Optional[Dict[str, Any]]:
+    """The request's validated execution settings, or None to trade the raw signals"""
+    if request.execution is None:
+        return None
+    return normalize_execution(request.execution.model_dump())
+
+async def fetch_bars(symbol: str, start_date: datetime, end_date: datetime, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+    """Load bars in a worker thread, raising 404 when there are none and 502 when they could not be downloaded"""
+    parse_interval(interval)
+    try:
+        data = await backtest_executor.run_io(polygon_service.get_stock_bars, symbol, start_date, end_date, interval)
+    except FetchError as e:
+        logger.error("Could not load bars: %s", e)
+        raise HTTPException(status_code=502, detail=str(e))
+
+    if data.empty:
+        logger.error("No data found for symbol %s between %s and %s", symbol, start_date, end_date)
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data found for symbol {symbol} between {start_date} and {end_date}"
+        )
+    return data
+
+def executor_error(e: Exception) -> HTTPException:
+    """Map executor admission and timeout failures to HTTP errors"""
+    if isinstance(e, ExecutorBusyError):
+        logger.warning("Rejecting backtest: %s", e)
+        return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    logger.error("Backtest timed out after %ss", backtest_executor.timeout)
+    return HTTPException(status_code=504, detail=f"Backtest did not finish within {backtest_executor.timeout:g} seconds")
+
+@router.post(
+    "/run",
+    response_model=BacktestResponse,
+    response_model_exclude_none=True,
+    responses={200: {"content": {ARROW_MEDIA_TYPE: {}, RAW_MEDIA_TYPE: {}}}},
+)
+async def run_backtest(
+    request: BacktestRequest,
+    max_points: Optional[int] = Query(None, ge=3, description="Downsample signals and equity curve to this many points (LTTB)"),
+    dtype: str = Query("float64", pattern="^float(32|64)$", description="Element type for Arrow and raw responses"),
+    accept: Optional[str] = Header(None),
+):
     """
-    Run a backtest for a given symbol and strategy
+    Run a backtest for a given symbol and strategy.
+
+    Responds with JSON by default. Send `Accept: application/vnd.apache.arrow.stream`
+    for an Arrow IPC stream, or `Accept: application/octet-stream` for the raw
+    little-endian column buffers described by the X-Columns header.
     """
     try:
-        logger.info(f"Starting backtest for {request.symbol} with strategy {request.strategy_name}")
+        logger.info("Starting backtest for %s with strategy %s", request.symbol, request.strategy_name)
         
         # Fetch historical data
-        data = polygon_service.get_stock_data(
-            request.symbol,
-            request.start_date,
-            request.end_date
-        )
-        
-        if not data:
-            logger.error(f"No data found for symbol {request.symbol} between {request.start_date} and {request.end_date}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"No data found for symbol {request.symbol} between {request.start_date} and {request.end_date}"
+        data = await fetch_bars(request.symbol, request.start_date, request.end_date, request.interval)
+
+        execution = execution_settings(request)
+
+        # Serve repeated backtests on unchanged bars from the result cache
+        result_cache = backtest_service.result_cache
+        # Hashed once here and handed to the worker, which keys its own cache with it
+        fingerprint = await backtest_executor.run_io(bar_fingerprint, data)
+        cache_key = result_cache.make_key(data, request.strategy_name, request.parameters, execution, fingerprint)
+        results = result_cache.get(cache_key)
+
+        if results is None:
+            # Run backtest
+            results = await backtest_executor.run_compute(
+                run_backtest_job,
+                data,
+                request.strategy_name,
+                request.parameters,
+                execution,
+                fingerprint,
             )
+            result_cache.put(cache_key, results)
+
+        with timed("serialize"):
+            return encode_backtest_response(request, results, max_points, dtype, negotiate_media_type(accept))
+
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during backtest")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def profiling_enabled() -> bool:
+    return os.getenv("BACKTEST_PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
 
-        # Run backtest
-        results = backtest_service.run_backtest(
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_backtest(
+    request: BacktestRequest,
+    interval_ms: float = Query(1.0, ge=0.1, le=100, description="Milliseconds between stack samples"),
+):
+    """
+    Run one backtest under a sampling profiler and return its folded stacks.
+
+    The body is one `frame;frame;... count` line per sampled stack, ready for
+    flamegraph.pl, speedscope or inferno. The backtest always runs, bypassing the result
+    cache. Only available when BACKTEST_PROFILING_ENABLED is set.
+    """
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled; set BACKTEST_PROFILING_ENABLED=1 to enable it")
+    if request.strategy_name not in backtest_service.strategies:
+        raise HTTPException(status_code=400, detail=f"Strategy {request.strategy_name} not found")
+    try:
+        data = await fetch_bars(request.symbol, request.start_date, request.end_date, request.interval)
+        profiled = await backtest_executor.run_compute(
+            run_profiled_backtest_job,
             data,
             request.strategy_name,
-            request.parameters
+            request.parameters,
+            execution_settings(request),
+            interval_ms / 1000,
         )
+        logger.info("Profiled backtest for %s with strategy %s: %d samples", request.symbol, request.strategy_name, profiled["samples"])
+        return PlainTextResponse(profiled["profile"], headers={"X-Profile-Samples": str(profiled["samples"])})
 
-        return BacktestResponse(
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during profiled backtest")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/sweep", response_model=SweepResponse, response_model_exclude_none=True)
+async def run_sweep(request: SweepRequest):
+    """
+    Backtest a strategy over a grid (or random sample) of parameters and rank the results
+    """
+    try:
+        logger.info("Starting sweep for %s with strategy %s", request.symbol, request.strategy_name)
+
+        data = await fetch_bars(request.symbol, request.start_date, request.end_date, request.interval)
+
+        # Only the coordination runs in this slot's thread; every backtest of the sweep,
+        # batched or not, runs in the sweep pool's worker processes
+        sweep = partial(
+            backtest_service.run_sweep,
+            data,
+            request.strategy_name,
+            request.parameter_grid,
+            n_samples=request.n_samples,
+            rank_by=request.rank_by,
+            include_signals=request.include_signals,
+            seed=request.seed,
+        )
+        results = await backtest_executor.run_compute(sweep, in_process=False)
+
+        return SweepResponse(
             symbol=request.symbol,
             strategy_name=request.strategy_name,
-            strategy_display_name=results["strategy_display_name"],
-            total_return=results["total_return"],
-            sharpe_ratio=results["sharpe_ratio"],
-            max_drawdown=results["max_drawdown"],
-            signals=results["signals"],
-            equity_curve=results["equity_curve"],
+            **results,
         )
 
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception("Unexpected error during backtest")
+        logger.exception("Unexpected error during sweep")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/walk-forward", response_model=WalkForwardResponse, response_model_exclude_none=True)
+async def run_walk_forward(request: WalkForwardRequest):
+    """
+    Optimize a strategy's parameters on rolling train windows (or purged k-fold splits)
+    and report how the chosen parameters did on the unseen test windows
+    """
+    try:
+        logger.info("Starting %s optimization for %s with strategy %s", request.method, request.symbol, request.strategy_name)
+
+        data = await fetch_bars(request.symbol, request.start_date, request.end_date, request.interval)
+
+        # Like sweeps, the optimization only coordinates here and computes in the sweep pool
+        optimization = partial(
+            backtest_service.run_walk_forward,
+            data,
+            request.strategy_name,
+            request.parameter_grid,
+            method=request.method,
+            train_size=request.train_size,
+            test_size=request.test_size,
+            anchored=request.anchored,
+            n_splits=request.n_splits,
+            purge=request.purge,
+            n_samples=request.n_samples,
+            rank_by=request.rank_by,
+            seed=request.seed,
+        )
+        results = await backtest_executor.run_compute(optimization, in_process=False)
+        results["equity_curve"] = results["equity_curve"].tolist()
+
+        return WalkForwardResponse(
+            symbol=request.symbol,
+            strategy_name=request.strategy_name,
+            **results,
+        )
+
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during walk-forward optimization")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/portfolio", response_model=PortfolioResponse, response_model_exclude_none=True)
+async def run_portfolio_backtest(request: PortfolioRequest):
+    """
+    Backtest a strategy on a list of symbols at once.
+
+    Bars are fetched concurrently and aligned into one (time x symbol) price matrix, the
+    strategy runs over every column in a single pass, and the response holds per-symbol
+    metrics plus the equal-weighted portfolio equity curve. Symbols whose download
+    failed are listed under `errors` and left out rather than treated as having no bars.
+    """
+    try:
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+        if not symbols:
+            raise ValueError("At least one symbol is required")
+        if len(symbols) > MAX_PORTFOLIO_SYMBOLS:
+            raise ValueError(f"Portfolio has {len(symbols)} symbols; the limit is {MAX_PORTFOLIO_SYMBOLS}")
+        if request.strategy_name not in backtest_service.strategies:
+            raise ValueError(f"Strategy {request.strategy_name} not found")
+
+        logger.info("Starting portfolio backtest for %s symbols with strategy %s", len(symbols), request.strategy_name)
+
+        parse_interval(request.interval)
+        fetched = await backtest_executor.run_io(
+            polygon_service.get_bulk_stock_bars, symbols, request.start_date, request.end_date, request.interval,
+            backtest_executor.timeout * PORTFOLIO_FETCH_TIMEOUT_FRACTION,
+        )
+        bars, errors = fetched["bars"], fetched["errors"]
+        missing_symbols = [symbol for symbol in symbols if symbol in bars and bars[symbol].empty]
+        if all(frame.empty for frame in bars.values()):
+            if errors:
+                raise HTTPException(status_code=502, detail=f"Failed to fetch bars: {errors}")
+            raise HTTPException(
+                status_code=404,
+                detail=f"No data found for any symbol between {request.start_date} and {request.end_date}"
+            )
+
+        with timed("frame"):
+            closes = await backtest_executor.run_io(align_closes, bars)
+        results = await backtest_executor.run_compute(
+            run_portfolio_job,
+            closes,
+            request.strategy_name,
+            request.parameters
+        )
+
+        with timed("serialize"):
+            return PortfolioResponse(
+                strategy_name=request.strategy_name,
+                strategy_display_name=results["strategy_display_name"],
+                symbols=results["symbols"],
+                missing_symbols=missing_symbols,
+                errors={**errors, **results["errors"]},
+                total_return=results["total_return"],
+                sharpe_ratio=results["sharpe_ratio"],
+                max_drawdown=results["max_drawdown"],
+                equity_curve=results["equity_curve"].tolist(),
+                **{name: results.get(name) for name in EXTENDED_METRICS},
+            )
+
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during portfolio backtest")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_backtest_job(request: BacktestRequest):
+    """
+    Queue a backtest in the background and return its job id.
+    An identical request returns the existing job instead of recomputing it.
+    """
+    if request.strategy_name not in backtest_service.strategies:
+        raise HTTPException(status_code=400, detail=f"Strategy {request.strategy_name} not found")
+    try:
+        execution = execution_settings(request)
+        parse_interval(request.interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = await job_service.submit(
+        request.symbol,
+        request.start_date,
+        request.end_date,
+        request.strategy_name,
+        request.parameters,
+        execution,
+        request.interval,
+    )
+    return job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_backtest_job(job_id: int):
+    """
+    Get the status, progress and (once completed) results of a backtest job
+    """
+    job = await asyncio.to_thread(job_service.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job_response(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_backtest_job(job_id: int):
+    """
+    Stream status and progress updates for a backtest job as server-sent events
+    """
+    job = await asyncio.to_thread(job_service.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+
+    async def events():
+        last = None
+        while True:
+            current = await asyncio.to_thread(job_service.get, job_id)
+            state = (current["status"], current["progress"])
+            if state != last:
+                last = state
+                payload = {"job_id": job_id, "status": current["status"], "progress": current["progress"], "error": current["error"]}
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+            if current["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/cache")
+async def get_result_cache_stats():
+    """
+    Get hit/miss counters and memory usage of the backtest result cache
+    """
+    return backtest_service.result_cache.stats()
+
 @router.get("/strategies")
 async def get_available_strategies():
     """
-    Get list of available strategies with their display names
+    Get list of available strategies with their display names, parameter schemas and warm-up lengths
     """
     return {
-        "strategies": backtest_service.get_all_strategies()
-    } 
+        "strategies": backtest_service.get_all_strategies(),
+        "schemas": backtest_service.get_strategy_schemas(),
+    }
+
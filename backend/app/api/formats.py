@@ -0,0 +1,65 @@
+import io
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+RAW_MEDIA_TYPE = "application/octet-stream"
+SUPPORTED_MEDIA_TYPES = (JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, RAW_MEDIA_TYPE)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick the response format from an Accept header.
+
+    The supported type with the highest q-value wins; JSON is used when the header is
+    missing, only has wildcards, or names nothing we can produce.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    candidates: List[Tuple[float, int, str]] = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.strip().lower() in SUPPORTED_MEDIA_TYPES and quality > 0:
+            candidates.append((-quality, position, media_type.strip().lower()))
+
+    return min(candidates)[2] if candidates else JSON_MEDIA_TYPE
+
+
+def encode_arrow(columns: Dict[str, np.ndarray], metadata: Dict[str, str]) -> bytes:
+    """Serialize equal-length columns as an Arrow IPC stream, with metadata on the schema"""
+    # pyarrow is optional: only clients asking for Arrow need it installed
+    import pyarrow as pa
+
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    table = table.replace_schema_metadata({key: str(value) for key, value in metadata.items()})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def encode_raw(columns: Dict[str, np.ndarray]) -> Tuple[bytes, str]:
+    """
+    Concatenate equal-length columns as raw little-endian buffers.
+
+    Returns the payload and a layout description for the X-Columns header, e.g.
+    "index:int64,signals:float32,equity_curve:float32", listing columns in buffer order.
+    """
+    buffers = []
+    layout = []
+    for name, values in columns.items():
+        little_endian = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        buffers.append(little_endian.tobytes())
+        layout.append(f"{name}:{values.dtype.name}")
+    return b"".join(buffers), ",".join(layout)
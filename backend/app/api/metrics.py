@@ -0,0 +1,49 @@
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.instrumentation import collecting, render_metrics, server_timing
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Stage timing histograms in the Prometheus text format
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header with the duration of every pipeline stage the request
+    went through, plus the total time until the response started.
+
+    Stages are collected through a context variable, so they are seen from worker
+    threads started with asyncio.to_thread and, via the executor, from process-pool jobs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with collecting() as timings:
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(timings, time.perf_counter() - start))
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,160 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from .backtest import backtest_executor, executor_error, fetch_bars, polygon_service
+from ..services.backtest_executor import ExecutorBusyError
+from ..services.resampling import DEFAULT_INTERVAL
+from ..services.volatility import REALIZED_ESTIMATORS
+from ..services.volatility_cache import VolatilityCache
+from ..services.volatility_surface import DEFAULT_MONEYNESS
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+volatility_cache = VolatilityCache()
+
+class RealizedVolatilityRequest(BaseModel):
+    symbol: str
+    start_date: datetime
+    end_date: datetime
+    # Bar size: 1d, or an intraday interval such as 1m, 5m, 15m or 1h
+    interval: str = DEFAULT_INTERVAL
+    # Rolling windows in bars, all estimated in one pass
+    windows: List[int] = [21]
+    estimators: List[str] = list(REALIZED_ESTIMATORS)
+    include_series: bool = True
+
+class RealizedVolatilityResponse(BaseModel):
+    symbol: str
+    interval: str
+    periods_per_year: float
+    # Annualized volatility at the last bar, by estimator and window
+    latest: Dict[str, Dict[str, Optional[float]]]
+    timestamps: Optional[List[datetime]] = None
+    series: Optional[Dict[str, Dict[str, List[Optional[float]]]]] = None
+
+class SurfaceResponse(BaseModel):
+    symbol: str
+    as_of: datetime
+    spot: float
+    contracts: int
+    # Contracts whose quote gave an implied volatility
+    solved: int
+    expirations: List[str]
+    # Years to each expiration
+    times: List[float]
+    # Log-moneyness ln(strike / forward) of each column
+    moneyness: List[float]
+    # Implied volatility by expiration (rows) and moneyness (columns)
+    volatilities: List[List[float]]
+
+def json_floats(values: np.ndarray) -> List[Optional[float]]:
+    """Floats for a JSON body, with NaN as null"""
+    values = np.asarray(values, dtype=np.float64)
+    return [value if np.isfinite(value) else None for value in values.tolist()]
+
+def realized_estimates(
+    symbol: str, interval: str, data: pd.DataFrame, windows: List[int], estimators: List[str], include_series: bool
+) -> Dict[str, Any]:
+    """Latest estimates (and series) from a snapshot of the cached running sums"""
+    state = volatility_cache.realized(symbol, interval, data)
+    latest, series = {}, {}
+    for estimator in estimators:
+        latest[estimator] = dict(zip(map(str, windows), json_floats(state.latest(windows, estimator))))
+        if include_series:
+            estimates = state.estimate(windows, estimator)
+            series[estimator] = {str(window): json_floats(estimates[:, column]) for column, window in enumerate(windows)}
+    return {"periods_per_year": state.periods_per_year, "latest": latest, "series": series}
+
+@router.post("/realized", response_model=RealizedVolatilityResponse, response_model_exclude_none=True)
+async def get_realized_volatility(request: RealizedVolatilityRequest):
+    """
+    Rolling close-to-close, Parkinson, Garman-Klass and Yang-Zhang volatility of a symbol's bars
+    """
+    try:
+        unknown = [name for name in request.estimators if name not in REALIZED_ESTIMATORS]
+        if unknown:
+            raise ValueError(f"Unknown volatility estimators {unknown}; choose from {', '.join(REALIZED_ESTIMATORS)}")
+
+        data = await fetch_bars(request.symbol, request.start_date, request.end_date, request.interval)
+        # Estimating is CPU work on state cached in this process: a compute slot, in a thread
+        results = await backtest_executor.run_compute(
+            realized_estimates, request.symbol, request.interval, data, request.windows, request.estimators, request.include_series,
+            in_process=False,
+        )
+
+        return RealizedVolatilityResponse(
+            symbol=request.symbol,
+            interval=request.interval,
+            periods_per_year=results["periods_per_year"],
+            latest=results["latest"],
+            timestamps=data.index.to_pydatetime().tolist() if request.include_series else None,
+            series=results["series"] if request.include_series else None,
+        )
+
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error estimating realized volatility")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/surface/{symbol}", response_model=SurfaceResponse)
+async def get_volatility_surface(
+    symbol: str,
+    rate: float = Query(0.0, description="Continuously compounded risk-free rate"),
+    dividend: float = Query(0.0, description="Continuous dividend yield"),
+    spot: Optional[float] = Query(None, gt=0, description="Underlying price, when the option snapshot does not carry one"),
+    moneyness: Optional[List[float]] = Query(None, description="Log-moneyness grid ln(strike / forward)"),
+):
+    """
+    Implied-volatility surface of a symbol's option chain over moneyness and expiry
+    """
+    try:
+        chain, quoted_spot = await backtest_executor.run_io(polygon_service.get_option_snapshot, symbol)
+        if len(chain) == 0:
+            raise HTTPException(status_code=404, detail=f"No options found for symbol {symbol}")
+        spot = spot or quoted_spot
+        if not spot:
+            raise HTTPException(status_code=404, detail=f"No underlying price for {symbol}; pass spot")
+
+        # Quote time to the minute, so repeated requests within a minute share a surface
+        as_of = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        surface, implied = await backtest_executor.run_compute(
+            volatility_cache.surface, symbol, chain, spot, as_of, rate, dividend, moneyness or DEFAULT_MONEYNESS,
+            in_process=False,
+        )
+
+        return SurfaceResponse(
+            symbol=symbol,
+            as_of=as_of,
+            contracts=len(chain),
+            solved=int(np.isfinite(implied).sum()),
+            **surface.to_dict(),
+        )
+
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, TimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error building volatility surface")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache")
+async def get_volatility_cache_stats():
+    """
+    Get entry counts and hit/update/miss counters of the volatility cache
+    """
+    return volatility_cache.stats()
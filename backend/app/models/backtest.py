@@ -16,4 +16,13 @@ class BacktestResult(Base):
     max_drawdown = Column(Float)
     parameters = Column(JSON)
     results = Column(JSON)
-    created_at = Column(DateTime) 
\ No newline at end of file
+    created_at = Column(DateTime)
+    # Background job bookkeeping
+    request_hash = Column(String, index=True)
+    status = Column(String, index=True)
+    progress = Column(Float)
+    error = Column(String)
+    completed_at = Column(DateTime)
+    # Process running the job ("<host>:<pid>") and when it last confirmed it still is
+    owner = Column(String)
+    heartbeat_at = Column(DateTime)
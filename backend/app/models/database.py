@@ -0,0 +1,56 @@
+import os
+from typing import List
+import logging
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from .backtest import Base
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./volatilitylab.db")
+
+engine = create_engine(
+    DATABASE_URL,
+    # SQLite connections are shared between the event loop and worker threads
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def init_db() -> None:
+    """Create any missing tables and add the columns existing ones lack"""
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+
+
+def add_missing_columns(bind: Engine) -> List[str]:
+    """
+    Add model columns missing from existing tables, with their indexes.
+
+    `create_all` never alters a table, so a database created before a model gained a
+    column would fail on the first query that selects it. Columns are added nullable,
+    which is how every column added to the models so far is declared. Returns the
+    "table.column" names added.
+    """
+    inspector = inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    added = []
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+                added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+    if added:
+        logger.info("Added database columns: %s", ", ".join(added))
+    return added
@@ -0,0 +1,359 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import urllib3
+
+from .rate_limiter import DEFAULT_BACKOFF_SECONDS, TokenBucket, request_json
+
+logger = logging.getLogger(__name__)
+
+ALPACA_PAPER_URL = "https://paper-api.alpaca.markets"
+DEFAULT_MAX_CONCURRENCY = 8
+# Alpaca allows 200 trading API requests per minute per account
+DEFAULT_REQUESTS_PER_SECOND = 3.0
+DEFAULT_MAX_RETRIES = 3
+# Alpaca rejects a client_order_id that an existing order already has with this status
+DUPLICATE_ORDER_STATUS = 422
+
+# Order book events kept for syncs to re-apply on top of a listing that predates them
+RECENT_UPDATES_MAX = 1000
+
+ORDER_FIELDS = ("symbol", "qty", "notional", "side", "type", "time_in_force", "limit_price", "stop_price", "client_order_id")
+# Statuses of orders that can still fill, i.e. what `status=open` lists
+OPEN_ORDER_STATUSES = (
+    "new", "accepted", "pending_new", "accepted_for_bidding", "partially_filled",
+    "pending_cancel", "pending_replace", "held", "calculated",
+)
+
+
+class OrderError(Exception):
+    """A trading API request that failed for good"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class AlpacaOrderClient:
+    """
+    Alpaca trading API calls over one pooled session, for submitting many orders at once.
+
+    Requests share a urllib3 connection pool and a token-bucket rate limiter. 429s, 5xx
+    responses and connection errors are retried with exponential backoff (honoring
+    Retry-After). Every order carries a client_order_id, so retrying a submission whose
+    response was lost, or submitting a whole batch again, never places an order twice:
+    Alpaca rejects the duplicate id and the existing order is returned instead.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = ALPACA_PAPER_URL,
+        max_concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            base_url: API root, overridable for tests
+            max_concurrency: Requests in flight at once (default: ALPACA_MAX_CONCURRENCY or 8)
+            requests_per_second: Sustained request rate (default: ALPACA_REQUESTS_PER_SECOND or 3; 0 disables)
+            max_retries: Retries per request after the first attempt
+            backoff_seconds: Delay before the first retry
+            timeout: Connect and read timeout per request in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency or int(os.getenv("ALPACA_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        if requests_per_second is None:
+            requests_per_second = float(os.getenv("ALPACA_REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND))
+        self.rate_limiter = TokenBucket(requests_per_second, capacity=max(1.0, min(requests_per_second, self.max_concurrency)))
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.http = urllib3.PoolManager(
+            maxsize=self.max_concurrency,
+            block=True,
+            headers={"APCA-API-KEY-ID": api_key, "APCA-API-SECRET-KEY": api_secret, "Content-Type": "application/json"},
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=False,
+        )
+
+    def submit_orders(self, orders: Sequence[Dict[str, Any]], batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Submit many orders concurrently.
+
+        Args:
+            orders: Order requests with `symbol`, `side`, `qty` (or `notional`) and optionally
+                `type` (default market), `time_in_force` (default day), `limit_price`,
+                `stop_price` and `client_order_id`
+            batch_id: Orders without a client_order_id get "<batch_id>-<index>", so submitting
+                the same batch again is a no-op; an id already used by a different order is
+                reported as an error (default: a random id)
+
+        Returns:
+            Dict with `batch_id`, `orders` holding Alpaca's order for each request that was
+            accepted (or already existed), in request order, and `errors` listing each
+            rejected request's `index`, `client_order_id`, `symbol` and `error`.
+        """
+        batch_id = batch_id or uuid.uuid4().hex[:16]
+        requests = [_order_request(order, f"{batch_id}-{index}") for index, order in enumerate(orders)]
+        if not requests:
+            return {"batch_id": batch_id, "orders": [], "errors": []}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as pool:
+            outcomes = list(pool.map(self._submit_or_error, requests))
+
+        accepted, errors = [], []
+        for index, (request, outcome) in enumerate(zip(requests, outcomes)):
+            if isinstance(outcome, OrderError):
+                errors.append({"index": index, "client_order_id": request["client_order_id"], "symbol": request["symbol"], "error": str(outcome)})
+            else:
+                accepted.append(outcome)
+        logger.info("Order batch %s: %s accepted, %s rejected", batch_id, len(accepted), len(errors))
+        return {"batch_id": batch_id, "orders": accepted, "errors": errors}
+
+    def submit_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit one order request (see `submit_orders`), idempotently by its client_order_id; raises OrderError"""
+        request = _order_request(order, uuid.uuid4().hex)
+        try:
+            return self._request("POST", "/v2/orders", body=request)
+        except OrderError as e:
+            if e.status != DUPLICATE_ORDER_STATUS:
+                raise
+            # Placed by an earlier attempt whose response was lost, or an earlier batch
+            existing = self.get_order_by_client_order_id(request["client_order_id"])
+            if existing is None:
+                raise
+            if not _same_order(request, existing):
+                raise OrderError(f"client_order_id {request['client_order_id']} reused for a different order", e.status)
+            logger.info("Order %s already exists, not submitting it again", request["client_order_id"])
+            return existing
+
+    def get_order_by_client_order_id(self, client_order_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("GET", "/v2/orders:by_client_order_id", fields={"client_order_id": client_order_id})
+        except OrderError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def list_open_orders(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/v2/orders", fields={"status": "open", "limit": 500})
+
+    def list_positions(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/v2/positions")
+
+    def _submit_or_error(self, request: Dict[str, Any]) -> Any:
+        try:
+            return self.submit_order(request)
+        except OrderError as e:
+            logger.error("Error submitting %s order %s for %s: %s", request["side"], request["client_order_id"], request["symbol"], e)
+            return e
+
+    def _request(self, method: str, path: str, fields: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None) -> Any:
+        payload = json.dumps(body).encode() if body is not None else None
+        return request_json(
+            self.http, self.rate_limiter, method, f"{self.base_url}{path}", OrderError,
+            self.max_retries, self.backoff_seconds, fields=fields, body=payload,
+        )
+
+
+class OrderBook:
+    """
+    Local copy of the account's positions and open orders.
+
+    `sync` replaces it with freshly listed state and reports what changed; between
+    syncs `apply_trade_update` applies trade-update stream events as they arrive, so
+    readers are served without a round trip. Positions and orders are kept in the
+    formats AlpacaService.get_positions and get_open_orders return.
+
+    Listing takes a while, so events that arrive while a sync is listing are numbered
+    and kept: `sync(..., since=listing_started())` re-applies those newer than the
+    listing on top of it rather than letting the listing overwrite them.
+    """
+
+    def __init__(self):
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._synced_at: Optional[float] = None
+        # (sequence number, update) of the latest events, for syncs to replay
+        self._recent: "deque[Tuple[int, Dict[str, Any]]]" = deque(maxlen=RECENT_UPDATES_MAX)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def age(self) -> float:
+        """Seconds since the last full sync (infinite before the first one or after `invalidate`)"""
+        with self._lock:
+            return float("inf") if self._synced_at is None else time.monotonic() - self._synced_at
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._synced_at = None
+
+    def positions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(position) for position in self._positions.values()]
+
+    def open_orders(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(order) for order in self._orders.values()]
+
+    def listing_started(self) -> int:
+        """Sequence number to pass to `sync` as `since`, taken before listing"""
+        with self._lock:
+            return self._sequence
+
+    def sync(self, positions: List[Dict[str, Any]], orders: List[Dict[str, Any]], since: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Replace the book with listed positions and open orders (Alpaca's JSON), plus the
+        events applied after `since` (see `listing_started`), which the listing may predate.
+
+        Returns the symbols of positions that changed or were closed, and the ids of
+        orders opened or closed (filled, canceled, ...) since the book last saw them; a
+        non-empty diff while the trade-updates stream is running means it missed events.
+        """
+        fresh_positions = {position["symbol"]: _position_summary(position) for position in positions}
+        fresh_orders = {order["id"]: _open_order_summary(order) for order in orders}
+        with self._lock:
+            if since is not None:
+                for sequence, update in self._recent:
+                    if sequence > since:
+                        _apply_update(fresh_positions, fresh_orders, update)
+            diff = {
+                "positions_changed": [symbol for symbol, position in fresh_positions.items() if self._positions.get(symbol) != position],
+                "positions_closed": [symbol for symbol in self._positions if symbol not in fresh_positions],
+                "orders_opened": [order_id for order_id in fresh_orders if order_id not in self._orders],
+                "orders_closed": [order_id for order_id in self._orders if order_id not in fresh_orders],
+            }
+            self._positions, self._orders = fresh_positions, fresh_orders
+            self._synced_at = time.monotonic()
+        return diff
+
+    def record_order(self, order: Dict[str, Any]) -> None:
+        """Add or update an order from a submission response or trade update (Alpaca's JSON)"""
+        self.apply_trade_update({"order": order})
+
+    def apply_trade_update(self, update: Dict[str, Any]) -> None:
+        """
+        Apply one `trade_updates` stream event: the order's new state, and on fills the
+        position's new quantity (`position_qty`) and, when it grew, its average entry price.
+        """
+        with self._lock:
+            self._sequence += 1
+            self._recent.append((self._sequence, update))
+            _apply_update(self._positions, self._orders, update)
+
+
+def _apply_update(positions: Dict[str, Dict[str, Any]], orders: Dict[str, Dict[str, Any]], update: Dict[str, Any]) -> None:
+    """
+    Apply a trade update to position and order maps. Updates carry absolute state (the
+    order's status, the position's quantity), so applying one twice changes nothing.
+    """
+    order = update.get("order") or {}
+    if "id" in order:
+        if order.get("status") in OPEN_ORDER_STATUSES:
+            orders[order["id"]] = _open_order_summary(order)
+        else:
+            orders.pop(order["id"], None)
+    if update.get("event") not in ("fill", "partial_fill") or update.get("position_qty") is None:
+        return
+
+    symbol = order["symbol"]
+    price = float(update.get("price") or order.get("filled_avg_price") or 0.0)
+    quantity = float(update["position_qty"])
+    previous = positions.get(symbol)
+    if quantity == 0:
+        positions.pop(symbol, None)
+        return
+    entry = price
+    if previous is not None and previous["qty"] * quantity > 0:
+        # Reducing a position keeps its entry price; adding to it averages the fill in
+        grown = abs(quantity) - abs(previous["qty"])
+        entry = previous["avg_entry_price"]
+        if grown > 0:
+            entry = (abs(previous["qty"]) * entry + grown * price) / abs(quantity)
+    positions[symbol] = {
+        "symbol": symbol,
+        "qty": quantity,
+        "avg_entry_price": entry,
+        "current_price": price,
+        "market_value": quantity * price,
+        "unrealized_pl": (price - entry) * quantity,
+    }
+
+
+def _order_request(order: Dict[str, Any], default_client_order_id: str) -> Dict[str, Any]:
+    missing = [name for name in ("symbol", "side") if not order.get(name)]
+    if order.get("qty") is None and order.get("notional") is None:
+        missing.append("qty")
+    if missing:
+        raise ValueError(f"Order for {order.get('symbol', '?')} is missing {', '.join(missing)}")
+    unknown = set(order) - set(ORDER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown order fields: {', '.join(sorted(unknown))}")
+
+    request = {"type": "market", "time_in_force": "day", **{name: value for name, value in order.items() if value is not None}}
+    request.setdefault("client_order_id", default_client_order_id)
+    # Alpaca takes quantities and prices as decimal strings
+    for name in ("qty", "notional", "limit_price", "stop_price"):
+        if name in request:
+            request[name] = str(request[name])
+    return request
+
+
+def _same_order(request: Dict[str, Any], order: Dict[str, Any]) -> bool:
+    """Whether an existing order is the one `request` asks for, as far as the request specifies it"""
+    if (order.get("symbol"), order.get("side")) != (request["symbol"], request["side"]):
+        return False
+    if (order.get("type") or order.get("order_type")) != request["type"]:
+        return False
+    for name in ("qty", "notional", "limit_price", "stop_price"):
+        requested, existing = request.get(name), order.get(name)
+        if requested is None and existing is None:
+            continue
+        if requested is None or existing is None or float(requested) != float(existing):
+            return False
+    return True
+
+
+def _position_summary(position: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": position["symbol"],
+        "qty": float(position["qty"]),
+        "avg_entry_price": float(position["avg_entry_price"]),
+        "current_price": float(position["current_price"]),
+        "market_value": float(position["market_value"]),
+        "unrealized_pl": float(position["unrealized_pl"]),
+    }
+
+
+def _open_order_summary(order: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "order_id": order["id"],
+        "symbol": order["symbol"],
+        "qty": None if order.get("qty") is None else float(order["qty"]),
+        "side": order["side"],
+        "type": order.get("type") or order.get("order_type"),
+        "status": order["status"],
+        "submitted_at": order.get("submitted_at"),
+    }
+
+
+def order_summary(order: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields AlpacaService's order submission methods return"""
+    return {
+        "order_id": order["id"],
+        "client_order_id": order["client_order_id"],
+        "symbol": order["symbol"],
+        "status": order["status"],
+        "created_at": order.get("created_at"),
+    }
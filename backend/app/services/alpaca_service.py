@@ -1,21 +1,34 @@
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 import alpaca_trade_api as tradeapi
 from alpaca_trade_api.rest import REST
 import os
-from datetime import datetime
+import threading
 import logging
 from dotenv import load_dotenv
 
+from .alpaca_orders import ALPACA_PAPER_URL, AlpacaOrderClient, OrderBook, order_summary
+from .option_chain import occ_symbols
+
 load_dotenv(override=True)
 
+# Positions and open orders older than this are listed again before being served
+DEFAULT_BOOK_MAX_AGE_SECONDS = 5.0
+
 class AlpacaService:
-    def __init__(self):
+    def __init__(self, order_client: Optional[AlpacaOrderClient] = None):
         """
         Initialize AlpacaService with API credentials from environment variables
+
+        Args:
+            order_client: Pooled client for batch orders and the order book; built from
+                the same credentials when omitted
         """
         self.api_key = os.getenv('ALPACA_API_KEY')
         self.api_secret = os.getenv('ALPACA_SECRET_KEY')
-        self.base_url = os.getenv('ALPACA_BASE_URL', 'https://paper-api.alpaca.markets')  # Use paper trading by default
+        self.base_url = os.getenv('ALPACA_BASE_URL', ALPACA_PAPER_URL)  # Use paper trading by default
+        # Trade updates come from <stream url>/stream; the same host as the API unless set
+        self.stream_url = os.getenv('ALPACA_STREAM_URL', self.base_url)
+        self.book_max_age = float(os.getenv('ALPACA_BOOK_MAX_AGE_SECONDS', DEFAULT_BOOK_MAX_AGE_SECONDS))
         
         if not all([self.api_key, self.api_secret]):
             raise ValueError("Alpaca API credentials not found in environment variables")
@@ -26,6 +39,10 @@ class AlpacaService:
             self.base_url,
             api_version='v2'
         )
+        self.orders = order_client or AlpacaOrderClient(self.api_key, self.api_secret, self.base_url)
+        self.book = OrderBook()
+        self._stream = None
+        self._stop_sync: Optional[threading.Event] = None
         
         # Set up logging
         logging.basicConfig(level=logging.INFO)
@@ -44,7 +61,7 @@ class AlpacaService:
                 'day_trade_count': account.daytrade_count
             }
         except Exception as e:
-            self.logger.error(f"Error getting account info: {str(e)}")
+            self.logger.error("Error getting account info: %s", e)
             raise
 
     def get_position(self, symbol: str) -> Optional[Dict]:
@@ -64,7 +81,7 @@ class AlpacaService:
         except Exception as e:
             if 'position does not exist' in str(e).lower():
                 return None
-            self.logger.error(f"Error getting position for {symbol}: {str(e)}")
+            self.logger.error("Error getting position for %s: %s", symbol, e)
             raise
 
     def submit_stock_order(
@@ -99,6 +116,7 @@ class AlpacaService:
                 limit_price=limit_price,
                 stop_price=stop_price
             )
+            self.book.invalidate()
             
             return {
                 'order_id': order.id,
@@ -108,7 +126,7 @@ class AlpacaService:
                 'created_at': order.created_at
             }
         except Exception as e:
-            self.logger.error(f"Error submitting {side} order for {symbol}: {str(e)}")
+            self.logger.error("Error submitting %s order for %s: %s", side, symbol, e)
             raise
 
     def submit_option_order(
@@ -138,9 +156,7 @@ class AlpacaService:
             limit_price: Limit price for limit orders
         """
         try:
-            # Construct the OCC option symbol
-            exp_date = datetime.strptime(expiration_date, '%Y-%m-%d')
-            option_symbol = f"{symbol}{exp_date.strftime('%y%m%d')}{option_type[0].upper()}{int(strike_price*1000):08d}"
+            option_symbol = str(occ_symbols(symbol, expiration_date, option_type[0].upper() == 'C', strike_price)[0])
             
             order = self.api.submit_order(
                 symbol=option_symbol,
@@ -150,6 +166,7 @@ class AlpacaService:
                 time_in_force=time_in_force,
                 limit_price=limit_price
             )
+            self.book.invalidate()
             
             return {
                 'order_id': order.id,
@@ -159,26 +176,19 @@ class AlpacaService:
                 'created_at': order.created_at
             }
         except Exception as e:
-            self.logger.error(f"Error submitting option order for {symbol}: {str(e)}")
+            self.logger.error("Error submitting option order for %s: %s", symbol, e)
             raise
 
-    def get_open_orders(self) -> List[Dict]:
+    def get_open_orders(self, refresh: bool = False) -> List[Dict]:
         """
-        Get all open orders
+        Get all open orders from the local order book, listing them again first when the
+        book is older than `book_max_age` seconds or `refresh` is set
         """
         try:
-            orders = self.api.list_orders(status='open')
-            return [{
-                'order_id': order.id,
-                'symbol': order.symbol,
-                'qty': float(order.qty),
-                'side': order.side,
-                'type': order.type,
-                'status': order.status,
-                'submitted_at': order.submitted_at
-            } for order in orders]
+            self._ensure_book(refresh)
+            return self.book.open_orders()
         except Exception as e:
-            self.logger.error(f"Error getting open orders: {str(e)}")
+            self.logger.error("Error getting open orders: %s", e)
             raise
 
     def cancel_order(self, order_id: str) -> bool:
@@ -187,40 +197,111 @@ class AlpacaService:
         """
         try:
             self.api.cancel_order(order_id)
+            self.book.invalidate()
             return True
         except Exception as e:
-            self.logger.error(f"Error canceling order {order_id}: {str(e)}")
+            self.logger.error("Error canceling order %s: %s", order_id, e)
             raise
 
-    def get_positions(self) -> List[Dict]:
+    def get_positions(self, refresh: bool = False) -> List[Dict]:
         """
-        Get all current positions
+        Get all current positions from the local order book, listing them again first
+        when the book is older than `book_max_age` seconds or `refresh` is set
         """
         try:
-            positions = self.api.list_positions()
-            return [{
-                'symbol': pos.symbol,
-                'qty': float(pos.qty),
-                'avg_entry_price': float(pos.avg_entry_price),
-                'current_price': float(pos.current_price),
-                'market_value': float(pos.market_value),
-                'unrealized_pl': float(pos.unrealized_pl)
-            } for pos in positions]
+            self._ensure_book(refresh)
+            return self.book.positions()
         except Exception as e:
-            self.logger.error(f"Error getting positions: {str(e)}")
+            self.logger.error("Error getting positions: %s", e)
             raise
 
+    def submit_orders(self, orders: Sequence[Dict[str, Any]], batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Submit many stock orders concurrently, e.g. a portfolio rebalance
+
+        Args:
+            orders: Order requests with 'symbol', 'side', 'qty' (or 'notional') and optionally
+                'type', 'time_in_force', 'limit_price', 'stop_price' and 'client_order_id'
+            batch_id: Prefix of the generated client order ids; submitting a batch again
+                with the same id places no duplicate orders
+
+        Returns:
+            Dict with 'batch_id', the accepted 'orders' (as submit_stock_order returns them)
+            and the rejected ones under 'errors'
+        """
+        result = self.orders.submit_orders(orders, batch_id)
+        for order in result["orders"]:
+            self.book.record_order(order)
+        return {**result, "orders": [order_summary(order) for order in result["orders"]]}
+
+    def sync_book(self) -> Dict[str, List[str]]:
+        """List positions and open orders and replace the order book with them; returns what changed"""
+        since = self.book.listing_started()
+        diff = self.book.sync(self.orders.list_positions(), self.orders.list_open_orders(), since)
+        if any(diff.values()):
+            self.logger.info("Order book sync: %s", diff)
+        return diff
+
+    def start_book_updates(self, interval: Optional[float] = None, stream: bool = True) -> None:
+        """
+        Keep the order book fresh in the background, so reads make no API calls.
+
+        A thread re-lists positions and open orders every `interval` seconds (default:
+        half of `book_max_age`) and, with `stream`, the trade-updates stream applies
+        order and fill events in between.
+        """
+        if self._stop_sync is not None:
+            return
+        interval = interval if interval is not None else self.book_max_age / 2
+        self._stop_sync = threading.Event()
+        self.sync_book()
+        threading.Thread(target=self._sync_periodically, args=(interval, self._stop_sync), name="alpaca-book-sync", daemon=True).start()
+
+        if stream:
+            from alpaca_trade_api.stream import Stream
+
+            self._stream = Stream(self.api_key, self.api_secret, base_url=self.stream_url, raw_data=True)
+            self._stream.subscribe_trade_updates(self._on_trade_update)
+            threading.Thread(target=self._stream.run, name="alpaca-trade-updates", daemon=True).start()
+
+    def stop_book_updates(self) -> None:
+        if self._stop_sync is not None:
+            self._stop_sync.set()
+            self._stop_sync = None
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+            except Exception as e:
+                # A stream whose thread has not started its loop yet has nothing to stop
+                self.logger.warning("Stopping trade updates stream failed: %s", e)
+            self._stream = None
+
+    def _ensure_book(self, refresh: bool) -> None:
+        if refresh or self.book.age() > self.book_max_age:
+            self.sync_book()
+
+    def _sync_periodically(self, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(interval):
+            try:
+                self.sync_book()
+            except Exception as e:
+                self.logger.warning("Order book sync failed: %s", e)
+
+    async def _on_trade_update(self, message: Dict[str, Any]) -> None:
+        self.book.apply_trade_update(message.get("data") or {})
+
     def close_position(self, symbol: str) -> Dict:
         """
         Close entire position for a symbol
         """
         try:
             response = self.api.close_position(symbol)
+            self.book.invalidate()
             return {
                 'symbol': response.symbol,
                 'qty': float(response.qty),
                 'status': 'closed'
             }
         except Exception as e:
-            self.logger.error(f"Error closing position for {symbol}: {str(e)}")
+            self.logger.error("Error closing position for %s: %s", symbol, e)
             raise
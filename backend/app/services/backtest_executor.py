@@ -0,0 +1,198 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+import logging
+
+import pandas as pd
+
+from .bar_store import restore, shareable
+from .instrumentation import call_collecting, merge
+from .profiling import DEFAULT_SAMPLE_INTERVAL, profile_call
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+# Start method of every process pool in the server: spawn avoids forking the server
+# process while its threads hold locks
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+# Populated in each worker process on first use
+_worker_services: Dict[str, Any] = {}
+# Set by run_compute(in_process=False) for the work it runs in a thread (see `cancel_event`)
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar("cancel_event", default=None)
+
+
+class ExecutorBusyError(Exception):
+    """Raised when every compute slot is taken and the request should be retried later"""
+
+
+class BacktestExecutor:
+    """
+    Runs backtest work off the event loop.
+
+    Blocking I/O such as the Polygon client goes to a thread, CPU-bound backtests go to a
+    bounded process pool. At most `max_pending` jobs are admitted at once; further
+    requests are rejected with ExecutorBusyError instead of queueing without bound. Each
+    job is awaited for at most `timeout` seconds. A job that times out keeps its slot
+    until the worker actually finishes, so abandoned work still counts against the limit.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_workers = max_workers or int(os.getenv("BACKTEST_MAX_WORKERS", os.cpu_count() or 1))
+        self.max_pending = max_pending or int(os.getenv("BACKTEST_MAX_PENDING", self.max_workers * 2))
+        self.timeout = timeout or float(os.getenv("BACKTEST_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=POOL_CONTEXT)
+        return self._pool
+
+    async def run_io(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking I/O in a worker thread, bounded by the request timeout"""
+        return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout=self.timeout)
+
+    async def run_compute(self, func: Callable[..., Any], *args: Any, in_process: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Run CPU-bound work in the process pool.
+
+        `in_process=False` runs the callable in a thread instead while still taking a
+        slot. It is only for work that hands its heavy computation to worker processes
+        itself (parameter sweeps, see `parameter_sweep.sweep_pool`) or is light and
+        bound to state cached in this process, since the thread competes with the event
+        loop for the GIL; when the caller stops waiting for it (timeout or cancellation)
+        its `cancel_event` is set. `timeout` overrides the executor's default. Stage
+        timings recorded in a pool worker are merged into this process's (see `instrumentation`).
+        Frames loaded from the bar cache are sent as references to the memory-mapped
+        file, which the worker maps itself (see `bar_store`).
+        """
+        if self._in_flight >= self.max_pending:
+            raise ExecutorBusyError(f"All {self.max_pending} backtest slots are busy")
+
+        loop = asyncio.get_running_loop()
+        cancel = None
+        if in_process:
+            future = loop.run_in_executor(self._get_pool(), _call_in_worker, func, *(shareable(arg) for arg in args))
+        else:
+            # The thread runs in a copy of this context, so it sees the event
+            cancel = threading.Event()
+            token = _cancel_event.set(cancel)
+            try:
+                future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            finally:
+                _cancel_event.reset(token)
+
+        self._in_flight += 1
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=timeout or self.timeout)
+        except (TimeoutError, asyncio.CancelledError):
+            if cancel is not None:
+                cancel.set()
+            raise
+        if not in_process:
+            return result
+        result, timings = result
+        merge(timings)
+        return result
+
+    def _release(self, future: "asyncio.Future[Any]") -> None:
+        self._in_flight -= 1
+        if not future.cancelled() and future.exception() is not None:
+            # Retrieved here so abandoned (timed out) jobs do not log "exception never retrieved"
+            logger.debug("Backtest job finished with error: %s", future.exception())
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def cancel_event() -> Optional[threading.Event]:
+    """
+    In work started by run_compute(in_process=False), an event set once its caller has
+    given up on it, so long-running work can stop early; None elsewhere.
+    """
+    return _cancel_event.get()
+
+
+def _call_in_worker(func: Callable[..., Any], *args: Any) -> Any:
+    return call_collecting(func, *(restore(arg) for arg in args))
+
+
+def run_backtest_job(
+    data: pd.DataFrame,
+    strategy_name: str,
+    parameters: Dict[str, Any],
+    execution: Optional[Dict[str, Any]] = None,
+    fingerprint: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Process-pool entry point for a single backtest.
+
+    Returns BacktestService.evaluate's result, with signals and equity curve as numpy
+    arrays, which cross the process boundary far more cheaply than float lists.
+    `fingerprint` is the bars' `bar_fingerprint` when the caller already computed it.
+    """
+    if "backtest" not in _worker_services:
+        from .backtest_service import BacktestService
+
+        _worker_services["backtest"] = BacktestService()
+    service = _worker_services["backtest"]
+    if strategy_name not in service.strategies:
+        raise ValueError(f"Strategy {strategy_name} not found")
+    return service.evaluate(service.prepare_data(data), strategy_name, parameters, execution, fingerprint)
+
+
+def run_portfolio_job(closes: pd.DataFrame, strategy_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entry point for a portfolio backtest over an aligned close-price matrix"""
+    if "backtest" not in _worker_services:
+        from .backtest_service import BacktestService
+
+        _worker_services["backtest"] = BacktestService()
+    return _worker_services["backtest"].run_portfolio(closes, strategy_name, parameters)
+
+
+def run_profiled_backtest_job(
+    data: pd.DataFrame,
+    strategy_name: str,
+    parameters: Dict[str, Any],
+    execution: Optional[Dict[str, Any]] = None,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    Process-pool entry point for one backtest under the sampling profiler.
+
+    Always recomputes: the worker's profiling service has a result cache that stores
+    nothing, so repeated profiles of the same request measure the same work.
+
+    Returns:
+        Dict with the backtest `results`, the folded-stack `profile` and its `samples` count
+    """
+    if "profiling" not in _worker_services:
+        from .backtest_service import BacktestService
+        from .result_cache import ResultCache
+
+        cache = ResultCache(max_bytes=0)
+        # Nor read results other processes wrote to a shared disk cache
+        cache.disk_dir = None
+        _worker_services["profiling"] = BacktestService(result_cache=cache)
+    service = _worker_services["profiling"]
+    if strategy_name not in service.strategies:
+        raise ValueError(f"Strategy {strategy_name} not found")
+
+    def backtest() -> Dict[str, Any]:
+        return service.evaluate(service.prepare_data(data), strategy_name, parameters, execution)
+
+    results, profiler = profile_call(backtest, interval=interval)
+    return {"results": results, "profile": profiler.folded(), "samples": profiler.sample_count}
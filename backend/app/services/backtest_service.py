@@ -1,10 +1,20 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
-import statsmodels.api as sm
 import logging
 
+from .bars import BarSeries
+from .execution import normalize_execution, simulate_execution
+from .instrumentation import timed
+from .metrics import POSITION_METRICS, RETURN_METRICS, compute_metrics, infer_periods_per_year
+from .portfolio import left_align, restore_alignment
+from .parameter_sweep import RANKING_METRICS, expand_parameter_grid, run_batched_sweep, run_parameter_sweep, sample_parameter_grid
+from .result_cache import ResultCache
+from ..strategies.rsi import calculate_rsi
+from .strategy_registry import StrategyRegistry, StrategySpec, strategy_registry
+from .walk_forward import WALK_FORWARD_METHODS, purged_kfold_splits, run_walk_forward, walk_forward_splits
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -13,21 +23,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class BacktestService:
-    def __init__(self):
-        self.strategies = {
-            "simple_moving_average": self.simple_moving_average_strategy,
-            "exponential_moving_average": self.exponential_moving_average_strategy,
-            "rsi_strategy": self.rsi_strategy,
-            "momentum_regression": self.momentum_regression_strategy,
-        }
-        
-        # Add display names for each strategy
-        self.strategy_display_names = {
-            "simple_moving_average": "Simple Moving Average",
-            "exponential_moving_average": "Exponential Moving Average",
-            "rsi_strategy": "RSI Strategy",
-            "momentum_regression": "Momentum Regression",
-        }
+    def __init__(self, result_cache: Optional[ResultCache] = None, registry: Optional[StrategyRegistry] = None):
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.registry = registry if registry is not None else strategy_registry
+        specs = [self.registry.get(name) for name in self.registry.names()]
+
+        # DataFrame -> position Series for each strategy; signal functions load on first call
+        self.strategies = {spec.name: self._strategy_function(spec) for spec in specs}
+
+        # Array-level signal logic behind each strategy, used by portfolio backtests
+        # to evaluate a whole (time x symbol) price matrix in one pass
+        self.signal_functions = {spec.name: self._signal_function(spec) for spec in specs}
+
+        self.strategy_display_names = {spec.name: spec.display_name for spec in specs}
+
+    def _strategy_function(self, spec: StrategySpec) -> Callable[[pd.DataFrame, Dict[str, Any]], pd.Series]:
+        signal_function = self._signal_function(spec)
+
+        def strategy(df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+            return pd.Series(signal_function(df['close'].to_numpy(), parameters), index=df.index)
+        return strategy
+
+    def _signal_function(self, spec: StrategySpec) -> Callable[[np.ndarray, Dict[str, Any]], np.ndarray]:
+        """The spec's signal logic under its error policy: flat positions or a ValueError"""
+        def signals(close: np.ndarray, parameters: Dict[str, Any]) -> np.ndarray:
+            try:
+                positions = spec.load()(close, parameters)
+                logger.debug("%s signals generated", spec.label)
+                return positions
+            except Exception as e:
+                logger.exception("%s strategy failed", spec.label)
+                if spec.flat_on_error:
+                    return np.zeros(np.shape(close))
+                raise ValueError(f"{spec.label} strategy failed: {str(e)}")
+        return signals
 
     def get_strategy_display_name(self, strategy_name: str) -> str:
         """Get the display name for a strategy"""
@@ -37,24 +66,55 @@ class BacktestService:
         """Get all strategies with their display names"""
         return {name: self.get_strategy_display_name(name) for name in self.strategies.keys()}
 
-    def run_backtest(self, data: List[Dict[str, Any]], strategy_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        logger.info(f"Running backtest for strategy: {strategy_name} with parameters: {parameters}")
+    def get_strategy_schemas(self) -> Dict[str, Dict[str, Any]]:
+        """Get the parameter schema and default warm-up length of every registered strategy"""
+        return {name: schema for name, schema in self.registry.describe().items() if name in self.strategies}
+
+    def warmup_bars(self, strategy_name: str, parameters: Dict[str, Any]) -> int:
+        """Bars `strategy_name` needs with `parameters` before its first meaningful signal"""
+        return self.registry.get(strategy_name).warmup_bars(parameters)
+
+    def run_backtest(
+        self,
+        data: Union[List[Dict[str, Any]], BarSeries, pd.DataFrame],
+        strategy_name: str,
+        parameters: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        logger.info("Running backtest for strategy: %s with parameters: %s", strategy_name, parameters)
 
         if strategy_name not in self.strategies:
-            logger.error(f"Strategy {strategy_name} not found")
+            logger.error("Strategy %s not found", strategy_name)
             raise ValueError(f"Strategy {strategy_name} not found")
 
-        if not data:
+        df = self.prepare_data(data)
+        results = self.evaluate(df, strategy_name, parameters, execution)
+        results["signals"] = results["signals"].tolist()
+        results["equity_curve"] = results["equity_curve"].tolist()
+        return results
+
+    def prepare_data(self, data: Union[List[Dict[str, Any]], BarSeries, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Build and validate the timestamp-indexed bar DataFrame a backtest runs on.
+
+        Record lists are converted column by column into a BarSeries rather than through
+        pandas' row-wise constructor, and the resulting frame wraps its arrays read-only.
+        """
+        if data is None or len(data) == 0:
             logger.error("No data provided for backtest")
             raise ValueError("No data provided for backtest")
 
-        df = pd.DataFrame(data)
-        logger.info(f"Created DataFrame with {len(df)} rows")
-        
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
+        if isinstance(data, pd.DataFrame):
+            # Already indexed by timestamp, e.g. bars loaded from the bar cache
+            df = data
+        else:
+            with timed("frame"):
+                bars = data if isinstance(data, BarSeries) else BarSeries.from_records(data)
+                df = bars.to_frame()
+            logger.info("Created DataFrame with %s rows", len(df))
 
-        logger.debug("Initial DataFrame:\n%s", df.head())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initial DataFrame:\n%s", df.head())
 
         if df.empty:
             logger.error("DataFrame is empty after processing")
@@ -64,173 +124,326 @@ class BacktestService:
             logger.error("Data contains null values in close prices")
             raise ValueError("Invalid data: contains null values in close prices")
 
+        return df
+
+    def evaluate(
+        self,
+        df: pd.DataFrame,
+        strategy_name: str,
+        parameters: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run one strategy over prepared bars.
+
+        Returns the metrics as floats and `signals`/`equity_curve` as float64 numpy arrays.
+        Results are memoized by bar content, strategy and parameters; cached arrays are
+        read-only. Callers evaluating many runs over the same bars pass the bars'
+        `bar_fingerprint` so they are hashed once rather than on every call.
+
+        Without `execution` settings positions are the raw signals, traded for free.
+        With them, the signals go through the execution simulator (costs, sizing,
+        stops); `signals` are then the positions actually held, and the result also
+        has the number of `trades` and the total `costs`.
+        """
+        if execution is not None:
+            execution = normalize_execution(execution)
+        cache_key = self.result_cache.make_key(df, strategy_name, parameters, execution, fingerprint)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving cached backtest for strategy: %s with parameters: %s", strategy_name, parameters)
+            return cached
+
         try:
             strategy = self.strategies[strategy_name]
-            signals = strategy(df.copy(), parameters)
+            # Strategies only read the bars, so they get the frame itself rather than a copy
+            with timed("strategy"):
+                signals = strategy(df, parameters)
             
             if signals is None or len(signals) == 0:
                 logger.error("Strategy returned no signals")
                 raise ValueError("Strategy failed to generate signals")
 
-            df['returns'] = df['close'].pct_change()
-            df['strategy_returns'] = df['returns'] * signals
-
-            logger.debug("Returns and strategy_returns calculated:\n%s", df[['returns', 'strategy_returns']].dropna().head())
-
-            total_return = (1 + df['strategy_returns']).prod() - 1
-            sharpe_ratio = self.calculate_sharpe_ratio(df['strategy_returns'])
-            max_drawdown = self.calculate_max_drawdown(df['strategy_returns'])
-
-            logger.info(f"Backtest completed: Total Return={total_return:.4f}, Sharpe={sharpe_ratio:.4f}, Max Drawdown={max_drawdown:.4f}")
-
-            return {
-                "total_return": self.safe_float(total_return),
-                "sharpe_ratio": self.safe_float(sharpe_ratio),
-                "max_drawdown": self.safe_float(max_drawdown),
-                "signals": signals.fillna(0).astype(float).tolist(),
-                "equity_curve": (1 + df['strategy_returns']).cumprod().fillna(1).astype(float).tolist(),
+            with timed("metrics"):
+                extra = {}
+                if execution is None:
+                    returns = df['close'].pct_change()
+                    strategy_returns = returns * signals
+                else:
+                    simulated = simulate_execution(df['close'].to_numpy(), signals.to_numpy(dtype=np.float64), execution)
+                    strategy_returns = pd.Series(simulated["strategy_returns"], index=df.index)
+                    signals = pd.Series(simulated["positions"], index=df.index)
+                    extra = {"trades": simulated["trades"], "costs": simulated["costs"]}
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Strategy returns calculated:\n%s", strategy_returns.dropna().head())
+
+                positions = signals.fillna(0).to_numpy(dtype=np.float64)
+                metrics = compute_metrics(
+                    strategy_returns.to_numpy(dtype=np.float64),
+                    positions=positions,
+                    periods_per_year=infer_periods_per_year(df.index),
+                )
+
+            logger.info("Backtest completed: Total Return=%.4f, Sharpe=%.4f, Max Drawdown=%.4f", metrics['total_return'], metrics['sharpe_ratio'], metrics['max_drawdown'])
+
+            results = {
+                **self.metric_values(metrics, RETURN_METRICS + POSITION_METRICS),
+                "signals": positions,
+                "equity_curve": metrics["equity_curve"],
                 "strategy_display_name": self.get_strategy_display_name(strategy_name),
+                **extra,
             }
 
         except Exception as e:
             logger.exception("Error during backtest execution")
             raise ValueError(f"Backtest execution failed: {str(e)}")
 
-    def safe_float(self, val: float) -> float:
-        try:
-            return float(np.nan_to_num(val, nan=0.0, posinf=0.0, neginf=0.0))
-        except Exception as e:
-            logger.warning(f"safe_float conversion error: {e}")
-            return 0.0
+        self.result_cache.put(cache_key, results)
+        return dict(results)
+
+    def run_sweep(
+        self,
+        data: Union[List[Dict[str, Any]], BarSeries, pd.DataFrame],
+        strategy_name: str,
+        parameter_grid: Dict[str, List[Any]],
+        n_samples: Optional[int] = None,
+        rank_by: str = "sharpe_ratio",
+        include_signals: bool = False,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Backtest every parameter combination of a grid and rank the results.
+
+        Args:
+            data: Bars to backtest on, loaded once for the whole sweep
+            strategy_name: Strategy to run
+            parameter_grid: Candidate values per parameter; unlisted parameters keep their defaults
+            n_samples: Evaluate this many random combinations instead of the full grid
+            rank_by: Metric to sort by, best first
+            include_signals: Also return each combination's signals and equity curve
+            max_workers: Sweep pool workers to use at once (default: SWEEP_MAX_WORKERS or the CPU count)
+            seed: Random seed used when sampling
+        """
+        logger.info("Running sweep for strategy: %s over grid: %s", strategy_name, parameter_grid)
 
-    def simple_moving_average_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
-        try:
-            short = parameters.get('short_window', 20)
-            long = parameters.get('long_window', 50)
-            logger.info(f"Running SMA strategy: short={short}, long={long}")
+        if strategy_name not in self.strategies:
+            logger.error("Strategy %s not found", strategy_name)
+            raise ValueError(f"Strategy {strategy_name} not found")
+        if rank_by not in RANKING_METRICS:
+            raise ValueError(f"Cannot rank by {rank_by}; choose one of {', '.join(RANKING_METRICS)}")
+
+        combinations = (
+            sample_parameter_grid(parameter_grid, n_samples, seed)
+            if n_samples is not None
+            else expand_parameter_grid(parameter_grid)
+        )
+        df = self.prepare_data(data)
+        rows = None
+        if strategy_name in self.registry and self.registry.get(strategy_name).load_sweep() is not None:
+            try:
+                rows = run_batched_sweep(df, strategy_name, combinations, include_signals, max_workers)
+            except Exception:
+                # E.g. an invalid combination; evaluate them one by one to report each
+                logger.exception("Batched sweep failed for strategy %s, evaluating combinations separately", strategy_name)
+        if rows is None:
+            rows = run_parameter_sweep(df, strategy_name, combinations, include_signals, max_workers)
+
+        results = [row for row in rows if "error" not in row]
+        errors = [row for row in rows if "error" in row]
+        results.sort(key=lambda row: row[rank_by], reverse=True)
+        logger.info("Sweep completed: %s combinations ranked, %s failed", len(results), len(errors))
+
+        return {
+            "strategy_display_name": self.get_strategy_display_name(strategy_name),
+            "combinations": len(combinations),
+            "results": results,
+            "errors": errors,
+        }
 
-            if len(df) < long:
-                logger.error(f"Not enough data points for SMA strategy. Need at least {long} points, got {len(df)}")
-                raise ValueError(f"Not enough data points for SMA strategy. Need at least {long} points")
+    def run_walk_forward(
+        self,
+        data: Union[List[Dict[str, Any]], BarSeries, pd.DataFrame],
+        strategy_name: str,
+        parameter_grid: Dict[str, List[Any]],
+        method: str = "walk_forward",
+        train_size: Optional[int] = None,
+        test_size: Optional[int] = None,
+        anchored: bool = False,
+        n_splits: int = 5,
+        purge: int = 0,
+        n_samples: Optional[int] = None,
+        rank_by: str = "sharpe_ratio",
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Optimize parameters out of sample with walk-forward or purged k-fold splits.
+
+        Args:
+            data: Bars to split into train and test sets
+            strategy_name: Strategy to run
+            parameter_grid: Candidate values per parameter; unlisted parameters keep their defaults
+            method: "walk_forward" (rolling or anchored windows) or "purged_kfold"
+            train_size: Bars per train window (walk_forward; default: half the bars)
+            test_size: Bars per test window (walk_forward; default: a fifth of train_size)
+            anchored: Grow train windows from the first bar (walk_forward)
+            n_splits: Number of folds (purged_kfold)
+            purge: Bars left out of training on each side of a test fold (purged_kfold)
+            n_samples: Evaluate this many random combinations instead of the full grid
+            rank_by: Train metric used to pick each fold's parameters
+            max_workers: Sweep pool workers to use at once (default: SWEEP_MAX_WORKERS or the CPU count)
+            seed: Random seed used when sampling
+        """
+        logger.info("Running %s optimization for strategy: %s over grid: %s", method, strategy_name, parameter_grid)
 
-            df['SMA_short'] = df['close'].rolling(window=short).mean()
-            df['SMA_long'] = df['close'].rolling(window=long).mean()
+        if strategy_name not in self.strategies:
+            logger.error("Strategy %s not found", strategy_name)
+            raise ValueError(f"Strategy {strategy_name} not found")
+        if method not in WALK_FORWARD_METHODS:
+            raise ValueError(f"Unknown method {method}; choose one of {', '.join(WALK_FORWARD_METHODS)}")
+
+        combinations = (
+            sample_parameter_grid(parameter_grid, n_samples, seed)
+            if n_samples is not None
+            else expand_parameter_grid(parameter_grid)
+        )
+        df = self.prepare_data(data)
+        if method == "walk_forward":
+            train_size = train_size or len(df) // 2
+            splits = walk_forward_splits(len(df), train_size, test_size or max(train_size // 5, 1), anchored)
+        else:
+            splits = purged_kfold_splits(len(df), n_splits, purge)
+
+        results = run_walk_forward(df, strategy_name, combinations, splits, rank_by, max_workers)
+        return {
+            "strategy_display_name": self.get_strategy_display_name(strategy_name),
+            "method": method,
+            "combinations": len(combinations),
+            **results,
+        }
 
-            signals = pd.Series(0, index=df.index)
-            signals[df['SMA_short'] > df['SMA_long']] = 1
-            signals[df['SMA_short'] < df['SMA_long']] = -1
+    def run_portfolio(self, closes: pd.DataFrame, strategy_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Backtest one strategy on every symbol of an aligned close-price matrix at once.
+
+        The strategy's signal logic runs column-wise over the (time x symbol) matrix, once
+        per distinct history length, so each symbol sees exactly its own bars, as in a
+        single-symbol backtest, without a Python loop per symbol. Each symbol is traded
+        from its first bar and the portfolio holds an equal weight in every symbol that
+        has started trading. A symbol the strategy rejects (too few bars for its warm-up,
+        say) is left out of the portfolio and reported under `errors`.
+
+        Args:
+            closes: Close prices indexed by timestamp with one column per symbol, as built by `align_closes`
+            strategy_name: Strategy to run
+            parameters: Strategy parameters, shared by every symbol
+
+        Returns:
+            Per-symbol metrics under `symbols`, the rejected symbols with the reason under
+            `errors`, plus the portfolio's metrics and equity curve
+        """
+        logger.info("Running portfolio backtest for strategy: %s on %s symbols", strategy_name, closes.shape[1])
+
+        if strategy_name not in self.signal_functions:
+            logger.error("Strategy %s not found", strategy_name)
+            raise ValueError(f"Strategy {strategy_name} not found")
+        if closes.empty:
+            raise ValueError("No data provided for backtest")
 
-            logger.debug("SMA signals generated")
-            return signals.fillna(0)
-        except Exception as e:
-            logger.exception("SMA strategy failed")
-            raise ValueError(f"SMA strategy failed: {str(e)}")
+        prices = closes.to_numpy(dtype=np.float64)
+        shifted, first = left_align(prices)
+        lengths = len(closes) - first
+        signals = np.full(prices.shape, np.nan)
+        failed: Dict[int, str] = {}
+        with timed("strategy"):
+            # Columns with the same number of bars share one call on just those bars
+            for length in np.unique(lengths[lengths > 0]):
+                columns = np.flatnonzero(lengths == length)
+                try:
+                    signals[:length, columns] = self.signal_functions[strategy_name](shifted[:length, columns], parameters)
+                except ValueError as e:
+                    failed.update((column, str(e)) for column in columns)
+            signals = np.nan_to_num(restore_alignment(signals, first), nan=0.0)
+        if len(failed) == closes.shape[1]:
+            raise ValueError(next(iter(failed.values())))
 
-    def exponential_moving_average_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
         try:
-            short = parameters.get('short_window', 8)
-            long = parameters.get('long_window', 20)
-            smoothing = parameters.get('smoothing', 2)
-            logger.info(f"Running EMA strategy: short={short}, long={long}, smoothing={smoothing}")
-
-            if len(df) < long:
-                logger.error(f"Not enough data points for EMA strategy. Need at least {long} points, got {len(df)}")
-                raise ValueError(f"Not enough data points for EMA strategy. Need at least {long} points")
-
-            # Calculate alpha for EMA based on smoothing factor
-            # Alpha = smoothing/(1+days)
-            short_alpha = smoothing / (1 + short)
-            long_alpha = smoothing / (1 + long)
-            
-            # Calculate EMAs with explicit alpha values
-            df['EMA_short'] = df['close'].ewm(alpha=short_alpha, adjust=False).mean()
-            df['EMA_long'] = df['close'].ewm(alpha=long_alpha, adjust=False).mean()
-
-            signals = pd.Series(0, index=df.index)
-            signals[df['EMA_short'] > df['EMA_long']] = 1  # Buy signal when short EMA crosses above long EMA
-            signals[df['EMA_short'] < df['EMA_long']] = -1  # Sell signal when short EMA crosses below long EMA
-
-            logger.debug("EMA signals generated")
-            return signals.fillna(0)
+            with timed("metrics"):
+                returns = np.full(prices.shape, np.nan)
+                returns[1:] = prices[1:] / prices[:-1] - 1
+                strategy_returns = returns * signals
+                strategy_returns[:, list(failed)] = np.nan
+
+                periods_per_year = infer_periods_per_year(closes.index)
+                metrics = compute_metrics(strategy_returns, positions=signals, periods_per_year=periods_per_year)
+
+                # Equal weight across the symbols trading at each bar
+                active = ~np.isnan(strategy_returns)
+                with np.errstate(invalid="ignore"):
+                    portfolio_returns = np.where(active.any(axis=1), np.nansum(strategy_returns, axis=1) / active.sum(axis=1), np.nan)
+                portfolio = compute_metrics(portfolio_returns, periods_per_year=periods_per_year)
         except Exception as e:
-            logger.exception("EMA strategy failed")
-            raise ValueError(f"EMA strategy failed: {str(e)}")
+            logger.exception("Error during portfolio backtest execution")
+            raise ValueError(f"Portfolio backtest execution failed: {str(e)}")
+
+        symbols = [
+            {
+                "symbol": str(symbol),
+                "bars": int(len(closes) - first[i]),
+                **self.metric_values(metrics, RETURN_METRICS + POSITION_METRICS, column=i),
+            }
+            for i, symbol in enumerate(closes.columns)
+            if i not in failed
+        ]
+        logger.info("Portfolio backtest completed: %s symbols, Total Return=%.4f", len(symbols), portfolio['total_return'])
+
+        return {
+            "strategy_display_name": self.get_strategy_display_name(strategy_name),
+            "symbols": symbols,
+            "errors": {str(closes.columns[i]): reason for i, reason in failed.items()},
+            **self.metric_values(portfolio, RETURN_METRICS),
+            "equity_curve": portfolio["equity_curve"],
+        }
 
-    def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=period).mean()
-        rs = gain / loss
-        logger.debug(f"RSI calculated with period={period}")
-        return 100 - (100 / (1 + rs))
+    def metric_values(self, metrics: Dict[str, Any], names: Tuple[str, ...], column: Optional[int] = None) -> Dict[str, Any]:
+        """Plain Python numbers for `names` from `compute_metrics` output, optionally for one column"""
+        values = {}
+        for name in names:
+            value = metrics[name] if column is None else metrics[name][column]
+            values[name] = int(value) if name == "max_drawdown_duration" else self.safe_float(value)
+        return values
 
-    def rsi_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+    def safe_float(self, val: float) -> float:
         try:
-            period = parameters.get('period', 14)
-            overbought = parameters.get('overbought', 70)
-            oversold = parameters.get('oversold', 30)
-
-            logger.info(f"Running RSI strategy: period={period}, overbought={overbought}, oversold={oversold}")
-            rsi = self.calculate_rsi(df['close'], period)
-
-            signals = pd.Series(0, index=df.index)
-            signals[rsi < oversold] = 1
-            signals[rsi > overbought] = -1
-
-            logger.debug("RSI signals generated")
-            return signals.fillna(0)
+            return float(np.nan_to_num(val, nan=0.0, posinf=0.0, neginf=0.0))
         except Exception as e:
-            logger.exception("RSI strategy failed")
-            return pd.Series(0, index=df.index)
-
-    def momentum_regression_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
-        try:
-            short = parameters.get("short_sma", 5)
-            mid = parameters.get("mid_sma", 20)
-            long = parameters.get("long_sma", 60)
-            reg_window = parameters.get("regression_window", 30)
-
-            logger.info(f"Running Momentum Regression strategy: short={short}, mid={mid}, long={long}, reg_window={reg_window}")
-
-            df['SMA_short'] = df['close'].rolling(window=short).mean()
-            df['SMA_mid'] = df['close'].rolling(window=mid).mean()
-            df['SMA_long'] = df['close'].rolling(window=long).mean()
-            df['return'] = df['close'].pct_change()
-
-            weights = pd.Series(0.0, index=df.index)
-
-            for i in range(reg_window, len(df)):
-                window_df = df.iloc[i - reg_window:i]
-                X = window_df[['SMA_short', 'SMA_mid', 'SMA_long']].dropna()
-                y = window_df['return'].loc[X.index]
-
-                if len(X) < reg_window // 2 or X.empty or y.empty:
-                    continue
+            logger.warning("safe_float conversion error: %s", e)
+            return 0.0
 
-                X = sm.add_constant(X)
-                model = sm.OLS(y, X).fit()
+    def simple_moving_average_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+        return self.strategies["simple_moving_average"](df, parameters)
 
-                alpha = model.params.get('const', 0.0)
-                sigma_squared = np.var(model.resid) if len(model.resid) > 0 else 1e-6
-                gamma = np.clip(alpha / (sigma_squared + 1e-6), -1, 1)
+    def exponential_moving_average_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+        return self.strategies["exponential_moving_average"](df, parameters)
 
-                weights.iloc[i] = gamma
+    def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
+        return calculate_rsi(prices, period)
 
-                if i % 50 == 0:
-                    logger.debug(f"Iteration {i}: alpha={alpha:.4f}, sigma²={sigma_squared:.6f}, gamma={gamma:.4f}")
+    def rsi_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+        return self.strategies["rsi_strategy"](df, parameters)
 
-            logger.debug("Momentum regression signals generated")
-            return weights.fillna(0)
-        except Exception as e:
-            logger.exception("Momentum regression strategy failed")
-            return pd.Series(0, index=df.index)
+    def momentum_regression_strategy(self, df: pd.DataFrame, parameters: Dict[str, Any]) -> pd.Series:
+        return self.strategies["momentum_regression"](df, parameters)
 
     def calculate_sharpe_ratio(self, returns: pd.Series) -> float:
         if len(returns) < 2 or returns.std() == 0:
             logger.warning("Sharpe ratio not computable (insufficient data or zero std)")
             return 0.0
         sharpe = np.sqrt(252) * returns.mean() / returns.std()
-        logger.debug(f"Sharpe ratio: {sharpe:.4f}")
+        logger.debug("Sharpe ratio: %.4f", sharpe)
         return sharpe
 
     def calculate_max_drawdown(self, returns: pd.Series) -> float:
@@ -238,5 +451,5 @@ class BacktestService:
         peak = cumulative.expanding(min_periods=1).max()
         drawdown = cumulative / peak - 1
         mdd = drawdown.min()
-        logger.debug(f"Max drawdown: {mdd:.4f}")
+        logger.debug("Max drawdown: %.4f", mdd)
         return mdd
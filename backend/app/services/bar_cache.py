@@ -0,0 +1,238 @@
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .bar_store import MappedBars, map_table, writer_lock
+from .bars import BAR_COLUMNS, MARKET_TIMEZONE, BarSeries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "volatilitylab", "bars")
+# Bars handed out per chunk by `iter_series`
+DEFAULT_CHUNK_BARS = 262_144
+# Stored bars not merged into a symbol's bars.npy yet: <prefix><sequence number>.npy
+SEGMENT_PREFIX = "segment-"
+
+_MARKET_ZONE = ZoneInfo(MARKET_TIMEZONE)
+
+DateLike = Union[date, datetime]
+DateRange = Tuple[date, date]
+
+
+class BarCache:
+    """
+    Persistent on-disk cache of OHLCV bars, one directory per timespan and symbol.
+
+    Each symbol is stored as a single `bars.npy` array of shape (1 + len(BAR_COLUMNS), n):
+    row 0 holds the bar timestamps in epoch milliseconds and every other row holds one
+    column, so the file is columnar and is memory-mapped read-only by every process that
+    loads from it (see `bar_store`). Stores only write the new bars, as a segment file
+    next to it; the next read merges every pending segment into `bars.npy` in one
+    rewrite, so filling a long history chunk by chunk rewrites it once, not per chunk.
+    `coverage.json` records the inclusive date ranges that have been fetched, including
+    days on which the market returned no bars, so repeated requests never go back to the
+    network.
+
+    Dates are trading days in the market time zone: a date range covers every bar from
+    midnight New York time on its first day to midnight after its last, which keeps
+    after-hours minute bars (past midnight UTC) with the session they belong to.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("BAR_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+    def _symbol_dir(self, symbol: str, timespan: str) -> str:
+        return os.path.join(self.root, timespan, symbol.upper())
+
+    def _bars_path(self, symbol: str, timespan: str) -> str:
+        return os.path.join(self._symbol_dir(symbol, timespan), "bars.npy")
+
+    def _segment_paths(self, symbol: str, timespan: str) -> List[str]:
+        """Pending segment files of a symbol, oldest first"""
+        directory = self._symbol_dir(symbol, timespan)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(directory, name) for name in sorted(names) if name.startswith(SEGMENT_PREFIX) and name.endswith(".npy")]
+
+    def _coverage_path(self, symbol: str, timespan: str) -> str:
+        return os.path.join(self._symbol_dir(symbol, timespan), "coverage.json")
+
+    def coverage(self, symbol: str, timespan: str = "day") -> List[DateRange]:
+        """Get the merged date ranges already cached for a symbol"""
+        path = self._coverage_path(symbol, timespan)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            ranges = json.load(f)
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in ranges]
+
+    def missing_ranges(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str = "day") -> List[DateRange]:
+        """Get the sub-ranges of [start_date, end_date] that still have to be fetched"""
+        start, end = _to_date(start_date), _to_date(end_date)
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(symbol, timespan):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - timedelta(days=1)))
+            cursor = max(cursor, covered_end + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def load(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str = "day") -> pd.DataFrame:
+        """
+        Load cached bars between two dates (inclusive) as a timestamp-indexed DataFrame.
+
+        The columns are read-only views into the memory-mapped file; nothing is copied
+        except the timestamp index. The frame carries its MappedBars, so it is sent to
+        process-pool children by reference (see `bar_store.shareable`).
+        """
+        mapped = self.load_mapped(symbol, start_date, end_date, timespan)
+        return BarSeries.empty().to_frame() if mapped is None else mapped.to_frame()
+
+    def load_mapped(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str = "day") -> Optional[MappedBars]:
+        """Reference to the cached bars between two dates (inclusive), or None if nothing is cached"""
+        path = self._merged_path(symbol, timespan)
+        mapped = map_table(path)
+        if mapped is None:
+            return None
+        identity, table = mapped
+        lo, hi = _bounds(table[0], start_date, end_date)
+        first_ms, last_ms = (int(table[0, lo]), int(table[0, hi - 1])) if hi > lo else (0, 0)
+        return MappedBars(path, identity, lo, hi, first_ms, last_ms)
+
+    def load_series(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str = "day") -> BarSeries:
+        """Load cached bars between two dates (inclusive); the value columns stay memory-mapped"""
+        mapped = self.load_mapped(symbol, start_date, end_date, timespan)
+        return BarSeries.empty() if mapped is None else mapped.series()
+
+    def iter_series(
+        self,
+        symbol: str,
+        start_date: DateLike,
+        end_date: DateLike,
+        timespan: str = "day",
+        chunk_bars: int = DEFAULT_CHUNK_BARS,
+    ) -> Iterator[BarSeries]:
+        """
+        Yield cached bars between two dates (inclusive) in consecutive chunks of at most
+        `chunk_bars`, so multi-year minute history can be streamed without loading it whole.
+        """
+        mapped = map_table(self._merged_path(symbol, timespan))
+        if mapped is None:
+            return
+        table = mapped[1]
+        lo, hi = _bounds(table[0], start_date, end_date)
+        for start in range(lo, hi, chunk_bars):
+            stop = min(start + chunk_bars, hi)
+            yield BarSeries(table[0, start:stop].astype(np.int64), table[1:, start:stop])
+
+    def store(self, symbol: str, start_date: DateLike, end_date: DateLike, bars: BarSeries, timespan: str = "day") -> None:
+        """
+        Add freshly fetched bars to the cache and mark [start_date, end_date] as covered.
+
+        Newer bars replace cached bars with the same timestamp. Stores of a symbol take
+        turns under its writer lock, across processes, so concurrent stores never drop each
+        other's bars. Only the new bars are written, as a segment that the next read merges
+        (see `_merged_path`). Files are written to a temporary path and swapped in with
+        `os.replace`, so readers holding a memory map of the previous file are unaffected.
+        Days from today onwards are not marked as covered because their bars are not final yet.
+        """
+        with writer_lock(self._symbol_dir(symbol, timespan)):
+            self._store(symbol, start_date, end_date, bars, timespan)
+
+    def _store(self, symbol: str, start_date: DateLike, end_date: DateLike, bars: BarSeries, timespan: str) -> None:
+        fresh = np.vstack([bars.timestamps.astype(np.float64)[np.newaxis], bars.values])
+        fresh = np.ascontiguousarray(fresh[:, np.argsort(fresh[0], kind="stable")])
+        path = self._bars_path(symbol, timespan)
+        segments = self._segment_paths(symbol, timespan)
+        if segments or os.path.exists(path):
+            number = int(os.path.basename(segments[-1])[len(SEGMENT_PREFIX):-len(".npy")]) + 1 if segments else 0
+            path = os.path.join(self._symbol_dir(symbol, timespan), f"{SEGMENT_PREFIX}{number:08d}.npy")
+        _atomic_save(path, fresh)
+
+        last_final_day = datetime.now(_MARKET_ZONE).date() - timedelta(days=1)
+        covered_end = min(_to_date(end_date), last_final_day)
+        if _to_date(start_date) <= covered_end:
+            self._add_coverage(symbol, timespan, (_to_date(start_date), covered_end))
+        logger.info("Cached %s bars for %s (%s)", len(bars), symbol, timespan)
+
+    def _merged_path(self, symbol: str, timespan: str) -> str:
+        """Path of a symbol's bars.npy, after merging any pending segments into it"""
+        path = self._bars_path(symbol, timespan)
+        if self._segment_paths(symbol, timespan):
+            with writer_lock(self._symbol_dir(symbol, timespan)):
+                self._merge_segments(symbol, timespan)
+        return path
+
+    def _merge_segments(self, symbol: str, timespan: str) -> None:
+        # Listed again under the lock: another reader may have merged them already
+        segments = self._segment_paths(symbol, timespan)
+        if not segments:
+            return
+        path = self._bars_path(symbol, timespan)
+        parts = ([np.load(path, mmap_mode="r")] if os.path.exists(path) else []) + [np.load(segment) for segment in segments]
+        table = np.concatenate(parts, axis=1)
+        # Keep the last occurrence of each timestamp so the newest bars win
+        reversed_ts = table[0, ::-1]
+        _, first_in_reversed = np.unique(reversed_ts, return_index=True)
+        table = table[:, table.shape[1] - 1 - first_in_reversed]
+
+        _atomic_save(path, np.ascontiguousarray(table))
+        # A crash before these are gone only merges them again, with the same result
+        for segment in segments:
+            os.remove(segment)
+        logger.info("Merged %s cached segments for %s (%s), %s bars total", len(segments), symbol, timespan, table.shape[1])
+
+    def _add_coverage(self, symbol: str, timespan: str, new_range: DateRange) -> None:
+        ranges = sorted(self.coverage(symbol, timespan) + [new_range])
+        merged: List[DateRange] = []
+        for start, end in ranges:
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+
+        path = self._coverage_path(symbol, timespan)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([[start.isoformat(), end.isoformat()] for start, end in merged], f)
+        os.replace(tmp_path, path)
+
+
+def _to_date(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _day_start_ms(value: DateLike) -> int:
+    """Midnight at the start of a trading day, New York time, in epoch milliseconds"""
+    day = _to_date(value)
+    return int(datetime(day.year, day.month, day.day, tzinfo=_MARKET_ZONE).timestamp() * 1000)
+
+
+def _bounds(timestamps: np.ndarray, start_date: DateLike, end_date: DateLike) -> Tuple[int, int]:
+    """Index range of the bars from the start of `start_date` to the end of `end_date`"""
+    lo = np.searchsorted(timestamps, _day_start_ms(start_date), side="left")
+    hi = np.searchsorted(timestamps, _day_start_ms(_to_date(end_date) + timedelta(days=1)), side="left")
+    return int(lo), int(hi)
+
+
+def _atomic_save(path: str, table: np.ndarray) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp_path, path)
@@ -0,0 +1,179 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+from .bars import BAR_COLUMNS, BarSeries
+
+logger = logging.getLogger(__name__)
+
+# Bar files each process keeps mapped for reuse
+MAPPED_FILES_MAX = 256
+# DataFrame.attrs key under which frames loaded from the store carry their MappedBars
+MAPPED_BARS_ATTR = "mapped_bars"
+WRITER_LOCK_NAME = ".writer.lock"
+
+# (device, inode, size, mtime) of a bar file; atomic replacement always changes the inode
+FileIdentity = Tuple[int, int, int, int]
+
+_maps: "OrderedDict[str, Tuple[FileIdentity, np.ndarray]]" = OrderedDict()
+_maps_lock = threading.Lock()
+_thread_locks: Dict[str, threading.Lock] = {}
+
+
+@contextmanager
+def writer_lock(directory: str) -> Iterator[None]:
+    """
+    Hold the single-writer lock of a bar directory.
+
+    An exclusive flock on a lock file in the directory, so writers in every process on
+    the host (uvicorn workers, job runners) take turns, and threads within a process
+    too. Readers never take it: files are swapped in whole with `os.replace`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        with _maps_lock:
+            lock = _thread_locks.setdefault(os.path.abspath(directory), threading.Lock())
+        with lock:
+            yield
+        return
+
+    with open(os.path.join(directory, WRITER_LOCK_NAME), "a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def file_identity(path: str) -> Optional[FileIdentity]:
+    try:
+        return _identity(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def _identity(stat: os.stat_result) -> FileIdentity:
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _open_mapped(path: str) -> Tuple[FileIdentity, np.ndarray]:
+    """Map an .npy file read-only, with the identity of exactly the file that was mapped"""
+    with open(path, "rb") as f:
+        identity = _identity(os.fstat(f.fileno()))
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        # The mapping keeps its own reference to the file after it is closed
+        table = np.memmap(f, dtype=dtype, mode="r", shape=shape, order="F" if fortran_order else "C", offset=f.tell())
+    return identity, table
+
+
+def map_table(path: str) -> Optional[Tuple[FileIdentity, np.ndarray]]:
+    """
+    The current version of a bar file, memory-mapped read-only, with its identity.
+
+    Mappings are kept per process and reused while the file is unchanged, so every
+    frame loaded from it in this process views the same pages; the page cache shares
+    them with every other process mapping the file. Returns None if there is no file.
+    """
+    identity = file_identity(path)
+    if identity is None:
+        return None
+    with _maps_lock:
+        cached = _maps.get(path)
+        if cached is not None and cached[0] == identity:
+            _maps.move_to_end(path)
+            return cached
+
+    try:
+        identity, table = _open_mapped(path)
+    except FileNotFoundError:
+        return None
+    with _maps_lock:
+        _maps[path] = (identity, table)
+        _maps.move_to_end(path)
+        # Evicted mappings stay valid for as long as frames still view them
+        while len(_maps) > MAPPED_FILES_MAX:
+            _maps.popitem(last=False)
+    return identity, table
+
+
+class MappedBars:
+    """
+    Picklable reference to a range of bars in a memory-mapped bar file.
+
+    It pickles as a path and a few integers, so handing bars to a process-pool child
+    costs nothing and the child maps the same file pages instead of receiving a copy.
+    If the file has been replaced since (a writer merged newer bars in), the range is
+    found again in the new file by its first and last timestamps.
+    """
+
+    def __init__(self, path: str, identity: FileIdentity, lo: int, hi: int, first_ms: int, last_ms: int):
+        self.path = path
+        self.identity = identity
+        self.lo = lo
+        self.hi = hi
+        self.first_ms = first_ms
+        self.last_ms = last_ms
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def __repr__(self) -> str:
+        return f"MappedBars({self.path!r}, {self.lo}:{self.hi})"
+
+    def series(self) -> BarSeries:
+        """The bars, with value columns viewing the mapped file"""
+        mapped = map_table(self.path)
+        if mapped is None:
+            raise ValueError(f"Bar file {self.path} no longer exists")
+        identity, table = mapped
+        lo, hi = self.lo, self.hi
+        if identity != self.identity and hi > lo:
+            lo = int(np.searchsorted(table[0], self.first_ms, side="left"))
+            hi = int(np.searchsorted(table[0], self.last_ms, side="right"))
+        return BarSeries(table[0, lo:hi].astype(np.int64), table[1:, lo:hi])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Read-only frame over the mapped file that remembers this reference (see `shareable`)"""
+        frame = self.series().to_frame()
+        frame.attrs[MAPPED_BARS_ATTR] = self
+        return frame
+
+
+def shareable(value: Any) -> Any:
+    """
+    What to send a process-pool child in place of `value`: the MappedBars of a frame
+    that is exactly a store-backed range of bars, anything else unchanged.
+    """
+    if not isinstance(value, pd.DataFrame):
+        return value
+    mapped = value.attrs.get(MAPPED_BARS_ATTR)
+    if not isinstance(mapped, MappedBars) or len(mapped) != len(value) or "close" not in value.columns:
+        return value
+    # Frames derived from a loaded one inherit its attrs; only the original views the file
+    with _maps_lock:
+        current = _maps.get(mapped.path)
+    if current is None or current[0] != mapped.identity:
+        return value
+    close = value["close"].to_numpy()
+    expected = current[1][1 + BAR_COLUMNS.index("close"), mapped.lo:mapped.hi]
+    if close.__array_interface__["data"][0] != expected.__array_interface__["data"][0] or close.strides != expected.strides:
+        return value
+    return mapped
+
+
+def restore(value: Any) -> Any:
+    """Inverse of `shareable`, in the child: map the referenced bars as a frame"""
+    return value.to_frame() if isinstance(value, MappedBars) else value
@@ -0,0 +1,138 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "vwap", "transactions"]
+
+# Exchange time zone: trading days and daily/intraday bucket boundaries follow its wall clock
+MARKET_TIMEZONE = "America/New_York"
+
+# Initial capacity of a BarBuffer; it doubles whenever a page does not fit
+DEFAULT_CAPACITY = 4096
+
+
+class BarSeries:
+    """
+    Column-oriented OHLCV bars.
+
+    Timestamps are epoch milliseconds in a contiguous int64 array and the value columns
+    are the rows of one contiguous (len(BAR_COLUMNS), n) float64 table, so each column is
+    contiguous and `to_frame` can wrap the whole table without copying. Missing values
+    are NaN.
+    """
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray):
+        if values.shape != (len(BAR_COLUMNS), len(timestamps)):
+            raise ValueError(f"Bar values must have shape ({len(BAR_COLUMNS)}, {len(timestamps)}), got {values.shape}")
+        self.timestamps = timestamps
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[BAR_COLUMNS.index(name)]
+
+    @classmethod
+    def empty(cls) -> "BarSeries":
+        return cls(np.empty(0, dtype=np.int64), np.empty((len(BAR_COLUMNS), 0)))
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "BarSeries":
+        """Build from per-bar dicts such as PolygonService.get_stock_data returns"""
+        n = len(records)
+        timestamps = np.fromiter((record["timestamp"] for record in records), dtype=np.int64, count=n)
+        values = np.empty((len(BAR_COLUMNS), n))
+        for row, name in enumerate(BAR_COLUMNS):
+            values[row] = np.fromiter((_as_float(record.get(name)) for record in records), dtype=np.float64, count=n)
+        return cls(timestamps, values)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "BarSeries":
+        """Build from a timestamp-indexed DataFrame; absent columns are filled with NaN"""
+        timestamps = df.index.as_unit("ms").asi8.astype(np.int64)
+        values = np.full((len(BAR_COLUMNS), len(df)), np.nan)
+        for row, name in enumerate(BAR_COLUMNS):
+            if name in df.columns:
+                values[row] = df[name].to_numpy(dtype=np.float64)
+        return cls(timestamps, values)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Timestamp-indexed DataFrame whose columns are read-only views of this series.
+
+        Only the DatetimeIndex is materialized; strategies receive the bars without any
+        copy and cannot modify them in place.
+        """
+        values = self.values.view()
+        values.flags.writeable = False
+        index = pd.DatetimeIndex(self.timestamps.astype("datetime64[ms]").astype("datetime64[ns]"), name="timestamp")
+        return pd.DataFrame(values.T, index=index, columns=BAR_COLUMNS, copy=False)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Per-bar dicts, for callers that still expect PolygonService's list format"""
+        columns = [self.timestamps.tolist()] + [self.values[row].tolist() for row in range(len(BAR_COLUMNS))]
+        names = ["timestamp"] + BAR_COLUMNS
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+class BarBuffer:
+    """
+    Growable column buffers filled page by page straight from API responses.
+
+    Appending amortizes to O(1) per bar by doubling capacity; `finish` trims the
+    buffers into a BarSeries.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((len(BAR_COLUMNS), capacity))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = len(self._timestamps)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        values = np.empty((len(BAR_COLUMNS), capacity))
+        values[:, :self._size] = self._values[:, :self._size]
+        self._timestamps, self._values = timestamps, values
+
+    def append_aggs(self, aggs: Iterable[Any]) -> None:
+        """Append Polygon Agg objects (anything with timestamp/open/.../transactions attributes)"""
+        for agg in aggs:
+            self._reserve(1)
+            i = self._size
+            self._timestamps[i] = agg.timestamp
+            self._values[0, i] = _as_float(agg.open)
+            self._values[1, i] = _as_float(agg.high)
+            self._values[2, i] = _as_float(agg.low)
+            self._values[3, i] = _as_float(agg.close)
+            self._values[4, i] = _as_float(agg.volume)
+            self._values[5, i] = _as_float(agg.vwap)
+            self._values[6, i] = _as_float(agg.transactions)
+            self._size += 1
+
+    def append_columns(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append a page that is already columnar: int64 timestamps and a (len(BAR_COLUMNS), k) table"""
+        k = len(timestamps)
+        self._reserve(k)
+        self._timestamps[self._size:self._size + k] = timestamps
+        self._values[:, self._size:self._size + k] = values
+        self._size += k
+
+    def finish(self) -> BarSeries:
+        n = self._size
+        return BarSeries(self._timestamps[:n].copy(), np.ascontiguousarray(self._values[:, :n]))
+
+
+def _as_float(value: Optional[float]) -> float:
+    return np.nan if value is None else value
@@ -0,0 +1,206 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import numpy as np
+import urllib3
+import logging
+
+from .bars import BAR_COLUMNS, BarBuffer, BarSeries
+from .rate_limiter import DEFAULT_BACKOFF_SECONDS, TokenBucket, request_json
+
+logger = logging.getLogger(__name__)
+
+POLYGON_BASE_URL = "https://api.polygon.io"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_MAX_RETRIES = 5
+PAGE_LIMIT = 50000
+
+# Polygon's short keys for the aggregate fields, in BAR_COLUMNS order
+AGG_KEYS = ("o", "h", "l", "c", "v", "vw", "n")
+
+DateLike = Union[date, datetime]
+RangeRequest = Tuple[str, DateLike, DateLike]
+
+
+class FetchError(Exception):
+    """A request that failed for good, as opposed to one that returned no bars"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class PolygonBulkFetcher:
+    """
+    Fetches aggregate bars for many symbols and date ranges concurrently.
+
+    Requests share one pooled urllib3 session and a token-bucket rate limiter. 429s,
+    5xx responses and connection errors are retried with exponential backoff (honoring
+    Retry-After); anything still failing is reported as an error rather than as an
+    empty result. Every page is decoded straight into columnar buffers.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = POLYGON_BASE_URL,
+        max_concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            api_key: Polygon API key (default: POLYGON_API_KEY)
+            base_url: API root, overridable for tests
+            max_concurrency: Requests in flight at once (default: POLYGON_MAX_CONCURRENCY or 8)
+            requests_per_second: Sustained request rate (default: POLYGON_REQUESTS_PER_SECOND or 10; 0 disables)
+            max_retries: Retries per request after the first attempt
+            backoff_seconds: Delay before the first retry
+            timeout: Connect and read timeout per request in seconds
+        """
+        self.api_key = api_key or os.getenv("POLYGON_API_KEY")
+        if not self.api_key:
+            raise ValueError("POLYGON_API_KEY environment variable is not set")
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency or int(os.getenv("POLYGON_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        if requests_per_second is None:
+            requests_per_second = float(os.getenv("POLYGON_REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND))
+        self.rate_limiter = TokenBucket(requests_per_second, capacity=max(1.0, min(requests_per_second, self.max_concurrency)))
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.http = urllib3.PoolManager(
+            maxsize=self.max_concurrency,
+            block=True,
+            headers={"Authorization": f"Bearer {self.api_key}", "Accept-Encoding": "gzip"},
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=False,
+        )
+
+    def request_budget(self, seconds: float) -> Optional[int]:
+        """Requests the rate limit lets through in `seconds`, burst included (None when unlimited)"""
+        if self.rate_limiter.rate <= 0:
+            return None
+        return int(self.rate_limiter.capacity + self.rate_limiter.rate * seconds)
+
+    def fetch(
+        self,
+        symbols: Sequence[str],
+        start_date: DateLike,
+        end_date: DateLike,
+        chunk_days: Optional[int] = None,
+        timespan: str = "day",
+    ) -> Dict[str, Any]:
+        """
+        Fetch bars for many symbols over the same date range.
+
+        Args:
+            symbols: Tickers to fetch
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            chunk_days: Split the range into chunks of this many days, fetched in parallel
+            timespan: Polygon bar timespan, such as "day" or "minute"
+
+        Returns:
+            Dict with `bars` mapping each successfully fetched symbol to its BarSeries
+            (empty when Polygon has no bars for it) and `errors` mapping each failed
+            symbol to the reason.
+        """
+        requests = [
+            (symbol, chunk_start, chunk_end)
+            for symbol in symbols
+            for chunk_start, chunk_end in date_chunks(start_date, end_date, chunk_days)
+        ]
+        outcomes = self.fetch_ranges(requests, timespan)
+
+        pages: Dict[str, List[BarSeries]] = {}
+        errors: Dict[str, str] = {}
+        for (symbol, _, _), outcome in zip(requests, outcomes):
+            if isinstance(outcome, FetchError):
+                errors.setdefault(symbol, str(outcome))
+            elif symbol not in errors:
+                pages.setdefault(symbol, []).append(outcome)
+
+        bars = {}
+        for symbol, chunks in pages.items():
+            if symbol in errors:
+                continue
+            buffer = BarBuffer(capacity=max(1, sum(len(chunk) for chunk in chunks)))
+            for chunk in chunks:
+                buffer.append_columns(chunk.timestamps, chunk.values)
+            bars[symbol] = buffer.finish()
+        logger.info("Bulk fetch: %s symbols fetched, %s failed", len(bars), len(errors))
+        return {"bars": bars, "errors": errors}
+
+    def fetch_ranges(self, requests: Sequence[RangeRequest], timespan: str = "day") -> List[Union[BarSeries, FetchError]]:
+        """Fetch each (symbol, start, end) concurrently; failures are returned as FetchError in place"""
+        if not requests:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as pool:
+            return list(pool.map(lambda request: self._fetch_or_error(*request, timespan), requests))
+
+    def fetch_range(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str = "day") -> BarSeries:
+        """Fetch one symbol's bars of one `timespan` unit each, following pagination; raises FetchError"""
+        url = (
+            f"{self.base_url}/v2/aggs/ticker/{quote(symbol.upper(), safe='')}/range/1/{timespan}/"
+            f"{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
+        )
+        fields: Optional[Dict[str, Any]] = {"adjusted": "true", "sort": "asc", "limit": PAGE_LIMIT}
+        buffer = BarBuffer()
+        while url:
+            page = self._get_json(url, fields)
+            results = page.get("results") or []
+            if results:
+                try:
+                    columns = _page_columns(results)
+                except (KeyError, TypeError, ValueError) as e:
+                    raise FetchError(f"Malformed bars in response: {str(e)}", 200)
+                buffer.append_columns(*columns)
+            url = page.get("next_url")
+            fields = None  # next_url already carries the query
+        return buffer.finish()
+
+    def _fetch_or_error(self, symbol: str, start_date: DateLike, end_date: DateLike, timespan: str) -> Union[BarSeries, FetchError]:
+        try:
+            return self.fetch_range(symbol, start_date, end_date, timespan)
+        except FetchError as e:
+            logger.error("Error fetching data for %s from %s to %s: %s", symbol, start_date, end_date, e)
+            return e
+
+    def _get_json(self, url: str, fields: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Bodies that are not valid JSON (truncated or garbled in transit) are retried
+        page = request_json(self.http, self.rate_limiter, "GET", url, FetchError, self.max_retries, self.backoff_seconds, fields=fields)
+        if not isinstance(page, dict):
+            raise FetchError(f"Malformed response: expected a JSON object, got {type(page).__name__}", 200)
+        if page.get("status") == "ERROR":
+            raise FetchError(page.get("error") or page.get("message") or "Polygon returned an error", 200)
+        return page
+
+
+def _page_columns(results: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode one page of aggregates into int64 timestamps and a (len(BAR_COLUMNS), k) table"""
+    k = len(results)
+    timestamps = np.fromiter((bar["t"] for bar in results), dtype=np.int64, count=k)
+    values = np.empty((len(BAR_COLUMNS), k))
+    for row, key in enumerate(AGG_KEYS):
+        values[row] = np.fromiter((np.nan if bar.get(key) is None else bar[key] for bar in results), dtype=np.float64, count=k)
+    return timestamps, values
+
+
+def date_chunks(start_date: DateLike, end_date: DateLike, chunk_days: Optional[int]) -> List[Tuple[date, date]]:
+    """Split an inclusive date range into consecutive ranges of at most `chunk_days` days (one range when None)"""
+    start = start_date.date() if isinstance(start_date, datetime) else start_date
+    end = end_date.date() if isinstance(end_date, datetime) else end_date
+    if not chunk_days:
+        return [(start, end)]
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
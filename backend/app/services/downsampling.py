@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick `n_out` points of a series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The rest of the series is split into
+    n_out - 2 equal buckets, and from each bucket the point forming the largest
+    triangle with the previously kept point and the next bucket's average is kept,
+    which preserves peaks and troughs far better than striding.
+
+    Args:
+        values: Series to downsample, plotted against its position
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted int64 positions of the kept points; all positions if n_out >= len(values)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n, dtype=np.int64)
+
+    positions = np.arange(n, dtype=np.float64)
+    n_buckets = n_out - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+    # Averages of every bucket, plus the final point standing in for the bucket after the last one
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(positions[:-1], edges[:-1]) / counts, n - 1)
+    avg_y = np.append(np.add.reduceat(values[:-1], edges[:-1]) / counts, values[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(n_buckets):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_x, next_y = avg_x[bucket + 1], avg_y[bucket + 1]
+        area = np.abs(
+            (positions[anchor] - next_x) * (values[lo:hi] - values[anchor])
+            - (positions[anchor] - positions[lo:hi]) * (next_y - values[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
@@ -0,0 +1,157 @@
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+import logging
+
+try:
+    import numba
+except ImportError:  # optional accelerator; the NumPy kernel gives identical results
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+# Settings accepted by simulate_execution, with the values that reproduce the
+# frictionless `returns * signals` backtest
+DEFAULT_EXECUTION = {
+    "commission_bps": 0.0,
+    "slippage_bps": 0.0,
+    "position_size": 1.0,
+    "max_leverage": 1.0,
+    "allow_short": True,
+    "stop_loss": None,
+    "take_profit": None,
+}
+
+
+def normalize_execution(settings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate execution settings and fill in defaults; raises ValueError"""
+    settings = dict(settings or {})
+    unknown = set(settings) - set(DEFAULT_EXECUTION)
+    if unknown:
+        raise ValueError(f"Unknown execution settings: {', '.join(sorted(unknown))}")
+    merged = {**DEFAULT_EXECUTION, **{name: value for name, value in settings.items() if value is not None}}
+    for name in ("commission_bps", "slippage_bps", "position_size", "max_leverage"):
+        if not math.isfinite(merged[name]) or merged[name] < 0:
+            raise ValueError(f"{name} must be a non-negative number")
+    for name in ("stop_loss", "take_profit"):
+        if merged[name] is not None and not merged[name] > 0:
+            raise ValueError(f"{name} must be a positive fraction")
+    return merged
+
+
+def simulate_execution(close: np.ndarray, signals: np.ndarray, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Walk a strategy's signals through a bar-by-bar execution model.
+
+    The position held over bar t (from close t-1 to close t) is the signal at t scaled
+    by `position_size`, capped at `max_leverage` times equity and floored at zero unless
+    `allow_short`. Every change in position costs `commission_bps + slippage_bps` of the
+    notional traded, charged on the bar the new position is first held. A trade is a
+    run of bars with the same target; it is closed at the first close that is
+    `stop_loss` below or `take_profit` above its entry price (the close before its first
+    bar), and stays flat until the signal changes.
+
+    With the default settings the strategy returns are exactly `returns * signals`.
+
+    Args:
+        close: Close prices, shape (n,)
+        signals: Target positions per bar, shape (n,)
+        settings: Execution settings (see DEFAULT_EXECUTION)
+
+    Returns:
+        Dict with `positions` held per bar, per-bar `strategy_returns` (NaN on the first
+        bar) and `turnover`, the number of `trades` entered and the total `costs`
+    """
+    settings = normalize_execution(settings)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    target = np.asarray(signals, dtype=np.float64) * settings["position_size"]
+    if len(close) != len(target):
+        raise ValueError("close and signals must have the same length")
+    target = np.clip(target, 0.0 if not settings["allow_short"] else -settings["max_leverage"], settings["max_leverage"])
+
+    stop_loss = settings["stop_loss"] if settings["stop_loss"] is not None else math.inf
+    take_profit = settings["take_profit"] if settings["take_profit"] is not None else math.inf
+    cost_rate = (settings["commission_bps"] + settings["slippage_bps"]) / 1e4
+
+    kernel = _simulate_jit if _simulate_jit is not None else _simulate_numpy
+    positions, strategy_returns, turnover, trades = kernel(close, np.ascontiguousarray(target), stop_loss, take_profit, cost_rate)
+    return {
+        "positions": positions,
+        "strategy_returns": strategy_returns,
+        "turnover": turnover,
+        "trades": int(trades),
+        "costs": float(turnover.sum() * cost_rate),
+    }
+
+
+def _simulate_loop(close, target, stop_loss, take_profit, cost_rate):
+    """Reference bar-by-bar kernel; compiled with numba when it is installed"""
+    n = close.shape[0]
+    positions = np.empty(n)
+    strategy_returns = np.empty(n)
+    turnover = np.zeros(n)
+    trades = 0
+    if n == 0:
+        return positions, strategy_returns, turnover, trades
+    positions[0] = target[0]
+    strategy_returns[0] = np.nan
+
+    held = 0.0
+    entry = 0.0
+    stopped = False
+    for t in range(1, n):
+        if t == 1 or target[t] != target[t - 1]:
+            entry = close[t - 1]
+            stopped = False
+            if target[t] != 0:
+                trades += 1
+        position = 0.0 if stopped else target[t]
+        turnover[t] = abs(position - held)
+        strategy_returns[t] = position * (close[t] / close[t - 1] - 1) - turnover[t] * cost_rate
+        if position != 0:
+            direction = 1.0 if position > 0 else -1.0
+            move = direction * (close[t] / entry - 1)
+            if move <= -stop_loss or move >= take_profit:
+                stopped = True
+        positions[t] = position
+        held = position
+    return positions, strategy_returns, turnover, trades
+
+
+_simulate_jit = numba.njit(cache=True, nogil=True)(_simulate_loop) if numba is not None else None
+
+
+def _simulate_numpy(close, target, stop_loss, take_profit, cost_rate):
+    """Vectorized equivalent of `_simulate_loop`, bit for bit"""
+    n = close.shape[0]
+    positions = target.copy()
+    strategy_returns = np.empty(n)
+    turnover = np.zeros(n)
+    if n == 0:
+        return positions, strategy_returns, turnover, 0
+    strategy_returns[0] = np.nan
+    if n == 1:
+        return positions, strategy_returns, turnover, 0
+
+    # Trades are the runs of constant target from bar 1 on
+    starts = np.flatnonzero(target[2:] != target[1:-1]) + 2
+    starts = np.concatenate(([1], starts))
+    trades = int(np.count_nonzero(target[starts]))
+
+    if math.isfinite(stop_loss) or math.isfinite(take_profit):
+        lengths = np.diff(np.append(starts, n))
+        entry = np.repeat(close[starts - 1], lengths)
+        held = positions[1:]
+        with np.errstate(invalid="ignore"):
+            move = np.sign(held) * (close[1:] / entry - 1)
+        hit = (held != 0) & ((move <= -stop_loss) | (move >= take_profit))
+        # First stop bar of each run; bars after it are flat
+        hit_bar = np.where(hit, np.arange(1, n), n)
+        first_hit = np.repeat(np.minimum.reduceat(hit_bar, starts - 1), lengths)
+        positions[1:] = np.where(np.arange(1, n) > first_hit, 0.0, held)
+
+    turnover[1] = abs(positions[1])
+    np.abs(positions[2:] - positions[1:-1], out=turnover[2:])
+    strategy_returns[1:] = positions[1:] * (close[1:] / close[:-1] - 1) - turnover[1:] * cost_rate
+    return positions, strategy_returns, turnover, trades
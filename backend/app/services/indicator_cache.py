@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .indicators import ema, sma
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+# Rough cost of the key tuple and bookkeeping around each cached array
+ENTRY_OVERHEAD_BYTES = 256
+
+IndicatorKey = Tuple[str, str, Hashable]
+ColumnFunction = Callable[[np.ndarray, List[Any]], np.ndarray]
+
+
+def array_fingerprint(values: np.ndarray) -> str:
+    """Content hash of a price array: shape and float64 values"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(values.shape).encode())
+    digest.update(values.view(np.uint8))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Process-wide LRU of indicator series, keyed by (input fingerprint, indicator, setting).
+
+    Each setting (an SMA window, an EMA alpha, an RSI period) is cached as its own
+    column, so strategies that share an indicator share its computation: the SMA
+    strategy's 20-bar average is the one momentum regression reads, and a sweep over
+    window pairs computes every window once. Memory is bounded by `max_bytes`
+    (INDICATOR_CACHE_MAX_BYTES); cached arrays are read-only and never handed out.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("INDICATOR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self._entries: "OrderedDict[IndicatorKey, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def columns(self, values: np.ndarray, indicator: str, settings: Sequence[Hashable], compute: ColumnFunction) -> np.ndarray:
+        """
+        Indicator columns of `values` for every setting, computing only the uncached ones.
+
+        Args:
+            values: Prices along axis 0, shape (n,) or (n, m)
+            indicator: Name that, with a setting, identifies the computation
+            settings: Hashable settings, one output column each
+            compute: compute(values, missing_settings) returning an array of shape
+                values.shape + (len(missing_settings),)
+
+        Returns:
+            A new array of shape values.shape + (len(settings),)
+        """
+        fingerprint = array_fingerprint(values)
+        found: Dict[Hashable, np.ndarray] = {}
+        with self._lock:
+            for setting in settings:
+                key = (fingerprint, indicator, setting)
+                column = self._entries.get(key)
+                if column is not None:
+                    self._entries.move_to_end(key)
+                    found[setting] = column
+            self.hits += len(found)
+            missing = list(dict.fromkeys(setting for setting in settings if setting not in found))
+            self.misses += len(missing)
+
+        if missing:
+            logger.debug("Computing %s for %s uncached settings", indicator, len(missing))
+            computed = compute(values, missing)
+            with self._lock:
+                for position, setting in enumerate(missing):
+                    column = np.array(computed[..., position])
+                    column.flags.writeable = False
+                    found[setting] = column
+                    self._insert((fingerprint, indicator, setting), column)
+
+        return np.stack([found[setting] for setting in settings], axis=-1)
+
+    def _insert(self, key: IndicatorKey, column: np.ndarray) -> None:
+        size = column.nbytes + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key).nbytes + ENTRY_OVERHEAD_BYTES
+        self._entries[key] = column
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every strategy in the process (each pool worker has its own)
+indicator_cache = IndicatorCache()
+
+
+def cached_sma(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """`sma(values, windows)` through the shared indicator cache"""
+    return indicator_cache.columns(values, "sma", [int(window) for window in windows], sma)
+
+
+def cached_ema(values: np.ndarray, alphas: Sequence[float]) -> np.ndarray:
+    """`ema(values, alphas)` through the shared indicator cache"""
+    return indicator_cache.columns(values, "ema", [float(alpha) for alpha in np.atleast_1d(alphas)], ema)
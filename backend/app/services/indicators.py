@@ -0,0 +1,230 @@
+import numpy as np
+from typing import Sequence, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bars per block in the EMA scan. Each block is solved with one small matrix
+# product per alpha; only the hand-off between blocks is sequential.
+EMA_BLOCK_SIZE = 64
+# Relative gap under which two EMAs count as equal. The blocked scan carries rounding
+# error of a few ulps, so without it flat prices produce spurious crossovers.
+EMA_TIE_TOLERANCE = 1e-12
+# Averaging of gains and losses supported by `rsi`
+RSI_METHODS = ("sma", "wilder")
+
+Windows = Union[int, Sequence[int], np.ndarray]
+
+
+def sma(values: np.ndarray, windows: Windows) -> np.ndarray:
+    """
+    Simple moving averages for several window lengths from a single cumulative sum.
+
+    Matches `Series.rolling(window).mean()`: a window containing NaN is NaN, the
+    first window - 1 rows are NaN, and a window over a run of identical values
+    returns that value exactly.
+
+    Args:
+        values: Prices along axis 0, shape (n,) or (n, m)
+        windows: Window lengths
+
+    Returns:
+        Array of shape values.shape + (len(windows),)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = _as_windows(windows)
+    n = values.shape[0]
+    out_shape = values.shape + (len(windows),)
+    if n == 0:
+        return np.empty(out_shape)
+
+    missing = np.isnan(values)
+    # Cumulating deviations from the first value keeps the running sums small.
+    offset = np.where(missing[0], 0.0, values[0])
+    centered = np.where(missing, 0.0, values - offset)
+    zeros = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(centered, axis=0)])
+    nan_counts = np.concatenate([zeros, np.cumsum(missing, axis=0)])
+
+    rows = np.arange(n)[:, None]
+    lagged = np.maximum(rows + 1 - windows[None, :], 0)  # (n, k)
+    leading = rows + 1
+    window_sums = sums[leading] - sums[lagged]  # (n, k, ...)
+    window_nans = nan_counts[leading] - nan_counts[lagged]
+    means = window_sums / windows.reshape((1, -1) + (1,) * (values.ndim - 1)) + offset
+
+    means = np.moveaxis(means, 1, -1)
+    window_nans = np.moveaxis(window_nans, 1, -1)
+    means[(window_nans > 0) | (np.arange(n).reshape((n,) + (1,) * values.ndim) < windows - 1)] = np.nan
+
+    run_length = _run_lengths(values)
+    constant = run_length[..., None] >= windows
+    return np.where(constant, values[..., None], means)
+
+
+def ema(values: np.ndarray, alphas: Union[float, Sequence[float], np.ndarray]) -> np.ndarray:
+    """
+    Exponential moving averages for several smoothing factors at once.
+
+    Computes `Series.ewm(alpha=a, adjust=False).mean()` for every alpha: the first row
+    equals the first value and y[t] = (1 - a) * y[t - 1] + a * x[t]. The recursion is
+    evaluated in blocks of EMA_BLOCK_SIZE bars, each a matrix product over all alphas,
+    so the Python-level loop runs once per block rather than once per bar.
+
+    Args:
+        values: Finite prices along axis 0, shape (n,) or (n, m)
+        alphas: Smoothing factors in (0, 1]
+
+    Returns:
+        Array of shape values.shape + (len(alphas),)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+    if alphas.ndim != 1 or np.any(alphas <= 0) or np.any(alphas > 1):
+        raise ValueError("EMA smoothing factors must lie in (0, 1]")
+
+    n = values.shape[0]
+    trailing = values.shape[1:]
+    k = len(alphas)
+    if n == 0:
+        return np.empty(values.shape + (k,))
+
+    flat = values.reshape(n, -1)  # (n, M)
+    block = min(EMA_BLOCK_SIZE, n)
+    n_blocks = -(-n // block)
+    padded = np.empty((n_blocks * block, flat.shape[1]))
+    padded[:n] = flat
+    padded[n:] = flat[-1]
+    blocks = padded.reshape(n_blocks, block, -1)  # (b, B, M)
+
+    decay = 1.0 - alphas
+    lags = np.arange(block)
+    # transfer[a, j, i] = alpha * decay ** (j - i) for i <= j
+    lag_matrix = lags[:, None] - lags[None, :]
+    transfer = np.where(lag_matrix >= 0, alphas[:, None, None] * decay[:, None, None] ** np.maximum(lag_matrix, 0), 0.0)
+    local = np.einsum("aji,bim->bjma", transfer, blocks)  # zero-start response per block
+    carry_weights = decay[None, :] ** (lags[:, None] + 1)  # (B, k)
+
+    result = np.empty_like(local)
+    state = np.broadcast_to(flat[0][:, None], (flat.shape[1], k))  # seeding with x[0] makes y[0] == x[0]
+    for b in range(n_blocks):
+        result[b] = local[b] + carry_weights[:, None, :] * state[None, :, :]
+        state = result[b, -1]
+
+    result = result.reshape(n_blocks * block, -1, k)[:n]
+    result[0] = flat[0][:, None]
+    return result.reshape(values.shape + (k,))
+
+
+def crossover_signals(fast: np.ndarray, slow: np.ndarray, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Long/short signals for every (fast, slow) indicator pair by broadcasting.
+
+    Args:
+        fast: Indicators of shape (..., k_fast)
+        slow: Indicators of shape (..., k_slow)
+        tolerance: Relative difference up to which a pair counts as equal
+
+    Returns:
+        int8 array of shape (..., k_fast, k_slow): 1 where fast > slow, -1 where
+        fast < slow, 0 where they are equal or either is NaN.
+    """
+    fast = np.asarray(fast)[..., :, None]
+    slow = np.asarray(slow)[..., None, :]
+    signals = (fast > slow).astype(np.int8)
+    signals -= (fast < slow).astype(np.int8)
+    if tolerance > 0:
+        signals[np.abs(fast - slow) <= tolerance * np.maximum(np.abs(fast), np.abs(slow))] = 0
+    return signals
+
+
+def ema_alpha(span: Union[float, np.ndarray], smoothing: float = 2) -> Union[float, np.ndarray]:
+    """Smoothing factor smoothing / (1 + span) used by the EMA strategy"""
+    return smoothing / (1 + np.asarray(span, dtype=np.float64))
+
+
+def rsi(values: np.ndarray, periods: Windows, method: str = "sma") -> np.ndarray:
+    """
+    Relative strength index for several periods at once.
+
+    Gains and losses are averaged together, for every period, in one pass:
+
+    - "sma" matches the simple-average `calculate_rsi` the RSI strategy has always used:
+      the first bar (and any bar next to a missing price) counts as a zero change,
+      rows before the first full window are NaN, and a window without gains or losses
+      averages to exactly zero.
+    - "wilder" is Wilder's smoothing: the first average is the mean of the first
+      `period` price changes, then avg[t] = avg[t - 1] + (change[t] - avg[t - 1]) / period.
+      Rows before the first average are NaN.
+
+    RSI is NaN where the window has neither gains nor losses, and 100 where it has
+    only gains.
+
+    Args:
+        values: Prices along axis 0, shape (n,) or (n, m)
+        periods: Averaging periods
+        method: "sma" or "wilder"
+
+    Returns:
+        Array of shape values.shape + (len(periods),)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    periods = _as_windows(periods, "RSI periods")
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method {method}; choose one of {', '.join(RSI_METHODS)}")
+    n = values.shape[0]
+    if n == 0:
+        return np.empty(values.shape + (len(periods),))
+
+    # Gains and losses side by side on a trailing axis, so both are averaged together
+    changes = np.zeros(values.shape + (2,))
+    delta = values[1:] - values[:-1]
+    np.maximum(delta, 0.0, out=changes[1:, ..., 0], where=~np.isnan(delta))
+    np.maximum(-delta, 0.0, out=changes[1:, ..., 1], where=~np.isnan(delta))
+
+    if method == "sma":
+        # Averages of non-negative values; clamp the cumulative-sum residue below zero
+        averages = np.maximum(sma(changes, periods), 0.0)  # (..., 2, k)
+    else:
+        averages = np.full(changes.shape + (len(periods),), np.nan)
+        for column, period in enumerate(periods):
+            if period >= n:
+                continue
+            # Seed the recursion with the first window's mean, then run it as an EMA
+            smoothed = changes[period:].copy()
+            smoothed[0] = changes[1:period + 1].mean(axis=0)
+            averages[period:, ..., column] = ema(smoothed, 1.0 / period)[..., 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + averages[..., 0, :] / averages[..., 1, :])
+
+
+def threshold_signals(values: np.ndarray, upper: Union[float, Sequence[float]], lower: Union[float, Sequence[float]]) -> np.ndarray:
+    """
+    Mean-reversion signals for every (upper, lower) threshold pair by broadcasting.
+
+    Returns:
+        int8 array of shape values.shape + (len(upper), len(lower)): -1 above the upper
+        threshold, 1 below the lower one (upper wins where both hold), 0 otherwise or NaN.
+    """
+    values = np.asarray(values)[..., None, None]
+    upper = np.atleast_1d(np.asarray(upper, dtype=np.float64))[:, None]
+    lower = np.atleast_1d(np.asarray(lower, dtype=np.float64))[None, :]
+    return np.where(values > upper, -1, np.where(values < lower, 1, 0)).astype(np.int8)
+
+
+def _as_windows(windows: Windows, name: str = "Moving average windows") -> np.ndarray:
+    windows = np.atleast_1d(np.asarray(windows))
+    if windows.ndim != 1 or not np.issubdtype(windows.dtype, np.integer) or np.any(windows < 1):
+        raise ValueError(f"{name} must be positive integers")
+    return windows.astype(np.int64)
+
+
+def _run_lengths(values: np.ndarray) -> np.ndarray:
+    """Length of the run of identical values ending at each row, per column"""
+    n = values.shape[0]
+    rows = np.arange(n).reshape((n,) + (1,) * (values.ndim - 1))
+    changed = np.ones(values.shape, dtype=bool)
+    changed[1:] = values[1:] != values[:-1]
+    run_start = np.maximum.accumulate(np.where(changed, rows, 0), axis=0)
+    return rows - run_start + 1
@@ -0,0 +1,129 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages timed on every backtest
+STAGES = ("fetch", "frame", "strategy", "metrics", "serialize")
+# Histogram upper bounds in seconds, from a cache hit to a multi-year minute-bar backtest
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage durations of the request being served, when one is being collected
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with one label, rendered in the Prometheus text format.
+
+    Observations land in per-label bucket counts under a lock; nothing is kept per
+    observation, so memory is bounded by the number of label values.
+    """
+
+    def __init__(self, name: str, documentation: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self._counts.get(label_value)
+            if counts is None:
+                # One slot per bucket plus +Inf
+                counts = self._counts[label_value] = [0] * (len(self.buckets) + 1)
+                self._sums[label_value] = 0.0
+            counts[position] += 1
+            self._sums[label_value] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Observation count and total seconds per label value"""
+        with self._lock:
+            return {value: {"count": sum(counts), "sum": self._sums[value]} for value, counts in self._counts.items()}
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(value, list(counts), self._sums[value]) for value, counts in sorted(self._counts.items())]
+        for value, counts, total in items:
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+stage_seconds = Histogram("backtest_stage_seconds", "Time spent in each backtest pipeline stage", "stage")
+
+
+def record(stage: str, seconds: float) -> None:
+    """Add a stage duration to the histogram and to the current request's timings"""
+    stage_seconds.observe(stage, seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def merge(timings: Dict[str, float]) -> None:
+    """Record stage durations measured elsewhere, e.g. in a process-pool worker"""
+    for stage, seconds in timings.items():
+        record(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`, whether or not it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def collecting() -> Iterator[Dict[str, float]]:
+    """Collect the stage durations recorded in this context (and threads started from it) into a dict"""
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def call_collecting(func: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, float]]:
+    """
+    Call func(*args) and return its result with the stage durations it recorded.
+
+    Process-pool entry point: a worker's histograms are never scraped, so the parent
+    merges the returned timings into its own.
+    """
+    with collecting() as timings:
+        result = func(*args)
+    return result, timings
+
+
+def server_timing(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """Server-Timing header value with each stage's duration in milliseconds"""
+    entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    return stage_seconds.render()
@@ -0,0 +1,310 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Set
+from zoneinfo import ZoneInfo
+import logging
+
+from sqlalchemy.orm import Session
+
+from ..models.backtest import BacktestResult
+from .backtest_executor import BacktestExecutor, ExecutorBusyError, run_backtest_job
+from .bars import MARKET_TIMEZONE
+from .metrics import POSITION_METRICS, RETURN_METRICS
+from .resampling import DEFAULT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_FETCHING = "fetching"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_FETCHING, JOB_RUNNING)
+TERMINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+# Result fields without a column of their own, kept in the results JSON
+STORED_RESULT_KEYS = tuple(
+    name for name in RETURN_METRICS + POSITION_METRICS if name not in ("total_return", "sharpe_ratio", "max_drawdown")
+) + ("trades", "costs")
+
+# How long a queued job waits before retrying when every compute slot is busy
+BUSY_RETRY_SECONDS = 1.0
+# Jobs are not bound by an HTTP connection, so they get a longer compute budget than /run
+DEFAULT_JOB_TIMEOUT_SECONDS = 3600.0
+# Each process confirms the jobs it runs this often; another process fails a job whose
+# confirmation is older than JOB_STALE_SECONDS, as its owner must have died
+JOB_HEARTBEAT_SECONDS = 10.0
+JOB_STALE_SECONDS = 60.0
+# A completed job is served again for identical requests for this long at most, so
+# later corrections to the bars are picked up
+COMPLETED_JOB_REUSE_SECONDS = 86400.0
+
+_MARKET_ZONE = ZoneInfo(MARKET_TIMEZONE)
+
+
+def request_hash(
+    symbol: str,
+    start_date: datetime,
+    end_date: datetime,
+    strategy_name: str,
+    parameters: Dict[str, Any],
+    execution: Optional[Dict[str, Any]] = None,
+    interval: str = DEFAULT_INTERVAL,
+) -> str:
+    """Stable hash of everything that determines a backtest's result"""
+    request = {
+        "symbol": symbol.upper(),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "strategy_name": strategy_name,
+        "parameters": parameters,
+    }
+    # Only hashed when given, so jobs submitted without these options keep their keys
+    if execution is not None:
+        request["execution"] = execution
+    if interval != DEFAULT_INTERVAL:
+        request["interval"] = interval
+    payload = json.dumps(
+        request,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JobService:
+    """
+    Runs backtests as background jobs and keeps their state in the backtest_results table.
+
+    A submitted job moves through queued -> fetching -> running -> completed (or failed).
+    Submitting a request identical to a queued or running job returns that job instead of
+    starting a new one. A completed job is only returned while its results are final (see
+    `_reusable`); failed jobs are not reused so they can be retried.
+
+    Several processes (uvicorn workers, a server being replaced by a rolling restart)
+    may share the table. Each job records the process running it, which keeps its
+    heartbeat fresh while it is alive; `recover` only fails jobs whose owner is gone.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], executor: BacktestExecutor, polygon_service):
+        self.session_factory = session_factory
+        self.executor = executor
+        self.polygon_service = polygon_service
+        self.timeout = float(os.getenv("BACKTEST_JOB_TIMEOUT_SECONDS", DEFAULT_JOB_TIMEOUT_SECONDS))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._submit_lock = asyncio.Lock()
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Ids of this process's jobs that still have a task; guarded so `recover` never
+        # sees a job between its insert and its registration here
+        self._running: Set[int] = set()
+        self._running_lock = threading.Lock()
+
+    def recover(self) -> int:
+        """
+        Fail active jobs that no process is running any more: this process's jobs whose
+        task is gone, and other processes' jobs whose heartbeat is older than
+        JOB_STALE_SECONDS (or missing, for jobs from before heartbeats were recorded).
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        with self._running_lock, self.session_factory() as session:
+            active = session.query(BacktestResult).filter(BacktestResult.status.in_(ACTIVE_STATUSES)).all()
+            orphaned = [
+                job for job in active
+                if (job.id not in self._running if job.owner == self.owner else job.heartbeat_at is None or job.heartbeat_at < stale_before)
+            ]
+            for job in orphaned:
+                job.status = JOB_FAILED
+                job.error = "Interrupted by a server restart"
+                job.completed_at = datetime.utcnow()
+            session.commit()
+        if orphaned:
+            logger.warning("Marked %s interrupted backtest jobs as failed", len(orphaned))
+        return len(orphaned)
+
+    def start_heartbeat(self) -> None:
+        """Keep this process's jobs marked alive, and recover other processes' dead ones, until `stop_heartbeat`"""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._beat_periodically())
+
+    def stop_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def beat(self) -> None:
+        """Mark the jobs this process is running as alive now"""
+        with self._running_lock:
+            running = list(self._running)
+        if not running:
+            return
+        with self.session_factory() as session:
+            session.query(BacktestResult).filter(
+                BacktestResult.id.in_(running), BacktestResult.owner == self.owner
+            ).update({BacktestResult.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            session.commit()
+
+    async def _beat_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.beat)
+                await asyncio.to_thread(self.recover)
+            except Exception:
+                logger.exception("Backtest job heartbeat failed")
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+
+    async def submit(
+        self,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        strategy_name: str,
+        parameters: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None,
+        interval: str = DEFAULT_INTERVAL,
+    ) -> Dict[str, Any]:
+        """Queue a backtest, or return the existing job for an identical request"""
+        key = request_hash(symbol, start_date, end_date, strategy_name, parameters, execution, interval)
+        async with self._submit_lock:
+            job, created = await asyncio.to_thread(self._find_or_create, key, symbol, start_date, end_date, strategy_name, parameters)
+
+        if created:
+            logger.info("Queued backtest job %s for %s with strategy %s", job['job_id'], symbol, strategy_name)
+            task = asyncio.create_task(self._run(job["job_id"], symbol, start_date, end_date, strategy_name, parameters, execution, interval))
+            # Also called for a task cancelled before it started, which never reaches _run's finally
+            task.add_done_callback(functools.partial(self._release, job["job_id"]))
+            self._tasks[job["job_id"]] = task
+        else:
+            logger.info("Reusing backtest job %s (%s) for an identical request", job['job_id'], job['status'])
+        job["deduplicated"] = not created
+        return job
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job's status, progress and, once completed, its results"""
+        with self.session_factory() as session:
+            job = session.get(BacktestResult, job_id)
+            return _job_to_dict(job) if job is not None else None
+
+    def _find_or_create(self, key: str, symbol: str, start_date: datetime, end_date: datetime, strategy_name: str, parameters: Dict[str, Any]):
+        with self._running_lock, self.session_factory() as session:
+            existing = (
+                session.query(BacktestResult)
+                .filter(BacktestResult.request_hash == key, BacktestResult.status != JOB_FAILED)
+                .order_by(BacktestResult.id.desc())
+                .first()
+            )
+            if existing is not None and (existing.status != JOB_COMPLETED or _reusable(existing, datetime.utcnow())):
+                return _job_to_dict(existing), False
+
+            job = BacktestResult(
+                symbol=symbol,
+                strategy_name=strategy_name,
+                start_date=start_date,
+                end_date=end_date,
+                parameters=parameters,
+                request_hash=key,
+                status=JOB_QUEUED,
+                progress=0.0,
+                created_at=datetime.utcnow(),
+                owner=self.owner,
+                heartbeat_at=datetime.utcnow(),
+            )
+            session.add(job)
+            session.commit()
+            self._running.add(job.id)
+            return _job_to_dict(job), True
+
+    def _release(self, job_id: int, task: asyncio.Task) -> None:
+        with self._running_lock:
+            self._running.discard(job_id)
+
+    def _update(self, job_id: int, **fields: Any) -> None:
+        with self.session_factory() as session:
+            job = session.get(BacktestResult, job_id)
+            for name, value in fields.items():
+                setattr(job, name, value)
+            session.commit()
+
+    async def _run(
+        self,
+        job_id: int,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        strategy_name: str,
+        parameters: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None,
+        interval: str = DEFAULT_INTERVAL,
+    ) -> None:
+        try:
+            await asyncio.to_thread(self._update, job_id, status=JOB_FETCHING, progress=0.1)
+            data = await self.executor.run_io(self.polygon_service.get_stock_bars, symbol, start_date, end_date, interval)
+            if data.empty:
+                raise ValueError(f"No data found for symbol {symbol} between {start_date} and {end_date}")
+
+            await asyncio.to_thread(self._update, job_id, status=JOB_RUNNING, progress=0.5)
+            while True:
+                try:
+                    results = await self.executor.run_compute(run_backtest_job, data, strategy_name, parameters, execution, timeout=self.timeout)
+                    break
+                except ExecutorBusyError:
+                    await asyncio.sleep(BUSY_RETRY_SECONDS)
+
+            await asyncio.to_thread(
+                self._update,
+                job_id,
+                status=JOB_COMPLETED,
+                progress=1.0,
+                total_return=results["total_return"],
+                sharpe_ratio=results["sharpe_ratio"],
+                max_drawdown=results["max_drawdown"],
+                results={
+                    "strategy_display_name": results["strategy_display_name"],
+                    "signals": results["signals"].tolist(),
+                    "equity_curve": results["equity_curve"].tolist(),
+                    **{key: value for key, value in results.items() if key in STORED_RESULT_KEYS},
+                },
+                completed_at=datetime.utcnow(),
+            )
+            logger.info("Backtest job %s completed", job_id)
+        except Exception as e:
+            logger.exception("Backtest job %s failed", job_id)
+            error = "Backtest did not finish in time" if isinstance(e, TimeoutError) else str(e)
+            await asyncio.to_thread(self._update, job_id, status=JOB_FAILED, error=error, completed_at=datetime.utcnow())
+        finally:
+            self._tasks.pop(job_id, None)
+
+
+def _reusable(job: BacktestResult, now: datetime) -> bool:
+    """
+    Whether a completed job still answers its request: it ran after the last New York
+    trading day of its range was over, so no bar it used was still forming, and less
+    than COMPLETED_JOB_REUSE_SECONDS ago
+    """
+    if job.completed_at is None or job.end_date is None:
+        return False
+    completed_day = job.completed_at.replace(tzinfo=timezone.utc).astimezone(_MARKET_ZONE).date()
+    return job.end_date.date() < completed_day and now - job.completed_at < timedelta(seconds=COMPLETED_JOB_REUSE_SECONDS)
+
+
+def _job_to_dict(job: BacktestResult) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "symbol": job.symbol,
+        "strategy_name": job.strategy_name,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "total_return": job.total_return,
+        "sharpe_ratio": job.sharpe_ratio,
+        "max_drawdown": job.max_drawdown,
+        "results": job.results,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+    }
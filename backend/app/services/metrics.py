@@ -0,0 +1,199 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .bars import MARKET_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_PERIODS_PER_YEAR = TRADING_DAYS_PER_YEAR
+
+# Scalar metrics computed from returns alone, and the ones that also need positions
+RETURN_METRICS = (
+    "total_return",
+    "cagr",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "calmar_ratio",
+    "max_drawdown_duration",
+    "win_rate",
+)
+POSITION_METRICS = ("turnover", "exposure")
+
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+
+def infer_periods_per_year(index: pd.Index) -> float:
+    """
+    Bars per year implied by the spacing of a timestamp index.
+
+    Daily bars give TRADING_DAYS_PER_YEAR. Intraday bars give that times the median
+    number of bars per trading day, a New York calendar day as in the bar cache and the
+    resampler (a timezone-naive index is UTC), so after-hours bars past midnight UTC
+    count towards their own session. Bars spaced further apart than a couple of days
+    (weekly, monthly) are annualized by calendar time.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return DEFAULT_PERIODS_PER_YEAR
+    stamps = index.as_unit("ns").asi8
+    spacing = float(np.median(np.diff(stamps)))
+    if spacing <= 0:
+        return DEFAULT_PERIODS_PER_YEAR
+    if spacing < NANOSECONDS_PER_DAY:
+        utc = index if index.tz is not None else index.tz_localize("UTC")
+        local = utc.tz_convert(MARKET_TIMEZONE).tz_localize(None).as_unit("ns").asi8
+        _, bars_per_day = np.unique(local // NANOSECONDS_PER_DAY, return_counts=True)
+        return TRADING_DAYS_PER_YEAR * float(np.median(bars_per_day))
+    if spacing < 2 * NANOSECONDS_PER_DAY:
+        return TRADING_DAYS_PER_YEAR
+    return 365.25 * NANOSECONDS_PER_DAY / spacing
+
+
+def compute_metrics(
+    returns: np.ndarray,
+    positions: Optional[np.ndarray] = None,
+    periods_per_year: float = DEFAULT_PERIODS_PER_YEAR,
+    rolling_window: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Every performance metric of a returns series, or of each column of a returns matrix.
+
+    The equity curve is compounded once and drawdowns, ratios and durations are all
+    derived from it and from shared column sums, so a (time x strategy) matrix of sweep
+    combinations or portfolio symbols costs a handful of vectorized passes. NaN returns
+    (bars before a series starts) are skipped.
+
+    Args:
+        returns: Per-bar returns, shape (n,) or (n, m)
+        positions: Positions held per bar, same shape, for `turnover` and `exposure`
+        periods_per_year: Bars per year used to annualize (see `infer_periods_per_year`)
+        rolling_window: Also return the Sharpe ratio over a trailing window of this many bars
+
+    Returns:
+        Dict with the RETURN_METRICS (and POSITION_METRICS when positions are given) as
+        floats for a series or (m,) arrays for a matrix, plus the `equity_curve` and
+        `drawdown` series and, when asked for, `rolling_sharpe`. Undefined ratios are 0;
+        `max_drawdown_duration` counts bars below the previous peak.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    single = returns.ndim == 1
+    if single:
+        returns = returns[:, None]
+    n, m = returns.shape
+
+    missing = np.isnan(returns)
+    counts = (~missing).sum(axis=0)
+    filled = np.where(missing, 0.0, returns)
+    annualization = np.sqrt(periods_per_year)
+
+    equity = np.cumprod(1.0 + filled, axis=0)
+    final = equity[-1] if n else np.ones(m)
+    peak = np.maximum.accumulate(equity, axis=0)
+    drawdown = equity / peak - 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=0) / counts
+        deviations = np.where(missing, 0.0, returns - mean)
+        std = np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1))
+        downside = np.sqrt((np.minimum(filled, 0.0) ** 2).sum(axis=0) / counts)
+        sharpe = annualization * mean / std
+        sortino = annualization * mean / downside
+        cagr = np.where(final > 0, final ** (periods_per_year / counts) - 1, -1.0)
+    defined = counts >= 2
+    sharpe = np.where(defined & (std > 0), sharpe, 0.0)
+    sortino = np.where(defined & (downside > 0), sortino, 0.0)
+    volatility = np.where(defined, std * annualization, 0.0)
+    cagr = np.where(counts > 0, cagr, 0.0)
+
+    max_drawdown = drawdown.min(axis=0, initial=0.0)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        calmar = np.where(max_drawdown < 0, cagr / -max_drawdown, 0.0)
+
+    # Bars since the equity curve last stood at its running peak
+    rows = np.arange(n)[:, None]
+    last_peak = np.maximum.accumulate(np.where(drawdown >= 0, rows, -1), axis=0)
+    max_drawdown_duration = (rows - last_peak).max(axis=0, initial=0)
+
+    trading = (filled != 0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(trading > 0, (filled > 0).sum(axis=0) / trading, 0.0)
+
+    metrics: Dict[str, Any] = {
+        "total_return": final - 1,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "max_drawdown": max_drawdown,
+        "calmar_ratio": calmar,
+        "max_drawdown_duration": max_drawdown_duration,
+        "win_rate": win_rate,
+    }
+
+    if positions is not None:
+        positions = np.nan_to_num(np.asarray(positions, dtype=np.float64), nan=0.0)
+        if single:
+            positions = positions[:, None]
+        if positions.shape != returns.shape:
+            raise ValueError("positions must have the same shape as returns")
+        traded = np.abs(np.diff(positions, axis=0, prepend=0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Average notional traded per bar, annualized, and the share of bars in the market
+            metrics["turnover"] = np.where(counts > 0, np.where(missing, 0.0, traded).sum(axis=0) / counts * periods_per_year, 0.0)
+            metrics["exposure"] = np.where(counts > 0, ((positions != 0) & ~missing).sum(axis=0) / counts, 0.0)
+
+    metrics["equity_curve"] = equity
+    metrics["drawdown"] = drawdown
+    if rolling_window is not None:
+        metrics["rolling_sharpe"] = rolling_sharpe(returns, rolling_window, periods_per_year)
+
+    if single:
+        return {
+            name: value[:, 0] if value.ndim == 2 else value[0].item()
+            for name, value in metrics.items()
+        }
+    return metrics
+
+
+def rolling_sharpe(returns: np.ndarray, window: int, periods_per_year: float = DEFAULT_PERIODS_PER_YEAR) -> np.ndarray:
+    """
+    Annualized Sharpe ratio over each trailing `window` bars, shape (n,) or (n, m).
+
+    NaN until a window holds `window` valid returns, and where its returns do not vary.
+    """
+    if window < 2:
+        raise ValueError("Rolling Sharpe window must be at least 2 bars")
+    returns = np.asarray(returns, dtype=np.float64)
+    single = returns.ndim == 1
+    if single:
+        returns = returns[:, None]
+    n, m = returns.shape
+
+    missing = np.isnan(returns)
+    filled = np.where(missing, 0.0, returns)
+    # Window sums as differences of running sums, taken around each column's overall
+    # mean so the variance does not cancel catastrophically
+    center = filled.sum(axis=0) / np.maximum((~missing).sum(axis=0), 1)
+    centered = np.where(missing, 0.0, filled - center)
+    zeros = np.zeros((1, m))
+    sums = np.concatenate([zeros, np.cumsum(centered, axis=0)])
+    squares = np.concatenate([zeros, np.cumsum(centered ** 2, axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(~missing, axis=0)])
+
+    result = np.full((n, m), np.nan)
+    if n >= window:
+        total = sums[window:] - sums[:-window]
+        total_squares = squares[window:] - squares[:-window]
+        valid = counts[window:] - counts[:-window] == window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / window
+            variance = (total_squares - total * mean) / (window - 1)
+            ratio = np.sqrt(periods_per_year) * (mean + center) / np.sqrt(variance)
+        # Variance at rounding-noise level means the window's returns were constant
+        result[window - 1:] = np.where(valid & (variance > 1e-10 * total_squares / window), ratio, np.nan)
+    return result[:, 0] if single else result
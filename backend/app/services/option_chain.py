@@ -0,0 +1,213 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .bars import MARKET_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365.0
+# Options stop trading at the 16:00 New York close on their expiration date
+EXPIRY_CLOSE = pd.Timedelta(hours=16)
+# OCC symbols encode the strike in thousandths of a dollar, eight digits wide
+OCC_STRIKE_SCALE = 1000
+OCC_STRIKE_DIGITS = 8
+
+DateLike = Union[str, date, datetime, np.datetime64]
+
+
+def occ_symbols(underlyings, expirations, is_call, strikes) -> np.ndarray:
+    """
+    OCC option symbols (root, YYMMDD expiry, C/P, strike x 1000 in eight digits), such as
+    "AAPL240119C00190000", built for whole arrays of contracts at once.
+
+    Args:
+        underlyings: Underlying symbols, or one symbol for every contract
+        expirations: Expiration dates (YYYY-MM-DD strings, dates or datetime64)
+        is_call: True for calls, False for puts
+        strikes: Strike prices
+    """
+    expirations = np.atleast_1d(np.asarray(expirations, dtype="datetime64[D]"))
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+    # Round rather than truncate: 4.35 * 1000 is 4349.999... in floating point
+    scaled = np.rint(strikes * OCC_STRIKE_SCALE).astype(np.int64)
+    if np.any(scaled < 0) or np.any(scaled >= 10 ** OCC_STRIKE_DIGITS):
+        raise ValueError("Option strikes must be between 0 and 99999.999 to fit an OCC symbol")
+
+    years = expirations.astype("datetime64[Y]")
+    months = expirations.astype("datetime64[M]")
+    yymmdd = (
+        (years.astype(np.int64) + 1970) % 100 * 10000
+        + (months - years).astype(np.int64) * 100 + 100
+        + (expirations - months).astype(np.int64) + 1
+    )
+    roots = np.char.upper(np.asarray(underlyings, dtype=str))
+    types = np.where(np.asarray(is_call, dtype=bool), "C", "P")
+    symbols = np.char.add(roots, np.char.zfill(yymmdd.astype(str), 6))
+    symbols = np.char.add(symbols, types)
+    return np.char.add(symbols, np.char.zfill(scaled.astype(str), OCC_STRIKE_DIGITS))
+
+
+def years_to_expiry(expirations: np.ndarray, as_of: DateLike) -> np.ndarray:
+    """
+    Year fractions (ACT/365) from `as_of` to each expiration's 16:00 New York close.
+
+    Naive `as_of` timestamps are taken as UTC, like bar timestamps; only the distinct
+    expirations are converted between time zones.
+    """
+    now = pd.Timestamp(as_of)
+    now = now.tz_localize("UTC") if now.tzinfo is None else now.tz_convert("UTC")
+    unique, inverse = np.unique(np.asarray(expirations, dtype="datetime64[D]"), return_inverse=True)
+    closes = (pd.DatetimeIndex(unique).tz_localize(MARKET_TIMEZONE) + EXPIRY_CLOSE).tz_convert("UTC")
+    seconds = (closes - now).total_seconds().to_numpy()
+    return (seconds / (86_400 * DAYS_PER_YEAR))[inverse.ravel()]
+
+
+class OptionChain:
+    """
+    Option contracts stored as parallel arrays, sorted by (underlying, expiration, type,
+    strike) so every underlying and every expiration is a contiguous slice.
+
+    Pricing, Greeks and implied volatility run over the whole chain (or a slice of it) in
+    single vectorized calls instead of contract by contract.
+    """
+
+    def __init__(
+        self,
+        underlyings: Iterable[str],
+        expirations: Iterable[DateLike],
+        is_call: Iterable[bool],
+        strikes: Iterable[float],
+        shares_per_contract: Optional[Iterable[float]] = None,
+        quotes: Optional[Iterable[float]] = None,
+    ):
+        """
+        Args:
+            quotes: Quoted price per share of each contract (NaN where there is no quote)
+        """
+        underlyings = np.asarray(underlyings, dtype=str)
+        expirations = np.asarray(expirations, dtype="datetime64[D]")
+        is_call = np.asarray(is_call, dtype=bool)
+        strikes = np.asarray(strikes, dtype=np.float64)
+        shares = np.full(len(strikes), 100.0) if shares_per_contract is None else np.asarray(shares_per_contract, dtype=np.float64)
+        quotes = np.full(len(strikes), np.nan) if quotes is None else np.asarray(quotes, dtype=np.float64)
+        if not len(underlyings) == len(expirations) == len(is_call) == len(strikes) == len(shares) == len(quotes):
+            raise ValueError("Option chain columns must all have one entry per contract")
+
+        # Puts before calls within an expiration, strikes ascending
+        order = np.lexsort((strikes, is_call, expirations, underlyings))
+        self.underlyings = underlyings[order]
+        self.expirations = expirations[order]
+        self.is_call = is_call[order]
+        self.strikes = strikes[order]
+        self.shares_per_contract = shares[order]
+        self.quotes = quotes[order]
+        self._symbols: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_contracts(cls, contracts: List[Dict[str, Any]]) -> "OptionChain":
+        """
+        Build a chain from contract dicts shaped like `PolygonService.get_option_chain`
+        results, with an optional quoted "price" per contract
+        """
+        return cls(
+            underlyings=[_underlying(contract) for contract in contracts],
+            expirations=[contract["expiration_date"] for contract in contracts],
+            is_call=[str(contract["contract_type"]).lower() == "call" for contract in contracts],
+            strikes=[contract["strike_price"] for contract in contracts],
+            shares_per_contract=[contract.get("shares_per_contract") or 100 for contract in contracts],
+            quotes=[_as_float(contract.get("price")) for contract in contracts],
+        )
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    @property
+    def symbols(self) -> np.ndarray:
+        """OCC symbols of every contract, built once on first use"""
+        if self._symbols is None:
+            self._symbols = occ_symbols(self.underlyings, self.expirations, self.is_call, self.strikes)
+        return self._symbols
+
+    def underlying_symbols(self) -> List[str]:
+        """Distinct underlyings in the chain"""
+        return [str(symbol) for symbol in np.unique(self.underlyings)]
+
+    def expiration_dates(self, underlying: Optional[str] = None) -> np.ndarray:
+        """Distinct expirations, of one underlying or of the whole chain"""
+        chain = self if underlying is None else self.select(underlying)
+        return np.unique(chain.expirations)
+
+    def select(self, underlying: str, expiration: Optional[DateLike] = None) -> "OptionChain":
+        """
+        Contracts of one underlying, optionally of one expiration, found by binary search
+        on the sorted columns and returned as views without copying
+        """
+        start, stop = _bounds(self.underlyings, underlying.upper())
+        if expiration is not None:
+            day = np.datetime64(pd.Timestamp(expiration).date(), "D")
+            offset, end = _bounds(self.expirations[start:stop], day)
+            start, stop = start + offset, start + end
+        return self._slice(start, stop)
+
+    def years_to_expiry(self, as_of: DateLike) -> np.ndarray:
+        return years_to_expiry(self.expirations, as_of)
+
+    def prices(self, spot, volatility, as_of: DateLike, rate=0.0, dividend=0.0) -> np.ndarray:
+        """Black-Scholes-Merton prices per share of every contract"""
+        from .option_pricing import black_scholes_price
+        return black_scholes_price(spot, self.strikes, self.years_to_expiry(as_of), volatility, self.is_call, rate, dividend)
+
+    def greeks(self, spot, volatility, as_of: DateLike, rate=0.0, dividend=0.0) -> Dict[str, np.ndarray]:
+        """Price and Greeks of every contract (see `black_scholes_greeks`)"""
+        from .option_pricing import black_scholes_greeks
+        return black_scholes_greeks(spot, self.strikes, self.years_to_expiry(as_of), volatility, self.is_call, rate, dividend)
+
+    def implied_volatility(self, prices, spot, as_of: DateLike, rate=0.0, dividend=0.0, initial_guess=None) -> np.ndarray:
+        """Implied volatility of every contract from its price per share; NaN where there is none"""
+        # Pricing pulls in scipy; imported here so loading chains (and the API) does not
+        from .option_pricing import implied_volatility
+        return implied_volatility(prices, spot, self.strikes, self.years_to_expiry(as_of), self.is_call, rate, dividend, initial_guess=initial_guess)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "symbol": self.symbols,
+            "underlying": self.underlyings,
+            "expiration_date": self.expirations,
+            "contract_type": np.where(self.is_call, "call", "put"),
+            "strike_price": self.strikes,
+            "shares_per_contract": self.shares_per_contract,
+            "price": self.quotes,
+        })
+
+    def _slice(self, start: int, stop: int) -> "OptionChain":
+        chain = OptionChain.__new__(OptionChain)
+        chain.underlyings = self.underlyings[start:stop]
+        chain.expirations = self.expirations[start:stop]
+        chain.is_call = self.is_call[start:stop]
+        chain.strikes = self.strikes[start:stop]
+        chain.shares_per_contract = self.shares_per_contract[start:stop]
+        chain.quotes = self.quotes[start:stop]
+        chain._symbols = None if self._symbols is None else self._symbols[start:stop]
+        return chain
+
+
+def _bounds(sorted_values: np.ndarray, value) -> tuple:
+    return int(np.searchsorted(sorted_values, value, side="left")), int(np.searchsorted(sorted_values, value, side="right"))
+
+
+def _as_float(value: Optional[float]) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _underlying(contract: Dict[str, Any]) -> str:
+    """Underlying of a contract dict, from its `underlying_ticker` or its OCC symbol's root"""
+    if contract.get("underlying_ticker"):
+        return contract["underlying_ticker"]
+    symbol = str(contract["symbol"])
+    symbol = symbol[2:] if symbol.startswith("O:") else symbol
+    # The root is whatever precedes the fixed-width 15-character YYMMDD + C/P + strike tail
+    return symbol[:-15]
@@ -0,0 +1,198 @@
+from typing import Dict, Optional, Union
+
+import numpy as np
+from scipy.special import ndtr
+import logging
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, np.ndarray]
+
+# Volatility search bracket for the implied volatility solver
+MIN_VOLATILITY = 1e-6
+MAX_VOLATILITY = 10.0
+IV_TOLERANCE = 1e-10
+IV_MAX_ITERATIONS = 100
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def _pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _d1_d2(spot, strike, time, volatility, rate, dividend):
+    sqrt_time = np.sqrt(time)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * volatility * volatility) * time) / (volatility * sqrt_time)
+    return d1, d1 - volatility * sqrt_time
+
+
+def _price_and_vega(spot, strike, time, volatility, is_call, rate, dividend):
+    """Just the price and vega, for the implied volatility solver's inner loop"""
+    sign = np.where(is_call, 1.0, -1.0)
+    d1, d2 = _d1_d2(spot, strike, time, volatility, rate, dividend)
+    forward_spot = spot * np.exp(-dividend * time)
+    price = sign * (forward_spot * ndtr(sign * d1) - strike * np.exp(-rate * time) * ndtr(sign * d2))
+    return price, forward_spot * _pdf(d1) * np.sqrt(time)
+
+
+def black_scholes_price(
+    spot: ArrayLike,
+    strike: ArrayLike,
+    time: ArrayLike,
+    volatility: ArrayLike,
+    is_call: ArrayLike,
+    rate: ArrayLike = 0.0,
+    dividend: ArrayLike = 0.0,
+) -> np.ndarray:
+    """
+    Black-Scholes-Merton prices of European options; every argument broadcasts.
+
+    Args:
+        spot: Underlying price
+        strike: Strike price
+        time: Years to expiry
+        volatility: Annualized volatility
+        is_call: True for calls, False for puts
+        rate: Continuously compounded risk-free rate
+        dividend: Continuous dividend yield
+    """
+    spot, strike, time, volatility, rate, dividend = (np.asarray(a, dtype=np.float64) for a in (spot, strike, time, volatility, rate, dividend))
+    sign = np.where(is_call, 1.0, -1.0)
+    d1, d2 = _d1_d2(spot, strike, time, volatility, rate, dividend)
+    forward_spot = spot * np.exp(-dividend * time)
+    discounted_strike = strike * np.exp(-rate * time)
+    return sign * (forward_spot * ndtr(sign * d1) - discounted_strike * ndtr(sign * d2))
+
+
+def black_scholes_greeks(
+    spot: ArrayLike,
+    strike: ArrayLike,
+    time: ArrayLike,
+    volatility: ArrayLike,
+    is_call: ArrayLike,
+    rate: ArrayLike = 0.0,
+    dividend: ArrayLike = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Price and Greeks of European options in one pass, sharing d1, d2 and the normal CDF/PDF.
+
+    Returns:
+        Dict with `price`, `delta`, `gamma`, `vega` (per 1.00 of volatility), `theta`
+        (per year) and `rho` (per 1.00 of rate)
+    """
+    spot, strike, time, volatility, rate, dividend = (np.asarray(a, dtype=np.float64) for a in (spot, strike, time, volatility, rate, dividend))
+    sign = np.where(is_call, 1.0, -1.0)
+    d1, d2 = _d1_d2(spot, strike, time, volatility, rate, dividend)
+    sqrt_time = np.sqrt(time)
+    dividend_discount = np.exp(-dividend * time)
+    rate_discount = np.exp(-rate * time)
+    cdf_d1 = ndtr(sign * d1)
+    cdf_d2 = ndtr(sign * d2)
+    pdf_d1 = _pdf(d1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = dividend_discount * pdf_d1 / (spot * volatility * sqrt_time)
+        theta = (
+            -spot * dividend_discount * pdf_d1 * volatility / (2 * sqrt_time)
+            + sign * (dividend * spot * dividend_discount * cdf_d1 - rate * strike * rate_discount * cdf_d2)
+        )
+    return {
+        "price": sign * (spot * dividend_discount * cdf_d1 - strike * rate_discount * cdf_d2),
+        "delta": sign * dividend_discount * cdf_d1,
+        "gamma": gamma,
+        "vega": spot * dividend_discount * pdf_d1 * sqrt_time,
+        "theta": theta,
+        "rho": sign * strike * time * rate_discount * cdf_d2,
+    }
+
+
+def implied_volatility(
+    price: ArrayLike,
+    spot: ArrayLike,
+    strike: ArrayLike,
+    time: ArrayLike,
+    is_call: ArrayLike,
+    rate: ArrayLike = 0.0,
+    dividend: ArrayLike = 0.0,
+    tolerance: float = IV_TOLERANCE,
+    max_iterations: int = IV_MAX_ITERATIONS,
+    initial_guess: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """
+    Implied volatilities of a whole set of option prices at once.
+
+    Each option is solved on its out-of-the-money side with a safeguarded Newton
+    iteration inside its own bracket [MIN_VOLATILITY, MAX_VOLATILITY]: every step
+    tightens the bracket by the sign of the pricing error, and a Newton step that leaves
+    it is replaced by bisection, so the solver always converges. Options drop out of the
+    working set as soon as they converge, so later iterations only touch the hard cases.
+
+    `initial_guess` warm-starts the solver, for instance from the previous solution when
+    quotes have barely moved; NaN entries fall back to the built-in starting point.
+
+    Returns:
+        Volatilities shaped like the broadcast inputs; NaN where the price is outside the
+        no-arbitrage bounds or the option has expired
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, spot, strike, time, rate, dividend)), np.asarray(is_call, dtype=bool))
+    shape = arrays[0].shape
+    price, spot, strike, time, rate, dividend = (a.ravel() for a in arrays[:6])
+    is_call = arrays[6].ravel()
+
+    forward_spot = spot * np.exp(-dividend * time)
+    discounted_strike = strike * np.exp(-rate * time)
+    intrinsic = np.maximum(np.where(is_call, forward_spot - discounted_strike, discounted_strike - forward_spot), 0.0)
+    upper = np.where(is_call, forward_spot, discounted_strike)
+    with np.errstate(invalid="ignore"):
+        solvable = (time > 0) & (price > intrinsic) & (price < upper) & (strike > 0) & (spot > 0)
+
+    result = np.full(price.shape, np.nan)
+    active = np.flatnonzero(solvable)
+    if len(active) == 0:
+        return result.reshape(shape)
+
+    # Solve on the out-of-the-money side, whose price is all time value: by put-call
+    # parity an in-the-money option's time value is the price of the opposite
+    # out-of-the-money option at the same volatility
+    p = (price - intrinsic)[active]
+    call = (forward_spot <= discounted_strike)[active]
+    s, k, t, r, q = (a[active] for a in (spot, strike, time, rate, dividend))
+    target = np.log(p)
+    low = np.full(len(active), MIN_VOLATILITY)
+    high = np.full(len(active), MAX_VOLATILITY)
+    # Start from the larger of the Brenner-Subrahmanyam at-the-money approximation and
+    # the Manaster-Koehler inflection point, where Newton on the price converges monotonically
+    volatility = np.clip(np.maximum(np.sqrt(2 * np.pi / t) * p / s, np.sqrt(2 * np.abs(np.log(s / k) + (r - q) * t) / t)), 0.05, 3.0)
+    if initial_guess is not None:
+        guess = np.broadcast_to(np.asarray(initial_guess, dtype=np.float64), shape).ravel()[active]
+        volatility = np.where((guess > MIN_VOLATILITY) & (guess < MAX_VOLATILITY), guess, volatility)
+
+    for _ in range(max_iterations):
+        model, vega = _price_and_vega(s, k, t, volatility, call, r, q)
+        # Newton on the log of the price against 1 / volatility^2: out-of-the-money prices
+        # behave like exp(-c / volatility^2), so this is close to linear where the raw
+        # price against volatility is anything but
+        with np.errstate(divide="ignore"):
+            error = np.log(model) - target
+        high = np.where(error > 0, volatility, high)
+        low = np.where(error < 0, volatility, low)
+        converged = (np.abs(error) <= tolerance) | (high - low <= tolerance * volatility)
+
+        if converged.any():
+            result[active[converged]] = volatility[converged]
+            keep = ~converged
+            active, s, k, t, r, q, call, target, low, high, volatility, error, model, vega = (
+                a[keep] for a in (active, s, k, t, r, q, call, target, low, high, volatility, error, model, vega)
+            )
+            if len(active) == 0:
+                break
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = (volatility ** -2 + 2 * error * model / (vega * volatility ** 3)) ** -0.5
+        volatility = np.where((newton > low) & (newton < high), newton, 0.5 * (low + high))
+    else:
+        logger.warning("Implied volatility did not converge for %s options", len(active))
+
+    return result.reshape(shape)
@@ -0,0 +1,320 @@
+import atexit
+import functools
+import itertools
+import os
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .backtest_executor import POOL_CONTEXT, cancel_event
+from .bar_store import shareable
+from .instrumentation import timed
+from .metrics import POSITION_METRICS, RETURN_METRICS, compute_metrics, infer_periods_per_year
+from .result_cache import bar_fingerprint
+
+logger = logging.getLogger(__name__)
+
+RANKING_METRICS = ("total_return", "sharpe_ratio", "max_drawdown", "sortino_ratio", "calmar_ratio", "cagr")
+MAX_SWEEP_COMBINATIONS = 10_000
+# Bars x combinations evaluated at once by a batched sweep (float64 values per matrix)
+SWEEP_BATCH_MAX_ELEMENTS = 4_000_000
+
+# How often a sweep waiting on its pool checks whether its request was abandoned
+CANCEL_POLL_SECONDS = 0.2
+
+# Populated in each worker process: its BacktestService and the bars of the last sweep it served
+_worker_state: Dict[str, Any] = {}
+
+# Process pool shared by every sweep and walk-forward in this process (see `sweep_pool`)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def expand_parameter_grid(parameter_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expand {name: [values]} into every parameter combination"""
+    if not parameter_grid:
+        return [{}]
+    names = list(parameter_grid)
+    for name in names:
+        if not isinstance(parameter_grid[name], (list, tuple)) or len(parameter_grid[name]) == 0:
+            raise ValueError(f"Parameter grid entry {name} must be a non-empty list of values")
+
+    n_combinations = int(np.prod([len(parameter_grid[name]) for name in names]))
+    if n_combinations > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(f"Parameter grid has {n_combinations} combinations; the limit is {MAX_SWEEP_COMBINATIONS}")
+
+    return [dict(zip(names, values)) for values in itertools.product(*(parameter_grid[name] for name in names))]
+
+
+def sample_parameter_grid(parameter_grid: Dict[str, List[Any]], n_samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Draw up to n_samples distinct combinations uniformly from the grid"""
+    if n_samples < 1:
+        raise ValueError("n_samples must be a positive integer")
+    n_samples = min(n_samples, MAX_SWEEP_COMBINATIONS)
+
+    names = list(parameter_grid)
+    sizes = [len(parameter_grid[name]) for name in names]
+    if any(size == 0 for size in sizes):
+        raise ValueError("Parameter grid entries must be non-empty lists of values")
+
+    total = int(np.prod(sizes, dtype=object)) if names else 1
+    rng = random.Random(seed)
+    flat_indices = rng.sample(range(total), min(n_samples, total))
+
+    combinations = []
+    for flat in flat_indices:
+        combination = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            flat, position = divmod(flat, size)
+            combination[name] = parameter_grid[name][position]
+        combinations.append({name: combination[name] for name in names})
+    return combinations
+
+
+def run_parameter_sweep(
+    df: pd.DataFrame,
+    strategy_name: str,
+    combinations: List[Dict[str, Any]],
+    include_signals: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate every parameter combination on the same bars.
+
+    The bars are copied once into a shared memory block that each worker process maps
+    as a DataFrame, so combinations are dispatched without pickling the data.
+    """
+    task = functools.partial(_evaluate, strategy_name=strategy_name, include_signals=include_signals, fingerprint=bar_fingerprint(df))
+    return map_over_frame(df, task, combinations, max_workers)
+
+
+def run_batched_sweep(
+    df: pd.DataFrame,
+    strategy_name: str,
+    combinations: List[Dict[str, Any]],
+    include_signals: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate every parameter combination with the strategy's batched signal function.
+
+    Positions come out as one (bars x combinations) matrix, shared indicators computed
+    once, and the metrics are computed column-wise over it. Combinations are taken in
+    batches so the matrices stay under SWEEP_BATCH_MAX_ELEMENTS values, and the batches
+    run in the sweep pool like `run_parameter_sweep`'s combinations. Rows are the same
+    as `run_parameter_sweep`'s.
+    """
+    chunk = max(1, SWEEP_BATCH_MAX_ELEMENTS // max(len(df), 1))
+    batches = [combinations[start:start + chunk] for start in range(0, len(combinations), chunk)]
+    task = functools.partial(_evaluate_batch, strategy_name=strategy_name, include_signals=include_signals)
+    return [row for rows in map_over_frame(df, task, batches, max_workers) for row in rows]
+
+
+def sweep_pool_size() -> int:
+    """Worker processes shared by all sweeps: SWEEP_MAX_WORKERS or the CPU count"""
+    return max(1, int(os.getenv("SWEEP_MAX_WORKERS", os.cpu_count() or 1)))
+
+
+def sweep_pool() -> ProcessPoolExecutor:
+    """
+    The long-lived pool every sweep runs in, started on first use. Its workers are
+    spawned once and reused, so concurrent sweeps share `sweep_pool_size` processes
+    instead of each starting their own.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=sweep_pool_size(), mp_context=POOL_CONTEXT, initializer=_init_worker)
+        return _pool
+
+
+def shutdown_sweep_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def map_over_frame(df: pd.DataFrame, func: Callable[..., Any], items: List[Any], max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Call func(service, df, item) for every item, in parallel over the sweep pool.
+
+    `func` must be picklable (a module-level function or a partial of one). Workers map
+    the bars from the bar cache's file when `df` was loaded from it, from a shared
+    memory copy otherwise, and each keep one BacktestService. Even a single item runs
+    in the pool, never in the calling process, whose threads share the event loop's
+    GIL. At most `max_workers` chunks of this call are queued at once, so concurrent
+    sweeps share the pool's workers. When the
+    request running the sweep gives up on it (see `cancel_event`) no further chunks are
+    started and TimeoutError is raised.
+
+    Args:
+        df: Timestamp-indexed bars shared by every call
+        func: Work for one item
+        items: Work items, results are returned in the same order
+        max_workers: Chunks to queue at once (default: `sweep_pool_size`); the pool itself
+            never runs more than `sweep_pool_size` workers
+    """
+    if max_workers is None:
+        max_workers = sweep_pool_size()
+    max_workers = max(1, min(max_workers, len(items)))
+    if not items:
+        return []
+
+    chunksize = max(1, len(items) // (max_workers * 4))
+    mapped = shareable(df)
+    if mapped is not df:
+        return _map_in_pool(func, items, chunksize, max_workers, ("mapped", mapped))
+
+    block, layout = _share_frame(df)
+    try:
+        return _map_in_pool(func, items, chunksize, max_workers, ("shared", block.name, layout))
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _map_in_pool(func: Callable[..., Any], items: List[Any], chunksize: int, max_workers: int, source: Tuple[Any, ...]) -> List[Any]:
+    cancel = cancel_event()
+    pool = sweep_pool()
+    chunks = [items[start:start + chunksize] for start in range(0, len(items), chunksize)]
+    futures = []
+    pending = set()
+    try:
+        while pending or len(futures) < len(chunks):
+            while len(futures) < len(chunks) and len(pending) < max_workers:
+                future = pool.submit(_call_chunk_in_worker, func, source, chunks[len(futures)])
+                futures.append(future)
+                pending.add(future)
+            done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            failed = next((future for future in done if future.exception() is not None), None)
+            if failed is not None:
+                raise failed.exception()
+            if cancel is not None and cancel.is_set() and (pending or len(futures) < len(chunks)):
+                raise TimeoutError(f"Sweep abandoned with {len(chunks) - len(futures) + len(pending)} of {len(chunks)} chunks unfinished")
+        return [row for future in futures for row in future.result()]
+    except BrokenProcessPool:
+        # A worker died; the next sweep starts a fresh pool
+        global _pool
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        # Chunks already running finish in the background; queued ones never start
+        for future in pending:
+            future.cancel()
+
+
+def _evaluate(
+    service, df: pd.DataFrame, parameters: Dict[str, Any], strategy_name: str, include_signals: bool, fingerprint: Optional[str] = None
+) -> Dict[str, Any]:
+    try:
+        result = service.evaluate(df, strategy_name, parameters, fingerprint=fingerprint)
+    except ValueError as e:
+        return {"parameters": parameters, "error": str(e)}
+
+    row = {
+        "parameters": parameters,
+        **{name: result[name] for name in RETURN_METRICS + POSITION_METRICS},
+    }
+    if include_signals:
+        row["signals"] = result["signals"].tolist()
+        row["equity_curve"] = result["equity_curve"].tolist()
+    return row
+
+
+def _evaluate_batch(
+    service, df: pd.DataFrame, combinations: List[Dict[str, Any]], strategy_name: str, include_signals: bool
+) -> List[Dict[str, Any]]:
+    sweep_signals = service.registry.get(strategy_name).load_sweep()
+    close = df["close"].to_numpy(dtype=np.float64)
+    returns = np.full(len(close), np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+    with timed("strategy"):
+        positions = np.asarray(sweep_signals(close, combinations), dtype=np.float64)
+    with timed("metrics"):
+        metrics = compute_metrics(returns[:, None] * positions, positions=positions, periods_per_year=infer_periods_per_year(df.index))
+
+    rows = []
+    for column, parameters in enumerate(combinations):
+        row = {"parameters": parameters, **service.metric_values(metrics, RETURN_METRICS + POSITION_METRICS, column=column)}
+        if include_signals:
+            row["signals"] = positions[:, column].tolist()
+            row["equity_curve"] = metrics["equity_curve"][:, column].tolist()
+        rows.append(row)
+    return rows
+
+
+def _share_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """Copy a timestamp-indexed numeric frame into shared memory: the int64 index, then one row per column"""
+    columns = list(df.columns)
+    n = len(df)
+    block = shared_memory.SharedMemory(create=True, size=max(1, (1 + len(columns)) * n * 8))
+    np.ndarray((n,), dtype=np.int64, buffer=block.buf)[:] = df.index.asi8
+    table = np.ndarray((len(columns), n), dtype=np.float64, buffer=block.buf, offset=n * 8)
+    table[:] = df.to_numpy(dtype=np.float64).T
+    return block, {"rows": n, "columns": columns}
+
+
+def _init_worker() -> None:
+    from .backtest_service import BacktestService
+
+    _worker_state["service"] = BacktestService()
+    atexit.register(_release_worker_frame)
+
+
+def _call_chunk_in_worker(func: Callable[..., Any], source: Tuple[Any, ...], items: List[Any]) -> List[Any]:
+    frame = _worker_frame(source)
+    return [func(_worker_state["service"], frame, item) for item in items]
+
+
+def _worker_frame(source: Tuple[Any, ...]) -> pd.DataFrame:
+    """The bars `source` names, attached on the first chunk of each sweep this worker serves"""
+    if source[0] == "mapped":
+        mapped = source[1]
+        key = ("mapped", mapped.path, mapped.identity, mapped.lo, mapped.hi)
+    else:
+        key = source[:2]
+    if _worker_state.get("key") != key:
+        _release_worker_frame()
+        if source[0] == "mapped":
+            _worker_state["frame"] = source[1].to_frame()
+        else:
+            _worker_state["frame"] = _attach_shared_frame(*source[1:])
+        _worker_state["key"] = key
+    return _worker_state["frame"]
+
+
+def _attach_shared_frame(block_name: str, layout: Dict[str, Any]) -> pd.DataFrame:
+    n, columns = layout["rows"], layout["columns"]
+    block = shared_memory.SharedMemory(name=block_name)
+    timestamps = np.ndarray((n,), dtype=np.int64, buffer=block.buf)
+    table = np.ndarray((len(columns), n), dtype=np.float64, buffer=block.buf, offset=n * 8)
+    table.flags.writeable = False
+    index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), name="timestamp")
+    _worker_state["block"] = block
+    return pd.DataFrame(table.T, index=index, columns=columns, copy=False)
+
+
+def _release_worker_frame() -> None:
+    """Drop the worker's views of the previous sweep's bars, then detach from its shared block"""
+    _worker_state.pop("key", None)
+    _worker_state.pop("frame", None)
+    block = _worker_state.pop("block", None)
+    if block is None:
+        return
+    try:
+        block.close()
+    except BufferError:
+        # Something still views the block; the mapping goes away with the process
+        logger.debug("Shared bars block %s still in use", block.name)
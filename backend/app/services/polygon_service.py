@@ -1,51 +1,217 @@
-from polygon import RESTClient
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any, Optional, Tuple, Union
+import pandas as pd
 import logging
 
+from .bar_cache import BarCache
+from .bars import BarBuffer, BarSeries
+from .instrumentation import timed
+from .bulk_fetcher import FetchError, PolygonBulkFetcher, date_chunks
+from .option_chain import OptionChain
+from .resampling import DEFAULT_INTERVAL, is_source_interval, resample_chunks, source_timespan
+
+if TYPE_CHECKING:
+    from polygon import RESTClient
+
 logger = logging.getLogger(__name__)
 
+# Minute history is fetched and cached a month at a time: one Polygon page per request,
+# and a failed download only loses its own month
+MINUTE_FETCH_CHUNK_DAYS = 30
+
 class PolygonService:
-    def __init__(self):
-        self.api_key = os.getenv("POLYGON_API_KEY")
-        if not self.api_key:
-            raise ValueError("POLYGON_API_KEY environment variable is not set")
-        self.client = RESTClient(api_key=self.api_key)
+    def __init__(
+        self,
+        cache: Optional[BarCache] = None,
+        client: Optional["RESTClient"] = None,
+        bulk_fetcher: Optional[PolygonBulkFetcher] = None,
+    ):
+        """
+        Args:
+            cache: Optional on-disk bar cache consulted by `get_stock_bars` and `get_bulk_stock_bars`
+            client: Preconfigured Polygon client; built from POLYGON_API_KEY on first use when omitted
+            bulk_fetcher: Concurrent fetcher for `get_bulk_stock_bars`; built from POLYGON_API_KEY on first use when omitted
+        """
+        self._client = client
+        self.cache = cache
+        self._bulk_fetcher = bulk_fetcher
+
+    @property
+    def client(self) -> "RESTClient":
+        """Polygon client, built (and the polygon package imported) on first use"""
+        if self._client is None:
+            self.api_key = os.getenv("POLYGON_API_KEY")
+            if not self.api_key:
+                raise ValueError("POLYGON_API_KEY environment variable is not set")
+            from polygon import RESTClient
+            self._client = RESTClient(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client: "RESTClient") -> None:
+        self._client = client
 
     def get_stock_data(self, symbol: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """
         Fetch historical stock data from Polygon.io
         """
         try:
-            logger.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
-            aggs = []
-            for a in self.client.list_aggs(
-                symbol,
-                multiplier=1,
-                timespan="day",
-                from_=start_date.strftime("%Y-%m-%d"),
-                to=end_date.strftime("%Y-%m-%d"),
-                limit=50000
-            ):
-                aggs.append({
-                    "timestamp": a.timestamp,
-                    "open": a.open,
-                    "high": a.high,
-                    "low": a.low,
-                    "close": a.close,
-                    "volume": a.volume,
-                    "vwap": a.vwap,
-                    "transactions": a.transactions
-                })
-            logger.info(f"Retrieved {len(aggs)} data points for {symbol}")
-            if len(aggs) == 0:
-                logger.warning(f"No data returned for {symbol} between {start_date} and {end_date}")
-            return aggs
+            logger.info("Fetching data for %s from %s to %s", symbol, start_date, end_date)
+            bars = self._fetch_bars(symbol, start_date, end_date)
+            logger.info("Retrieved %s data points for %s", len(bars), symbol)
+            if len(bars) == 0:
+                logger.warning("No data returned for %s between %s and %s", symbol, start_date, end_date)
+            return bars.to_records()
         except Exception as e:
-            logger.error(f"Error fetching data for {symbol}: {str(e)}")
+            logger.error("Error fetching data for %s: %s", symbol, e)
             return []
 
+    def get_stock_bars(self, symbol: str, start_date: datetime, end_date: datetime, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+        """
+        Get bars as a timestamp-indexed DataFrame, served from the bar cache when possible.
+
+        The frame wraps read-only columnar arrays (see `BarSeries.to_frame`), so strategies
+        can use it directly without copying.
+
+        Daily ("1d") bars come from Polygon's daily aggregates. Intraday intervals ("1m",
+        "5m", "1h", ...) are built from 1-minute bars, which are fetched and cached once
+        and resampled locally chunk by chunk, so any intraday interval is served from the
+        same cache.
+
+        Only the date ranges the cache does not cover yet are requested from Polygon.io;
+        a fully cached range makes no network calls. A range that fails to download
+        raises FetchError naming the failed ranges instead of returning gapped history;
+        ranges fetched before the failure stay cached and the failed ones are retried by
+        the next call.
+        """
+        timespan = source_timespan(interval)
+        if self.cache is None:
+            with timed("fetch"):
+                try:
+                    logger.info("Fetching %s data for %s from %s to %s", interval, symbol, start_date, end_date)
+                    chunks = (
+                        self._fetch_bars(symbol, chunk_start, chunk_end, timespan)
+                        for chunk_start, chunk_end in date_chunks(start_date, end_date, _chunk_days(timespan))
+                    )
+                    bars = _concat(chunks) if is_source_interval(interval) else resample_chunks(chunks, interval)
+                except Exception as e:
+                    logger.error("Error fetching data for %s: %s", symbol, e)
+                    raise FetchError(f"Failed to fetch {symbol} bars from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}: {e}") from e
+            if len(bars) == 0:
+                logger.warning("No data returned for %s between %s and %s", symbol, start_date, end_date)
+            with timed("frame"):
+                return bars.to_frame()
+
+        failed: List[str] = []
+        with timed("fetch"):
+            for missing_start, missing_end in self.cache.missing_ranges(symbol, start_date, end_date, timespan):
+                for chunk_start, chunk_end in date_chunks(missing_start, missing_end, _chunk_days(timespan)):
+                    try:
+                        logger.info("Fetching uncached %s data for %s from %s to %s", timespan, symbol, chunk_start, chunk_end)
+                        fetched = self._fetch_bars(symbol, chunk_start, chunk_end, timespan)
+                    except Exception as e:
+                        logger.error("Error fetching data for %s: %s", symbol, e)
+                        # The rest of this range is not attempted either
+                        failed.append(f"{chunk_start:%Y-%m-%d} to {missing_end:%Y-%m-%d} ({e})")
+                        break
+                    self.cache.store(symbol, chunk_start, chunk_end, fetched, timespan)
+        if failed:
+            raise FetchError(f"Failed to fetch {symbol} bars for {', '.join(failed)}")
+
+        with timed("frame"):
+            bars = self._load_cached(symbol, start_date, end_date, interval)
+        if bars.empty:
+            logger.warning("No data returned for %s between %s and %s", symbol, start_date, end_date)
+        return bars
+
+    def get_bulk_stock_bars(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = DEFAULT_INTERVAL,
+        time_budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get bars for many symbols, fetching whatever the bar cache lacks concurrently.
+
+        Intraday intervals are resampled from cached 1-minute bars as in `get_stock_bars`.
+        With a `time_budget` in seconds, a download that cannot finish within it at the
+        Polygon rate limit is refused with a ValueError before any request is sent.
+
+        Returns:
+            Dict with `bars` mapping each symbol that could be loaded to its timestamp-indexed
+            DataFrame (empty when Polygon has no bars for it) and `errors` mapping each
+            symbol whose download failed, e.g. after exhausting retries on 429s, to the reason.
+        """
+        timespan = source_timespan(interval)
+        if self._bulk_fetcher is None:
+            self._bulk_fetcher = PolygonBulkFetcher()
+        fetcher = self._bulk_fetcher
+
+        if self.cache is None:
+            _check_request_budget(fetcher, len(symbols) * len(date_chunks(start_date, end_date, _chunk_days(timespan))), time_budget)
+            with timed("fetch"):
+                fetched = fetcher.fetch(symbols, start_date, end_date, chunk_days=_chunk_days(timespan), timespan=timespan)
+            with timed("frame"):
+                if not is_source_interval(interval):
+                    fetched["bars"] = {symbol: resample_chunks([bars], interval) for symbol, bars in fetched["bars"].items()}
+                return {
+                    "bars": {symbol: bars.to_frame() for symbol, bars in fetched["bars"].items()},
+                    "errors": fetched["errors"],
+                }
+
+        with timed("fetch"):
+            requests = [
+                (symbol, chunk_start, chunk_end)
+                for symbol in symbols
+                for missing_start, missing_end in self.cache.missing_ranges(symbol, start_date, end_date, timespan)
+                for chunk_start, chunk_end in date_chunks(missing_start, missing_end, _chunk_days(timespan))
+            ]
+            _check_request_budget(fetcher, len(requests), time_budget)
+            logger.info("Fetching %s uncached ranges for %s symbols", len(requests), len(symbols))
+
+            errors: Dict[str, str] = {}
+            for (symbol, missing_start, missing_end), outcome in zip(requests, fetcher.fetch_ranges(requests, timespan)):
+                if isinstance(outcome, FetchError):
+                    errors.setdefault(symbol, str(outcome))
+                else:
+                    self.cache.store(symbol, missing_start, missing_end, outcome, timespan)
+
+        with timed("frame"):
+            bars = {
+                symbol: self._load_cached(symbol, start_date, end_date, interval)
+                for symbol in symbols
+                if symbol not in errors
+            }
+        return {"bars": bars, "errors": errors}
+
+    def _load_cached(self, symbol: str, start_date: datetime, end_date: datetime, interval: str) -> pd.DataFrame:
+        timespan = source_timespan(interval)
+        if is_source_interval(interval):
+            return self.cache.load(symbol, start_date, end_date, timespan)
+        return resample_chunks(self.cache.iter_series(symbol, start_date, end_date, timespan), interval).to_frame()
+
+    def _fetch_bars(
+        self,
+        symbol: str,
+        start_date: Union[date, datetime],
+        end_date: Union[date, datetime],
+        timespan: str = "day",
+    ) -> BarSeries:
+        """Page through Polygon aggregates straight into columnar buffers"""
+        buffer = BarBuffer()
+        buffer.append_aggs(self.client.list_aggs(
+            symbol,
+            multiplier=1,
+            timespan=timespan,
+            from_=start_date.strftime("%Y-%m-%d"),
+            to=end_date.strftime("%Y-%m-%d"),
+            limit=50000
+        ))
+        return buffer.finish()
+
     def get_option_chain(self, symbol: str) -> List[Dict[str, Any]]:
         """
         Fetch option chain data from Polygon.io
@@ -59,6 +225,7 @@ class PolygonService:
             ):
                 options.append({
                     "symbol": opt.symbol,
+                    "underlying_ticker": opt.underlying_ticker,
                     "strike_price": opt.strike_price,
                     "expiration_date": opt.expiration_date,
                     "contract_type": opt.contract_type,
@@ -68,4 +235,64 @@ class PolygonService:
             return options
         except Exception as e:
             print(f"Error fetching options for {symbol}: {str(e)}")
-            return [] 
+            return []
+
+    def get_option_snapshot(self, symbol: str) -> Tuple[OptionChain, Optional[float]]:
+        """
+        Fetch an underlying's option chain with current quotes, and the underlying price.
+
+        Each contract's quote is its bid/ask midpoint, or the day's close when it has no
+        two-sided quote. The underlying price is None when the snapshot does not carry it.
+        Note: This requires a paid subscription
+        """
+        underlyings, expirations, is_call, strikes, shares, quotes = [], [], [], [], [], []
+        spot = None
+        for snapshot in self.client.list_snapshot_options_chain(symbol):
+            details = snapshot.details
+            if details is None or details.strike_price is None or details.expiration_date is None:
+                continue
+            underlyings.append(symbol.upper())
+            expirations.append(details.expiration_date)
+            is_call.append(str(details.contract_type).lower() == "call")
+            strikes.append(details.strike_price)
+            shares.append(details.shares_per_contract or 100)
+            quotes.append(_snapshot_quote(snapshot))
+            if snapshot.underlying_asset is not None and snapshot.underlying_asset.price:
+                spot = snapshot.underlying_asset.price
+        return OptionChain(underlyings, expirations, is_call, strikes, shares, quotes), spot
+
+    def get_option_chain_store(self, symbol: str) -> OptionChain:
+        """
+        Fetch an underlying's option contracts as a column-oriented `OptionChain`, ready
+        for whole-chain pricing, Greeks and implied volatility
+        """
+        return OptionChain.from_contracts(self.get_option_chain(symbol))
+
+
+def _snapshot_quote(snapshot: Any) -> float:
+    quote = snapshot.last_quote
+    if quote is not None and quote.bid and quote.ask and quote.ask >= quote.bid:
+        return (quote.bid + quote.ask) / 2
+    if snapshot.day is not None and snapshot.day.close:
+        return snapshot.day.close
+    return float("nan")
+
+
+def _chunk_days(timespan: str) -> Optional[int]:
+    return MINUTE_FETCH_CHUNK_DAYS if timespan == "minute" else None
+
+
+def _check_request_budget(fetcher: PolygonBulkFetcher, n_requests: int, time_budget: Optional[float]) -> None:
+    budget = fetcher.request_budget(time_budget) if time_budget is not None else None
+    if budget is not None and n_requests > budget:
+        raise ValueError(
+            f"Fetching {n_requests} uncached ranges would take longer than {time_budget:.0f}s at the Polygon "
+            f"rate limit (at most {budget} requests); split the request into smaller ones"
+        )
+
+
+def _concat(chunks: Iterable[BarSeries]) -> BarSeries:
+    buffer = BarBuffer()
+    for chunk in chunks:
+        buffer.append_columns(chunk.timestamps, chunk.values)
+    return buffer.finish()
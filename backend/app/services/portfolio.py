@@ -0,0 +1,51 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_PORTFOLIO_SYMBOLS = 5000
+
+
+def align_closes(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Align per-symbol bars into one (time x symbol) close-price matrix.
+
+    Rows are the union of all bar timestamps. A symbol missing a bar that others have
+    carries its last close forward; rows before its first bar stay NaN. Symbols without
+    any bars are left out.
+    """
+    closes = {symbol: df["close"] for symbol, df in frames.items() if len(df) > 0}
+    if not closes:
+        return pd.DataFrame(dtype=np.float64)
+    return pd.concat(closes, axis=1, sort=True).ffill()
+
+
+def left_align(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shift every column up so its first non-NaN row lands on row 0.
+
+    Indicators computed on the shifted matrix see each symbol's history from its own
+    first bar, exactly as a single-symbol backtest would. Rows past a column's end
+    repeat the last row and are discarded by `restore_alignment`.
+
+    Returns:
+        The shifted matrix and each column's original first row
+    """
+    n, m = values.shape
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n)
+    rows = np.minimum(np.arange(n)[:, None] + first[None, :], n - 1)
+    return values[rows, np.arange(m)[None, :]], first
+
+
+def restore_alignment(values: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Undo `left_align`, filling the rows before each column's first bar with NaN"""
+    n, m = values.shape
+    rows = np.arange(n)[:, None] - first[None, :]
+    restored = values[np.maximum(rows, 0), np.arange(m)[None, :]].astype(np.float64)
+    restored[rows < 0] = np.nan
+    return restored
+
@@ -0,0 +1,115 @@
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import logging
+
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+# First retry delay in seconds; each further retry doubles it, up to MAX_BACKOFF_SECONDS
+DEFAULT_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, which is the burst
+    size. A caller that finds the bucket short reserves its tokens anyway and sleeps
+    until they have refilled, so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second; zero or less disables limiting
+            capacity: Largest burst (default: one second's worth of tokens, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, blocking until they are available; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def request_json(
+    http: urllib3.PoolManager,
+    rate_limiter: TokenBucket,
+    method: str,
+    url: str,
+    error_type: Callable[[str, Optional[int]], Exception],
+    max_retries: int,
+    backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+    fields: Optional[Dict[str, Any]] = None,
+    body: Optional[bytes] = None,
+) -> Any:
+    """
+    Send a request under a rate limit and decode its JSON response (None when empty).
+
+    Connection errors, RETRY_STATUSES and 2xx bodies that are not valid JSON (truncated
+    or garbled) are retried up to `max_retries` times with exponential backoff and
+    jitter, honoring Retry-After. Failures are raised as `error_type(message, status)`.
+    """
+    attempt = 0
+    while True:
+        rate_limiter.acquire()
+        retry_after = None
+        try:
+            response = http.request(method, url, fields=fields, body=body)
+        except urllib3.exceptions.HTTPError as e:
+            error = error_type(f"Request failed: {str(e)}", None)
+        else:
+            if 200 <= response.status < 300:
+                try:
+                    return json.loads(response.data) if response.data else None
+                except ValueError as e:
+                    error = error_type(f"Malformed response: {str(e)}", response.status)
+            else:
+                error = error_type(f"HTTP {response.status}: {error_message(response.data)}", response.status)
+                if response.status not in RETRY_STATUSES:
+                    raise error
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        if attempt == max_retries:
+            raise error
+        # Jitter keeps concurrent requests that failed together from retrying together
+        delay = retry_after if retry_after is not None else backoff_seconds * 2 ** attempt * random.uniform(1.0, 1.5)
+        delay = min(delay, MAX_BACKOFF_SECONDS)
+        logger.warning("Retrying %s %s in %.2fs after: %s", method, url, delay, error)
+        time.sleep(delay)
+        attempt += 1
+
+
+def error_message(data: bytes) -> str:
+    """The message of a JSON error body, or the start of the body as text"""
+    try:
+        body = json.loads(data)
+        return body.get("message") or body.get("error") or data[:200].decode("utf-8", "replace")
+    except (ValueError, AttributeError):
+        return data[:200].decode("utf-8", "replace")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
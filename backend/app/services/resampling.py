@@ -0,0 +1,124 @@
+import re
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .bars import BAR_COLUMNS, MARKET_TIMEZONE, BarBuffer, BarSeries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = "1d"
+
+# Interval suffix -> Polygon timespan
+INTERVAL_UNITS = {"m": "minute", "h": "hour", "d": "day"}
+TIMESPAN_MS = {"minute": 60_000, "hour": 3_600_000, "day": 86_400_000}
+
+_INTERVAL_PATTERN = re.compile(r"^(\d+)([mhd])$")
+_COLUMN = {name: row for row, name in enumerate(BAR_COLUMNS)}
+
+
+def parse_interval(interval: str) -> Tuple[int, str]:
+    """
+    Split an interval such as "5m", "1h" or "1d" into (multiplier, Polygon timespan).
+
+    Minute and hour intervals must divide a day evenly so every bucket starts at the same
+    wall-clock times each session; day intervals are single days.
+    """
+    match = _INTERVAL_PATTERN.match(interval.strip().lower()) if isinstance(interval, str) else None
+    if match is None:
+        raise ValueError(f"Invalid interval {interval!r}; use a number followed by m, h or d, such as 5m, 1h or 1d")
+    multiplier, timespan = int(match.group(1)), INTERVAL_UNITS[match.group(2)]
+    if multiplier < 1 or (timespan == "day" and multiplier != 1) or TIMESPAN_MS["day"] % (multiplier * TIMESPAN_MS[timespan]):
+        raise ValueError(f"Unsupported interval {interval!r}; minute and hour intervals must divide a day, and day bars are 1d")
+    return multiplier, timespan
+
+
+def interval_ms(interval: str) -> int:
+    """Length of an interval's bars in milliseconds"""
+    multiplier, timespan = parse_interval(interval)
+    return multiplier * TIMESPAN_MS[timespan]
+
+
+def source_timespan(interval: str) -> str:
+    """Timespan fetched and cached to build `interval` bars: minute bars for intraday intervals, day bars for 1d"""
+    _, timespan = parse_interval(interval)
+    return "day" if timespan == "day" else "minute"
+
+
+def is_source_interval(interval: str) -> bool:
+    """Whether `interval` bars are the cached bars themselves, with nothing to resample"""
+    return parse_interval(interval) in ((1, "minute"), (1, "day"))
+
+
+def resample_bars(bars: BarSeries, interval: str) -> BarSeries:
+    """Aggregate sorted bars into `interval` bars (see `resample_chunks`)"""
+    return resample_chunks([bars], interval)
+
+
+def resample_chunks(chunks: Iterable[BarSeries], interval: str) -> BarSeries:
+    """
+    Aggregate time-sorted bars, delivered in consecutive chunks, into coarser OHLCV bars.
+
+    Buckets are aligned to wall-clock time in the market's time zone, so hourly bars
+    start on the hour and daily bars cover one exchange calendar day, across DST
+    changes. Each output bar is stamped with its bucket's start. Open and close are the
+    first and last bars' values, high and low the extremes, volume and transactions
+    sums, and vwap the volume-weighted average of the input vwaps.
+
+    Each chunk is aggregated with segmented reductions as it arrives; only the rows of
+    the bucket still open at a chunk's end are carried into the next one, so memory is
+    bounded by the chunk size plus the (much smaller) output.
+    """
+    size = interval_ms(interval)
+    buffer = BarBuffer()
+    carry = BarSeries.empty()
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        timestamps = np.concatenate([carry.timestamps, np.asarray(chunk.timestamps, dtype=np.int64)])
+        values = np.concatenate([carry.values, chunk.values], axis=1)
+        local = _local_ms(timestamps)
+        buckets = local // size
+        starts = np.flatnonzero(np.diff(buckets)) + 1
+        last = starts[-1] if len(starts) else 0
+        if last:
+            buffer.append_columns(*_aggregate(timestamps[:last], values[:, :last], local[:last], buckets[:last], size))
+        carry = BarSeries(timestamps[last:], values[:, last:])
+
+    if len(carry):
+        local = _local_ms(carry.timestamps)
+        buffer.append_columns(*_aggregate(carry.timestamps, carry.values, local, local // size, size))
+    resampled = buffer.finish()
+    logger.debug("Resampled bars to %s: %s bars", interval, len(resampled))
+    return resampled
+
+
+def _local_ms(timestamps: np.ndarray) -> np.ndarray:
+    """Epoch milliseconds shifted to wall-clock time in the market time zone"""
+    utc = pd.DatetimeIndex(timestamps.astype("datetime64[ms]"), tz="UTC")
+    return utc.tz_convert(MARKET_TIMEZONE).tz_localize(None).as_unit("ms").asi8
+
+
+def _aggregate(timestamps: np.ndarray, values: np.ndarray, local: np.ndarray, buckets: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.append(starts[1:], len(timestamps))
+
+    volume = np.nan_to_num(values[_COLUMN["volume"]])
+    total_volume = np.add.reduceat(volume, starts)
+    traded_value = np.add.reduceat(np.nan_to_num(values[_COLUMN["vwap"]] * volume), starts)
+
+    resampled = np.empty((len(BAR_COLUMNS), len(starts)))
+    resampled[_COLUMN["open"]] = values[_COLUMN["open"], starts]
+    resampled[_COLUMN["high"]] = np.fmax.reduceat(values[_COLUMN["high"]], starts)
+    resampled[_COLUMN["low"]] = np.fmin.reduceat(values[_COLUMN["low"]], starts)
+    resampled[_COLUMN["close"]] = values[_COLUMN["close"], ends - 1]
+    resampled[_COLUMN["volume"]] = total_volume
+    with np.errstate(invalid="ignore", divide="ignore"):
+        resampled[_COLUMN["vwap"]] = np.where(total_volume > 0, traded_value / total_volume, np.nan)
+    resampled[_COLUMN["transactions"]] = np.add.reduceat(np.nan_to_num(values[_COLUMN["transactions"]]), starts)
+
+    # Bucket start in UTC: the first bar's timestamp minus its distance from the start
+    labels = timestamps[starts] - (local[starts] - buckets[starts] * size)
+    return labels.astype(np.int64), resampled
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 2 * 1024 * 1024 * 1024
+# Rough per-entry cost of the dict, floats and key string around the arrays
+ENTRY_OVERHEAD_BYTES = 1024
+# Part of every key; bump it when the fields of a backtest result change so the shared
+# on-disk cache never serves results in an older layout
+RESULT_FORMAT_VERSION = 2
+DISK_SUFFIX = ".npz"
+# Entries of earlier versions, never read again but still evicted
+LEGACY_DISK_SUFFIXES = (".pkl",)
+# Member of a disk entry holding its non-array values as JSON
+JSON_MEMBER = "__json__"
+
+
+def bar_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a bar DataFrame: its index, column names and values"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(np.ascontiguousarray(df.index.asi8).view(np.uint8))
+    for column in df.columns:
+        digest.update(str(column).encode())
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).view(np.uint8))
+    return digest.hexdigest()
+
+
+def normalize_parameters(parameters: Dict[str, Any]) -> str:
+    """Canonical JSON for strategy parameters, so 20, 20.0 and np.int64(20) share a key"""
+    def normalize(value: Any) -> Any:
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+
+    return json.dumps(normalize(parameters), sort_keys=True, default=str)
+
+
+class ResultCache:
+    """
+    Content-addressed cache of backtest results.
+
+    Entries are keyed by a hash of the input bars, the strategy name and the normalized
+    parameters, so a change in the bar data produces a new key and stale results are
+    never served. A size-bounded in-process LRU sits in front of an optional on-disk
+    layer (enabled by `disk_dir` or RESULT_CACHE_DIR) that is shared by every process
+    on the host and evicts its least recently used files once over its byte budget.
+    Disk entries are .npz files of plain arrays and JSON, loaded without pickle, so a
+    writable cache directory cannot be used to run code in the server.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, disk_dir: Optional[str] = None, max_disk_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.disk_dir = disk_dir or os.getenv("RESULT_CACHE_DIR")
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else int(os.getenv("RESULT_CACHE_MAX_DISK_BYTES", DEFAULT_MAX_DISK_BYTES))
+
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bytes in the disk layer as of this process's last scan plus its own writes since
+        self._disk_bytes: Optional[int] = None
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        df: pd.DataFrame,
+        strategy_name: str,
+        parameters: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None,
+    ) -> str:
+        """
+        Cache key for running `strategy_name` with `parameters` (and `execution` settings) over `df`.
+
+        Hashing the bars is the expensive part: callers keying many runs over the same bars
+        pass their `bar_fingerprint` once computed instead.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"v{RESULT_FORMAT_VERSION}".encode())
+        digest.update((fingerprint or bar_fingerprint(df)).encode())
+        digest.update(strategy_name.encode())
+        digest.update(normalize_parameters(parameters).encode())
+        if execution is not None:
+            digest.update(b"execution")
+            digest.update(normalize_parameters(execution).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None. The returned dict is a fresh shallow copy."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, result)
+        return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result; numpy arrays in it are frozen so cached copies cannot be mutated"""
+        result = dict(result)
+        for value in result.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+        with self._lock:
+            self._insert(key, result)
+        self._write_disk(key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.disk_dir),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _insert(self, key: str, result: Dict[str, Any]) -> None:
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}{DISK_SUFFIX}")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            result = _load_entry(path)
+            os.utime(path)  # mtime doubles as the disk layer's LRU clock
+            return result
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Discarding unreadable result cache entry %s: %s", key, e)
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                _save_entry(f, result)
+            size = os.path.getsize(tmp_path)
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # ValueError/TypeError: a value that is neither a plain array nor JSON
+            logger.warning("Could not write result cache entry %s: %s", key, e)
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size - replaced
+            scan = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if scan:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """
+        Walk the disk layer, remove its least recently used files until it fits the budget
+        and reset the running total. Only needed on the first write and once over budget:
+        the total counts this process's writes in between, and other processes' writes
+        from its next walk.
+        """
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith((DISK_SUFFIX,) + LEGACY_DISK_SUFFIXES):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
+
+
+def _save_entry(f, result: Dict[str, Any]) -> None:
+    """Write a result as .npz: each array as a member, everything else as one JSON member"""
+    arrays = {name: value for name, value in result.items() if isinstance(value, np.ndarray)}
+    if JSON_MEMBER in arrays or any(value.dtype.hasobject for value in arrays.values()):
+        raise ValueError("result holds arrays that cannot be stored without pickle")
+    values = {name: value for name, value in result.items() if name not in arrays}
+    # json handles NaN and infinity, and numpy scalars through `item`
+    encoded = json.dumps(values, default=lambda value: value.item() if isinstance(value, np.generic) else _unencodable(value))
+    np.savez(f, **arrays, **{JSON_MEMBER: np.frombuffer(encoded.encode(), dtype=np.uint8)})
+
+
+def _load_entry(path: str) -> Dict[str, Any]:
+    with np.load(path, allow_pickle=False) as entry:
+        result = json.loads(entry[JSON_MEMBER].tobytes())
+        for name in entry.files:
+            if name != JSON_MEMBER:
+                array = entry[name]
+                array.flags.writeable = False
+                result[name] = array
+    return result
+
+
+def _unencodable(value: Any) -> Any:
+    raise TypeError(f"{type(value).__name__} values cannot be stored in the result cache")
+
+
+def _result_size(result: Dict[str, Any]) -> int:
+    size = ENTRY_OVERHEAD_BYTES
+    for value in result.values():
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif isinstance(value, (list, str)):
+            size += 8 * len(value)
+    return size
@@ -0,0 +1,151 @@
+import numpy as np
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of windows solved per batched numpy.linalg call. Bounds the size of the
+# (windows x window_length x regressors) design stack kept in memory at once.
+DEFAULT_CHUNK_SIZE = 8192
+
+
+def rolling_ols(
+    y: np.ndarray,
+    X: np.ndarray,
+    window: int,
+    min_nobs: Optional[int] = None,
+    add_constant: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, np.ndarray]:
+    """
+    Fit an OLS regression on every trailing window of `window` rows.
+
+    The fit stored at row t uses rows t - window + 1 .. t. Rows where any
+    regressor is NaN are dropped from the window, as `DataFrame.dropna()` would,
+    and a window is only fitted when it keeps at least `min_nobs` rows.
+
+    Windows are built with stride tricks and solved in batches through
+    `numpy.linalg.pinv`, the same solver statsmodels' OLS uses, so the estimates
+    match a per-window `sm.OLS(y, sm.add_constant(X)).fit()`. That includes
+    statsmodels' `has_constant='skip'` rule: when a regressor is constant (and
+    non-zero) inside a window, no intercept is added for that window.
+
+    Args:
+        y: Dependent variable, shape (n,) or (n, m) for m independent series.
+        X: Regressors, shape (n, p) or (n, m, p).
+        window: Number of rows in each regression window.
+        min_nobs: Minimum number of usable rows to fit a window (default: p + 1).
+        add_constant: Prepend an intercept column to the regressors.
+        chunk_size: Number of windows, across all series, solved per batched linear-algebra call.
+
+    Returns:
+        Dict with
+            params: (n, [m,] k) coefficients, intercept first when added,
+                NaN where the window was not fitted.
+            sigma_squared: (n, [m]) population variance of the residuals.
+            nobs: (n, [m]) number of rows used in each window.
+            has_constant: (n, [m]) whether an intercept was fitted.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float64)
+    squeeze = y.ndim == 1
+    if squeeze:
+        y = y[:, None]
+        X = X[:, None, :]
+    if X.ndim != 3 or X.shape[:2] != y.shape:
+        raise ValueError(f"Incompatible shapes for rolling OLS: y={y.shape}, X={X.shape}")
+
+    n, m, p = X.shape
+    k = p + 1 if add_constant else p
+    if min_nobs is None:
+        min_nobs = k
+    if window < 1:
+        raise ValueError("Regression window must be a positive integer")
+
+    params = np.full((n, m, k), np.nan)
+    sigma_squared = np.full((n, m), np.nan)
+    nobs = np.zeros((n, m), dtype=np.int64)
+    has_constant = np.zeros((n, m), dtype=bool)
+
+    if n < window:
+        return _squeeze_result(params, sigma_squared, nobs, has_constant, squeeze)
+
+    valid = np.isfinite(X).all(axis=2)
+    X_masked = np.where(valid[..., None], X, 0.0)
+    X_high = np.where(valid[..., None], X, -np.inf)
+    X_low = np.where(valid[..., None], X, np.inf)
+    y_masked = np.where(valid, y, 0.0)
+    valid_f = valid.astype(np.float64)
+
+    # Windowed views: (n - window + 1, m, window[, p]) without copying.
+    X_windows = np.lib.stride_tricks.sliding_window_view(X_masked, window, axis=0)
+    X_high_windows = np.lib.stride_tricks.sliding_window_view(X_high, window, axis=0)
+    X_low_windows = np.lib.stride_tricks.sliding_window_view(X_low, window, axis=0)
+    y_windows = np.lib.stride_tricks.sliding_window_view(y_masked, window, axis=0)
+    valid_windows = np.lib.stride_tricks.sliding_window_view(valid_f, window, axis=0)
+
+    n_windows = n - window + 1
+    # Each step solves every series' window at `step` consecutive rows
+    step = max(1, chunk_size // m)
+    for start in range(0, n_windows, step):
+        stop = min(start + step, n_windows)
+        # (c, m, p, w) -> (c, m, w, p)
+        Xw = np.swapaxes(X_windows[start:stop], -1, -2)
+        yw = y_windows[start:stop]
+        vw = valid_windows[start:stop]
+        counts = vw.sum(axis=-1).astype(np.int64)
+
+        if add_constant:
+            col_max = X_high_windows[start:stop].max(axis=-1)
+            col_min = X_low_windows[start:stop].min(axis=-1)
+            constant_column = (col_max == col_min) & (col_max != 0)
+            fit_constant = ~constant_column.any(axis=-1)
+            # Invalid rows stay all-zero so they do not contribute to the fit.
+            ones = vw[..., None] * fit_constant[..., None, None]
+            Z = np.concatenate([ones, Xw], axis=-1)
+        else:
+            fit_constant = np.zeros(counts.shape, dtype=bool)
+            Z = Xw
+
+        beta = np.einsum("...kw,...w->...k", np.linalg.pinv(Z), yw)
+        resid = (yw - np.einsum("...wk,...k->...w", Z, beta)) * vw
+        safe_counts = np.maximum(counts, 1)
+        resid_mean = resid.sum(axis=-1) / safe_counts
+        var = ((resid - resid_mean[..., None]) ** 2 * vw).sum(axis=-1) / safe_counts
+
+        # A NaN target inside the usable rows poisons the fit, as it does in statsmodels.
+        y_nan = (np.isnan(yw) & (vw > 0)).any(axis=-1)
+        fitted = (counts >= min_nobs) & (counts > 0)
+        beta[y_nan] = np.nan
+        var[y_nan] = np.nan
+        if add_constant:
+            beta[..., 0] = np.where(fit_constant, beta[..., 0], 0.0)
+
+        rows = slice(start + window - 1, stop + window - 1)
+        params[rows] = np.where(fitted[..., None], beta, np.nan)
+        sigma_squared[rows] = np.where(fitted, var, np.nan)
+        nobs[rows] = counts
+        has_constant[rows] = fit_constant & fitted
+
+    logger.debug("Rolling OLS fitted %s windows of %s rows across %s series", n_windows, window, m)
+    return _squeeze_result(params, sigma_squared, nobs, has_constant, squeeze)
+
+
+def _squeeze_result(
+    params: np.ndarray,
+    sigma_squared: np.ndarray,
+    nobs: np.ndarray,
+    has_constant: np.ndarray,
+    squeeze: bool,
+) -> Dict[str, np.ndarray]:
+    if squeeze:
+        params = params[:, 0]
+        sigma_squared = sigma_squared[:, 0]
+        nobs = nobs[:, 0]
+        has_constant = has_constant[:, 0]
+    return {
+        "params": params,
+        "sigma_squared": sigma_squared,
+        "nobs": nobs,
+        "has_constant": has_constant,
+    }
@@ -0,0 +1,194 @@
+import importlib
+import pkgutil
+import threading
+from importlib.metadata import entry_points
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Installed packages add strategies under this entry point group, each entry point
+# naming a StrategySpec, a list of them, or a module with a STRATEGIES list
+ENTRY_POINT_GROUP = "volatilitylab.strategies"
+# Package whose modules are scanned for built-in STRATEGIES lists
+BUILTIN_STRATEGY_PACKAGE = f"{__package__.rsplit('.', 1)[0]}.strategies"
+
+SignalFunction = Callable[[np.ndarray, Dict[str, Any]], np.ndarray]
+SweepFunction = Callable[[np.ndarray, List[Dict[str, Any]]], np.ndarray]
+
+
+class StrategySpec:
+    """
+    Declaration of a strategy: what it is called, which parameters it takes, how many
+    bars it needs before its signals mean anything, and where its signal function lives.
+
+    `signals` is either the function itself, or a "module:function" path imported only
+    when the strategy is first run, so a plugin's heavy dependencies stay out of
+    discovery and of `/strategies`. The function maps a close-price array of shape (n,)
+    or (n, m) and a parameter dict to positions of the same shape.
+
+    `sweep_signals`, when given (as a function or a path, like `signals`), evaluates many
+    parameter combinations at once: it maps a close-price array of shape (n,) and a list
+    of parameter dicts to positions of shape (n, len(combinations)), the same columns
+    `signals` would give one by one. Parameter sweeps use it instead of one pass per
+    combination.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        display_name: str,
+        signals: Union[str, SignalFunction],
+        parameters: Optional[Dict[str, Dict[str, Any]]] = None,
+        warmup: Union[int, str, Callable[[Dict[str, Any]], int]] = 0,
+        label: Optional[str] = None,
+        flat_on_error: bool = False,
+        sweep_signals: Union[str, SweepFunction, None] = None,
+    ):
+        """
+        Args:
+            parameters: JSON-schema-like description of each parameter: "type", "default",
+                optional "minimum", "enum" and "description"
+            warmup: Bars before the first meaningful signal: a count, the name of the
+                parameter holding it, or a function of the parameters
+            label: Short name used in error messages; defaults to the display name
+            flat_on_error: Return a flat (all zero) signal instead of raising when the
+                signal function fails
+        """
+        self.name = name
+        self.display_name = display_name
+        self.parameters = parameters or {}
+        self.label = label or display_name
+        self.flat_on_error = flat_on_error
+        self._signals = signals
+        self._sweep_signals = sweep_signals
+        self._warmup = warmup
+        self._lock = threading.Lock()
+
+    def defaults(self) -> Dict[str, Any]:
+        return {name: schema["default"] for name, schema in self.parameters.items() if "default" in schema}
+
+    def warmup_bars(self, parameters: Optional[Dict[str, Any]] = None) -> int:
+        """Warm-up length for `parameters`, with the declared defaults filling in the rest"""
+        values = {**self.defaults(), **(parameters or {})}
+        if callable(self._warmup):
+            return int(self._warmup(values))
+        if isinstance(self._warmup, str):
+            return int(values[self._warmup])
+        return int(self._warmup)
+
+    def load(self) -> SignalFunction:
+        """The signal function, importing its module on first use"""
+        if isinstance(self._signals, str):
+            with self._lock:
+                if isinstance(self._signals, str):
+                    self._signals = self._import(self._signals)
+        return self._signals
+
+    def load_sweep(self) -> Optional[SweepFunction]:
+        """The batched sweep function, if the strategy has one, importing its module on first use"""
+        if isinstance(self._sweep_signals, str):
+            with self._lock:
+                if isinstance(self._sweep_signals, str):
+                    self._sweep_signals = self._import(self._sweep_signals)
+        return self._sweep_signals
+
+    def _import(self, path: str) -> Callable[..., np.ndarray]:
+        module_name, _, attribute = path.partition(":")
+        logger.debug("Loading strategy %s from %s", self.name, path)
+        return getattr(importlib.import_module(module_name), attribute)
+
+    @property
+    def loaded(self) -> bool:
+        return not isinstance(self._signals, str)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "display_name": self.display_name,
+            "parameters": self.parameters,
+            "warmup_bars": self.warmup_bars(),
+        }
+
+
+class StrategyRegistry:
+    """
+    Strategies found by scanning the built-in strategy package and the installed entry
+    points, on first use rather than at import.
+
+    Discovery imports only the modules that declare strategies; each strategy's signal
+    function (and whatever it depends on) is loaded when that strategy first runs.
+    """
+
+    def __init__(self, package: Optional[str] = BUILTIN_STRATEGY_PACKAGE, entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        self.package = package
+        self.entry_point_group = entry_point_group
+        self._specs: Optional[Dict[str, StrategySpec]] = None
+        self._lock = threading.Lock()
+
+    def _discovered(self) -> Dict[str, StrategySpec]:
+        if self._specs is None:
+            with self._lock:
+                if self._specs is None:
+                    specs: Dict[str, StrategySpec] = {}
+                    for spec in self._scan():
+                        if spec.name in specs:
+                            logger.warning("Ignoring duplicate strategy %s", spec.name)
+                            continue
+                        specs[spec.name] = spec
+                    logger.info("Discovered %s strategies", len(specs))
+                    self._specs = specs
+        return self._specs
+
+    def _scan(self) -> Iterable[StrategySpec]:
+        if self.package:
+            package = importlib.import_module(self.package)
+            for module in pkgutil.iter_modules(package.__path__):
+                yield from _declared(importlib.import_module(f"{self.package}.{module.name}"))
+        if self.entry_point_group:
+            for entry_point in entry_points(group=self.entry_point_group):
+                try:
+                    yield from _declared(entry_point.load())
+                except Exception:
+                    logger.exception("Failed to load strategy plugin %s", entry_point.name)
+
+    def register(self, spec: StrategySpec) -> None:
+        """Add (or replace) a strategy at runtime"""
+        specs = self._discovered()
+        with self._lock:
+            specs[spec.name] = spec
+
+    def get(self, name: str) -> StrategySpec:
+        specs = self._discovered()
+        if name not in specs:
+            raise ValueError(f"Strategy {name} not found")
+        return specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._discovered())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._discovered()
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Display name, parameter schema and default warm-up of every strategy, without loading any"""
+        return {name: spec.describe() for name, spec in self._discovered().items()}
+
+
+def _declared(source: Any) -> List[StrategySpec]:
+    """Strategy specs from an entry point target or a scanned module"""
+    if isinstance(source, ModuleType):
+        source = getattr(source, "STRATEGIES", [])
+    if isinstance(source, StrategySpec):
+        return [source]
+    specs = list(source)
+    for spec in specs:
+        if not isinstance(spec, StrategySpec):
+            raise TypeError(f"Expected a StrategySpec, got {type(spec).__name__}")
+    return specs
+
+
+# Shared by every BacktestService in the process
+strategy_registry = StrategyRegistry()
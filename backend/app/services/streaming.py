@@ -0,0 +1,273 @@
+import abc
+import math
+from collections import deque
+from typing import Any, Dict, List, Sequence, Type, Union
+
+import numpy as np
+import logging
+
+from .indicators import EMA_TIE_TOLERANCE, RSI_METHODS, ema_alpha
+from .rolling_regression import rolling_ols
+
+logger = logging.getLogger(__name__)
+
+Bar = Union[float, Dict[str, Any], Any]
+
+
+class StreamingStrategy(abc.ABC):
+    """
+    Incremental counterpart of a BacktestService strategy for one symbol.
+
+    Feed bars oldest first through `update`, which returns the position for that bar:
+    the same value the batch strategy produces at that row when run over every bar seen
+    so far. History only has to be replayed once, to warm the state up.
+    """
+
+    def __init__(self, parameters: Dict[str, Any]):
+        self.parameters = dict(parameters)
+        self.bars_seen = 0
+
+    def update(self, bar: Bar) -> float:
+        """Add the next bar (a close price, a dict with "close" or an object with .close) and get its signal"""
+        close = _close_price(bar)
+        if not math.isfinite(close):
+            raise ValueError("Invalid data: close price must be a finite number")
+        signal = self._update(close)
+        self.bars_seen += 1
+        return signal
+
+    def update_many(self, bars: Sequence[Bar]) -> np.ndarray:
+        """Feed several bars in order and get their signals"""
+        return np.array([self.update(bar) for bar in bars], dtype=np.float64)
+
+    @abc.abstractmethod
+    def _update(self, close: float) -> float:
+        """Advance the state by one validated close price and return that bar's signal"""
+
+
+class StreamingSMA:
+    """
+    Simple moving averages over several windows, updated per bar in O(number of windows).
+
+    Keeps the same offset cumulative sum as `indicators.sma`, differenced over a ring
+    buffer, so every average is bit-for-bit the batch value, including the exact value
+    returned over runs of identical prices.
+    """
+
+    def __init__(self, windows: Sequence[int]):
+        self.windows = [int(window) for window in windows]
+        if any(window < 1 for window in self.windows):
+            raise ValueError("Moving average windows must be positive integers")
+        self._sums = deque([0.0], maxlen=max(self.windows) + 1)
+        self._offset = None
+        self._count = 0
+        self._run_length = 0
+        self._last = None
+
+    def update(self, value: float) -> List[float]:
+        if self._offset is None:
+            self._offset = value
+        self._sums.append(self._sums[-1] + (value - self._offset))
+        self._count += 1
+        self._run_length = self._run_length + 1 if value == self._last else 1
+        self._last = value
+
+        averages = []
+        for window in self.windows:
+            if self._count < window:
+                averages.append(math.nan)
+            elif self._run_length >= window:
+                averages.append(value)
+            else:
+                averages.append((self._sums[-1] - self._sums[-1 - window]) / window + self._offset)
+        return averages
+
+
+class StreamingWilderMean:
+    """
+    Wilder's smoothing of a stream, like the "wilder" method of `indicators.rsi`: NaN
+    until `period` values have arrived, their mean (summed in order, as the batch
+    path's column mean is), then avg += (value - avg) / period.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self._count = 0
+        self._sum = 0.0
+        self._average = math.nan
+
+    def update(self, value: float) -> float:
+        if self._count < self.period:
+            self._count += 1
+            self._sum += value
+            if self._count == self.period:
+                self._average = self._sum / self.period
+            return self._average
+        self._average += (value - self._average) / self.period
+        return self._average
+
+
+class StreamingRSI:
+    """
+    Relative strength index of a stream of prices, one `indicators.rsi` value per bar.
+
+    With "sma" the gains and losses are averaged by StreamingSMA, the same offset
+    running sums as the batch `indicators.sma` kernel, and clamped at zero like it, so
+    every value is the batch value bit for bit. With "wilder" the recursion runs bar by
+    bar, while the batch path evaluates it with the blocked EMA scan: the two agree to
+    a few ulps.
+    """
+
+    def __init__(self, period: int, method: str = "sma"):
+        if method not in RSI_METHODS:
+            raise ValueError(f"Unknown RSI method {method}; choose one of {', '.join(RSI_METHODS)}")
+        self.method = method
+        if method == "sma":
+            self._gains, self._losses = StreamingSMA([period]), StreamingSMA([period])
+        else:
+            self._gains, self._losses = StreamingWilderMean(period), StreamingWilderMean(period)
+        self._previous = None
+
+    def update(self, close: float) -> float:
+        # Like the batch path, the first bar has no change and counts as zero gain and
+        # loss in a simple average; Wilder's averages start from the first real change
+        first = self._previous is None
+        delta = 0.0 if first else close - self._previous
+        self._previous = close
+        if first and self.method == "wilder":
+            return math.nan
+        gain = float(np.maximum(delta, 0.0))
+        loss = float(np.maximum(-delta, 0.0))
+        if self.method == "sma":
+            # Averages of non-negative values; clamp the running-sum residue below zero
+            return _rsi(float(np.maximum(self._gains.update(gain)[0], 0.0)), float(np.maximum(self._losses.update(loss)[0], 0.0)))
+        return _rsi(self._gains.update(gain), self._losses.update(loss))
+
+
+class SimpleMovingAverageStream(StreamingStrategy):
+    """Streaming `simple_moving_average`: long above the long SMA, short below"""
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self.averages = StreamingSMA([parameters.get("short_window", 20), parameters.get("long_window", 50)])
+
+    def _update(self, close: float) -> float:
+        short, long = self.averages.update(close)
+        return float(_compare(short, long))
+
+
+class ExponentialMovingAverageStream(StreamingStrategy):
+    """Streaming `exponential_moving_average`: y[t] = (1 - a) * y[t - 1] + a * x[t] for both spans"""
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        smoothing = parameters.get("smoothing", 2)
+        self.alphas = [float(ema_alpha(parameters.get("short_window", 8), smoothing)),
+                       float(ema_alpha(parameters.get("long_window", 20), smoothing))]
+        self.values = None
+
+    def _update(self, close: float) -> float:
+        if self.values is None:
+            self.values = [close, close]
+        else:
+            self.values = [(1 - alpha) * value + alpha * close for alpha, value in zip(self.alphas, self.values)]
+        return float(_compare(*self.values, tolerance=EMA_TIE_TOLERANCE))
+
+
+class RSIStream(StreamingStrategy):
+    """Streaming `rsi_strategy`: long below the oversold level, short above the overbought level"""
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self.rsi = StreamingRSI(parameters.get("period", 14), parameters.get("method", "sma"))
+        self.overbought = parameters.get("overbought", 70)
+        self.oversold = parameters.get("oversold", 30)
+
+    def _update(self, close: float) -> float:
+        rsi = self.rsi.update(close)
+        if rsi > self.overbought:
+            return -1.0
+        if rsi < self.oversold:
+            return 1.0
+        return 0.0
+
+
+class MomentumRegressionStream(StreamingStrategy):
+    """
+    Streaming `momentum_regression`.
+
+    The SMAs update in O(1); each bar then refits the OLS on the latest
+    `regression_window` rows held in a ring buffer, which costs O(window) per bar no
+    matter how long the history is, and gives the batch path's estimates exactly.
+    """
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self.averages = StreamingSMA([
+            parameters.get("short_sma", 5),
+            parameters.get("mid_sma", 20),
+            parameters.get("long_sma", 60),
+        ])
+        self.window = parameters.get("regression_window", 30)
+        self.min_nobs = max(self.window // 2, 1)
+        self.returns = deque(maxlen=self.window)
+        self.regressors = deque(maxlen=self.window)
+        self.previous_close = None
+        self.gamma = math.nan
+
+    def _update(self, close: float) -> float:
+        # The position at this bar comes from the fit over the preceding bars
+        signal = 0.0 if self.bars_seen < self.window or math.isnan(self.gamma) else self.gamma
+
+        self.returns.append(math.nan if self.previous_close is None else close / self.previous_close - 1)
+        self.regressors.append(self.averages.update(close))
+        self.previous_close = close
+        if len(self.returns) == self.window:
+            fit = rolling_ols(
+                np.array(self.returns),
+                np.array(self.regressors),
+                window=self.window,
+                min_nobs=self.min_nobs,
+            )
+            alpha = fit["params"][-1, 0]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.gamma = float(np.clip(alpha / (fit["sigma_squared"][-1] + 1e-6), -1, 1))
+        return signal
+
+
+STREAMING_STRATEGIES: Dict[str, Type[StreamingStrategy]] = {
+    "simple_moving_average": SimpleMovingAverageStream,
+    "exponential_moving_average": ExponentialMovingAverageStream,
+    "rsi_strategy": RSIStream,
+    "momentum_regression": MomentumRegressionStream,
+}
+
+
+def create_streaming_strategy(strategy_name: str, parameters: Dict[str, Any]) -> StreamingStrategy:
+    """Build the incremental evaluator for a strategy"""
+    if strategy_name not in STREAMING_STRATEGIES:
+        raise ValueError(f"Strategy {strategy_name} not found")
+    return STREAMING_STRATEGIES[strategy_name](parameters)
+
+
+def _close_price(bar: Bar) -> float:
+    if isinstance(bar, dict):
+        return float(bar["close"])
+    if hasattr(bar, "close"):
+        return float(bar.close)
+    return float(bar)
+
+
+def _compare(fast: float, slow: float, tolerance: float = 0.0) -> int:
+    """Scalar `crossover_signals`: 1, -1, or 0 on a (near) tie or NaN"""
+    if math.isnan(fast) or math.isnan(slow):
+        return 0
+    if tolerance > 0 and abs(fast - slow) <= tolerance * max(abs(fast), abs(slow)):
+        return 0
+    return (fast > slow) - (fast < slow)
+
+
+def _rsi(gain: float, loss: float) -> float:
+    """100 - 100 / (1 + gain / loss) with numpy's division semantics"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(100 - 100 / (1 + np.float64(gain) / np.float64(loss)))
@@ -0,0 +1,242 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .metrics import DEFAULT_PERIODS_PER_YEAR, infer_periods_per_year
+
+logger = logging.getLogger(__name__)
+
+REALIZED_ESTIMATORS = ("close_to_close", "parkinson", "garman_klass", "yang_zhang")
+
+# Initial capacity of the running sums; doubled whenever appended bars do not fit
+DEFAULT_CAPACITY = 1024
+
+_LOG2 = np.log(2.0)
+
+# Rows of the per-bar term table, each kept as a running (prefix) sum
+_TERMS = (
+    "cc", "cc2", "cc_n",         # close-to-close log returns
+    "park", "park_n",            # Parkinson: ln(H/L)^2 / (4 ln 2)
+    "gk", "gk_n",                # Garman-Klass: 0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2
+    "o", "o2", "c", "c2", "rs", "yz_n",  # Yang-Zhang: overnight, open-to-close, Rogers-Satchell
+)
+_ROW = {name: row for row, name in enumerate(_TERMS)}
+
+
+def bar_terms(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, previous_close: float = np.nan) -> np.ndarray:
+    """
+    Per-bar variance terms of every estimator, shape (len(_TERMS), n).
+
+    `previous_close` is the close before the first bar, for its close-to-close and
+    overnight returns. Bars missing a price contribute zeros and are left out of the
+    matching count row.
+    """
+    open_, high, low, close = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    previous = np.concatenate([[previous_close], close[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cc = np.log(close / previous)
+        overnight = np.log(open_ / previous)
+        hl = np.log(high / low)
+        co = np.log(close / open_)
+        rs = np.log(high / close) * np.log(high / open_) + np.log(low / close) * np.log(low / open_)
+
+    terms = np.zeros((len(_TERMS), len(close)))
+    valid = np.isfinite(cc)
+    terms[_ROW["cc"]] = np.where(valid, cc, 0.0)
+    terms[_ROW["cc2"]] = terms[_ROW["cc"]] ** 2
+    terms[_ROW["cc_n"]] = valid
+
+    valid = np.isfinite(hl)
+    terms[_ROW["park"]] = np.where(valid, hl * hl / (4 * _LOG2), 0.0)
+    terms[_ROW["park_n"]] = valid
+
+    valid = np.isfinite(hl) & np.isfinite(co)
+    terms[_ROW["gk"]] = np.where(valid, 0.5 * hl * hl - (2 * _LOG2 - 1) * co * co, 0.0)
+    terms[_ROW["gk_n"]] = valid
+
+    valid = np.isfinite(overnight) & np.isfinite(co) & np.isfinite(rs)
+    terms[_ROW["o"]] = np.where(valid, overnight, 0.0)
+    terms[_ROW["o2"]] = terms[_ROW["o"]] ** 2
+    terms[_ROW["c"]] = np.where(valid, co, 0.0)
+    terms[_ROW["c2"]] = terms[_ROW["c"]] ** 2
+    terms[_ROW["rs"]] = np.where(valid, rs, 0.0)
+    terms[_ROW["yz_n"]] = valid
+    return terms
+
+
+def _validate_windows(windows: Sequence[int]) -> np.ndarray:
+    windows = np.asarray(windows, dtype=np.int64)
+    if windows.ndim != 1 or len(windows) == 0 or np.any(windows < 2):
+        raise ValueError("Volatility windows must be a non-empty list of integers of at least 2 bars")
+    return windows
+
+
+def estimate_from_sums(sums: np.ndarray, windows: Sequence[int], estimator: str, periods_per_year: float) -> np.ndarray:
+    """
+    Annualized rolling volatility of every window at once from running term sums.
+
+    Args:
+        sums: Running sums of `bar_terms`, shape (len(_TERMS), n + 1) with a leading zero column
+        windows: Window lengths in bars
+        estimator: One of REALIZED_ESTIMATORS
+
+    Returns:
+        (n, len(windows)) volatilities; NaN until a window holds `window` valid bars
+    """
+    if estimator not in REALIZED_ESTIMATORS:
+        raise ValueError(f"Unknown volatility estimator {estimator!r}; choose from {', '.join(REALIZED_ESTIMATORS)}")
+    windows = _validate_windows(windows)
+    n = sums.shape[1] - 1
+    rows = np.arange(1, n + 1)[:, None]
+    starts = rows - windows[None, :]
+    inside = starts >= 0
+    starts = np.maximum(starts, 0)
+
+    def window_sum(name: str) -> np.ndarray:
+        running = sums[_ROW[name]]
+        return running[rows] - running[starts]
+
+    def sample_variance(total: np.ndarray, squares: np.ndarray, count: np.ndarray) -> np.ndarray:
+        return (squares - total * total / count) / (count - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if estimator == "close_to_close":
+            count = window_sum("cc_n")
+            variance = sample_variance(window_sum("cc"), window_sum("cc2"), count)
+        elif estimator == "parkinson":
+            count = window_sum("park_n")
+            variance = window_sum("park") / count
+        elif estimator == "garman_klass":
+            count = window_sum("gk_n")
+            variance = window_sum("gk") / count
+        else:
+            count = window_sum("yz_n")
+            k = 0.34 / (1.34 + (windows + 1) / (windows - 1))
+            variance = (
+                sample_variance(window_sum("o"), window_sum("o2"), count)
+                + k * sample_variance(window_sum("c"), window_sum("c2"), count)
+                + (1 - k) * window_sum("rs") / count
+            )
+        # Differences of running sums can leave rounding noise just below zero
+        volatility = np.sqrt(np.maximum(variance, 0.0) * periods_per_year)
+    return np.where(inside & (count == windows[None, :]), volatility, np.nan)
+
+
+def realized_volatility(
+    df: pd.DataFrame,
+    windows: Sequence[int],
+    estimator: str = "close_to_close",
+    periods_per_year: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Annualized rolling realized volatility of OHLC bars over several windows in one pass.
+
+    Estimators:
+        close_to_close: sample standard deviation of log close-to-close returns
+        parkinson: high-low range
+        garman_klass: high-low range and open-to-close return
+        yang_zhang: overnight and open-to-close variances plus the Rogers-Satchell term,
+            robust to opening jumps and drift
+
+    Returns:
+        (len(df), len(windows)) array; row i uses the `window` bars ending at row i
+    """
+    state = RealizedVolatility(periods_per_year)
+    state.update(df)
+    return state.estimate(windows, estimator)
+
+
+class RealizedVolatility:
+    """
+    Running sums of every estimator's per-bar terms for one bar series.
+
+    `update` appends only the bars newer than the last one seen, so a series that grows
+    by a bar costs O(1) to extend, and `latest` reads the current estimates of any
+    windows in O(number of windows) straight from the sums.
+    """
+
+    def __init__(self, periods_per_year: Optional[float] = None):
+        self.periods_per_year = periods_per_year
+        self._timestamps = np.empty(DEFAULT_CAPACITY, dtype=np.int64)
+        self._sums = np.zeros((len(_TERMS), DEFAULT_CAPACITY + 1))
+        self._size = 0
+        self._last_close = np.nan
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._timestamps[:self._size].astype("datetime64[ns]"), name="timestamp")
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self._timestamps[self._size - 1]) if self._size else None
+
+    @property
+    def last_close(self) -> float:
+        return self._last_close
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Append the bars of `df` that are newer than the last bar seen; older ones are skipped.
+
+        Returns:
+            Number of bars appended
+        """
+        timestamps = df.index.as_unit("ns").asi8
+        if self._size:
+            newer = timestamps > self._timestamps[self._size - 1]
+            df, timestamps = df[newer], timestamps[newer]
+        if df.empty:
+            return 0
+
+        if self.periods_per_year is None:
+            self.periods_per_year = infer_periods_per_year(df.index)
+        close = df["close"].to_numpy(dtype=np.float64)
+        terms = bar_terms(df["open"].to_numpy(), df["high"].to_numpy(), df["low"].to_numpy(), close, self._last_close)
+
+        k = len(timestamps)
+        self._reserve(k)
+        self._timestamps[self._size:self._size + k] = timestamps
+        self._sums[:, self._size + 1:self._size + k + 1] = self._sums[:, self._size:self._size + 1] + np.cumsum(terms, axis=1)
+        self._size += k
+        self._last_close = close[-1]
+        return k
+
+    def snapshot(self) -> "RealizedVolatility":
+        """Copy of the state as it is now, unaffected by later updates to this one"""
+        copy = RealizedVolatility(self.periods_per_year)
+        copy._timestamps = np.empty(max(self._size, 1), dtype=np.int64)
+        copy._timestamps[:self._size] = self._timestamps[:self._size]
+        copy._sums = self._sums[:, :max(self._size, 1) + 1].copy()
+        copy._size = self._size
+        copy._last_close = self._last_close
+        return copy
+
+    def estimate(self, windows: Sequence[int], estimator: str = "close_to_close") -> np.ndarray:
+        """Rolling volatility of every window at every bar, shape (len(self), len(windows))"""
+        return estimate_from_sums(self._sums[:, :self._size + 1], windows, estimator, self.periods_per_year or DEFAULT_PERIODS_PER_YEAR)
+
+    def latest(self, windows: Sequence[int], estimator: str = "close_to_close") -> np.ndarray:
+        """Volatility of every window ending at the last bar"""
+        windows = _validate_windows(windows)
+        if not self._size:
+            return np.full(len(windows), np.nan)
+        first = max(self._size - int(windows.max()), 0)
+        return estimate_from_sums(self._sums[:, first:self._size + 1] - self._sums[:, first:first + 1], windows, estimator, self.periods_per_year or DEFAULT_PERIODS_PER_YEAR)[-1]
+
+    def _reserve(self, extra: int) -> None:
+        capacity = self._sums.shape[1] - 1
+        needed = self._size + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        sums = np.zeros((len(_TERMS), capacity + 1))
+        sums[:, :self._size + 1] = self._sums[:, :self._size + 1]
+        self._timestamps, self._sums = timestamps, sums
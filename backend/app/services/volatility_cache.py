@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .option_chain import OptionChain
+from .volatility import RealizedVolatility
+from .volatility_surface import DEFAULT_MONEYNESS, VolatilitySurface, build_surface
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class VolatilityCache:
+    """
+    In-process cache of realized-volatility state and implied-volatility surfaces.
+
+    Realized volatility is kept per (symbol, interval, first bar) as running sums, so a
+    request for the same series with newer bars only processes the bars that arrived
+    since. Surfaces are kept per underlying with the implied volatility of every
+    contract: identical quotes are served as is, and changed quotes are re-solved
+    starting from each contract's previous volatility, which usually takes one or two
+    Newton steps. Both maps are LRUs bounded by `max_entries` (VOLATILITY_CACHE_MAX_ENTRIES).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("VOLATILITY_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self._realized: "OrderedDict[Tuple[str, str, int], RealizedVolatility]" = OrderedDict()
+        self._surfaces: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.updates = 0
+        self.misses = 0
+
+    def realized(self, symbol: str, interval: str, df: pd.DataFrame) -> RealizedVolatility:
+        """
+        Realized-volatility state covering exactly the bars of `df`, as a snapshot of its
+        own that concurrent requests extending the cached state do not change.
+
+        A cached state for the same series is extended with the bars after its last one
+        when `df` still holds that bar unchanged; otherwise (a revised bar, or `df` ending
+        earlier) the state is rebuilt from `df`.
+        """
+        if df.empty:
+            raise ValueError("No bars to estimate volatility from")
+        key = (symbol.upper(), interval, int(df.index[0].value))
+        with self._lock:
+            state = self._realized.get(key)
+            if state is not None:
+                self._realized.move_to_end(key)
+                last = state.last_timestamp
+                position = df.index.searchsorted(last)
+                continues = position < len(df) and df.index[position] == last and df["close"].iat[position] == state.last_close
+                if continues:
+                    if state.update(df):
+                        self.updates += 1
+                    else:
+                        self.hits += 1
+                    if len(state) == len(df):
+                        return state.snapshot()
+
+        state = RealizedVolatility()
+        state.update(df)
+        snapshot = state.snapshot()
+        with self._lock:
+            self.misses += 1
+            self._realized[key] = state
+            self._realized.move_to_end(key)
+            while len(self._realized) > self.max_entries:
+                self._realized.popitem(last=False)
+        return snapshot
+
+    def surface(
+        self,
+        symbol: str,
+        chain: OptionChain,
+        spot: float,
+        as_of: Union[str, date, datetime],
+        rate: float = 0.0,
+        dividend: float = 0.0,
+        moneyness: Sequence[float] = DEFAULT_MONEYNESS,
+    ) -> Tuple[VolatilitySurface, np.ndarray]:
+        """
+        Implied-volatility surface of `chain`, and each contract's implied volatility.
+
+        Rebuilt only when the quotes, spot, quote time or settings changed, and then warm
+        started from the previous solution of every contract still in the chain.
+        """
+        symbol = symbol.upper()
+        settings = (float(spot), pd.Timestamp(as_of), float(rate), float(dividend), tuple(float(x) for x in moneyness))
+        with self._lock:
+            previous = self._surfaces.get(symbol)
+            if previous is not None:
+                self._surfaces.move_to_end(symbol)
+
+        initial_guess = None
+        if previous is not None:
+            same_contracts = len(previous["symbols"]) == len(chain) and np.array_equal(previous["symbols"], chain.symbols)
+            if same_contracts and previous["settings"] == settings and np.array_equal(previous["quotes"], chain.quotes, equal_nan=True):
+                with self._lock:
+                    self.hits += 1
+                return previous["surface"], previous["implied_volatility"]
+            initial_guess = _match_previous(previous["symbols"], previous["implied_volatility"], chain.symbols)
+
+        built = build_surface(chain, spot, as_of, rate, dividend, moneyness, initial_guess=initial_guess)
+        with self._lock:
+            if previous is None:
+                self.misses += 1
+            else:
+                self.updates += 1
+            self._surfaces[symbol] = {
+                "symbols": chain.symbols,
+                "quotes": chain.quotes.copy(),
+                "settings": settings,
+                **built,
+            }
+            self._surfaces.move_to_end(symbol)
+            while len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        return built["surface"], built["implied_volatility"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "realized_entries": len(self._realized),
+                "surface_entries": len(self._surfaces),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "updates": self.updates,
+                "misses": self.misses,
+            }
+
+
+def _match_previous(previous_symbols: np.ndarray, previous_values: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+    """Previous per-contract values aligned to `symbols` by binary search, NaN for new contracts"""
+    order = np.argsort(previous_symbols)
+    ordered = previous_symbols[order]
+    position = np.clip(np.searchsorted(ordered, symbols), 0, max(len(ordered) - 1, 0))
+    if len(ordered) == 0:
+        return np.full(len(symbols), np.nan)
+    found = ordered[position] == symbols
+    return np.where(found, previous_values[order][position], np.nan)
@@ -0,0 +1,161 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+import logging
+
+from .option_chain import OptionChain
+
+logger = logging.getLogger(__name__)
+
+# Log-moneyness ln(strike / forward) grid the surface is sampled on by default
+DEFAULT_MONEYNESS = tuple(np.round(np.linspace(-0.5, 0.5, 21), 2))
+
+
+class VolatilitySurface:
+    """
+    Implied volatility over log-moneyness ln(K / F) and time to expiry.
+
+    Stored as total implied variance w = vol^2 * t on a (expiry x moneyness) grid:
+    interpolation is linear in moneyness within an expiry and linear in total variance
+    across expiries, and beyond the first and last expiries the volatility of the nearest
+    one is held flat.
+    """
+
+    def __init__(
+        self,
+        expirations: np.ndarray,
+        times: np.ndarray,
+        moneyness: np.ndarray,
+        total_variance: np.ndarray,
+        spot: float,
+        rate: float = 0.0,
+        dividend: float = 0.0,
+    ):
+        self.expirations = expirations
+        self.times = times
+        self.moneyness = moneyness
+        self.total_variance = total_variance
+        self.spot = spot
+        self.rate = rate
+        self.dividend = dividend
+
+    @property
+    def volatilities(self) -> np.ndarray:
+        """Implied volatility at every grid point, shape (len(times), len(moneyness))"""
+        return np.sqrt(self.total_variance / self.times[:, None])
+
+    def volatility(self, moneyness, time) -> np.ndarray:
+        """Interpolated implied volatility at log-moneyness `moneyness` and `time` years; both broadcast"""
+        moneyness, time = np.broadcast_arrays(np.asarray(moneyness, dtype=np.float64), np.asarray(time, dtype=np.float64))
+        grid = self.moneyness
+        column = np.clip(np.searchsorted(grid, moneyness, side="right") - 1, 0, max(len(grid) - 2, 0))
+        if len(grid) > 1:
+            weight = np.clip((moneyness - grid[column]) / (grid[column + 1] - grid[column]), 0.0, 1.0)
+        else:
+            weight = np.zeros(moneyness.shape)
+        right = np.minimum(column + 1, len(grid) - 1)
+
+        rows = np.clip(np.searchsorted(self.times, time, side="right") - 1, 0, len(self.times) - 1)
+        following = np.minimum(rows + 1, len(self.times) - 1)
+        variance_before = (1 - weight) * self.total_variance[rows, column] + weight * self.total_variance[rows, right]
+        variance_after = (1 - weight) * self.total_variance[following, column] + weight * self.total_variance[following, right]
+        time_before, time_after = self.times[rows], self.times[following]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(time_after > time_before, (time - time_before) / (time_after - time_before), 0.0)
+            total = np.where(
+                time <= time_before,
+                # Before the first expiry (or at a grid expiry): that expiry's volatility
+                variance_before / time_before * time,
+                np.where(
+                    time >= time_after,
+                    variance_after / time_after * time,
+                    variance_before + fraction * (variance_after - variance_before),
+                ),
+            )
+            return np.sqrt(total / time)
+
+    def volatility_at_strike(self, strikes, time) -> np.ndarray:
+        """Interpolated implied volatility at absolute `strikes` and `time` years"""
+        time = np.asarray(time, dtype=np.float64)
+        forward = self.spot * np.exp((self.rate - self.dividend) * time)
+        return self.volatility(np.log(np.asarray(strikes, dtype=np.float64) / forward), time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spot": self.spot,
+            "expirations": [str(expiration) for expiration in self.expirations],
+            "times": self.times.tolist(),
+            "moneyness": self.moneyness.tolist(),
+            "volatilities": self.volatilities.tolist(),
+        }
+
+
+def build_surface(
+    chain: OptionChain,
+    spot: float,
+    as_of: Union[str, date, datetime],
+    rate: float = 0.0,
+    dividend: float = 0.0,
+    moneyness: Sequence[float] = DEFAULT_MONEYNESS,
+    initial_guess: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Solve the implied volatility of every quoted contract and fit a surface through them.
+
+    Each expiry's smile uses its out-of-the-money contracts (puts below the forward,
+    calls at or above it), whose quotes carry the most time value. Their total variances
+    are interpolated onto the `moneyness` grid for all expiries in a single np.interp
+    call, by shifting each expiry's points into its own disjoint band. Total variance is
+    then made non-decreasing across expiries so the surface has no calendar arbitrage.
+
+    Args:
+        chain: Contracts of one underlying, with `quotes`
+        spot: Underlying price
+        as_of: Quote time; naive timestamps are UTC
+        initial_guess: Per-contract volatilities to warm-start the solver (NaN where unknown)
+
+    Returns:
+        Dict with the `surface` and the per-contract `implied_volatility` array
+
+    Raises:
+        ValueError: if no contract has a usable quote
+    """
+    grid = np.asarray(moneyness, dtype=np.float64)
+    if grid.ndim != 1 or len(grid) == 0 or np.any(np.diff(grid) <= 0):
+        raise ValueError("Moneyness grid must be a non-empty increasing list")
+    if not spot or spot <= 0:
+        raise ValueError("Spot price must be positive")
+
+    times = chain.years_to_expiry(as_of)
+    implied = chain.implied_volatility(chain.quotes, spot, as_of, rate, dividend, initial_guess=initial_guess)
+    log_moneyness = np.log(chain.strikes / spot) - (rate - dividend) * times
+    out_of_the_money = np.where(chain.is_call, log_moneyness >= 0, log_moneyness < 0)
+    usable = out_of_the_money & np.isfinite(implied) & (times > 0)
+    if not usable.any():
+        raise ValueError("No option quotes with a solvable implied volatility")
+
+    expirations, group = np.unique(chain.expirations[usable], return_inverse=True)
+    group = group.ravel()
+    x = log_moneyness[usable]
+    variance = implied[usable] ** 2 * times[usable]
+    expiry_times = np.zeros(len(expirations))
+    np.maximum.at(expiry_times, group, times[usable])
+
+    # One interpolation for every expiry: shift each expiry's points into its own band,
+    # wider than any smile, and clip queries to the band's data for flat extrapolation
+    band = np.ptp(x) + 1.0
+    order = np.lexsort((x, group))
+    shifted = x[order] + group[order] * band
+    lowest = np.full(len(expirations), np.inf)
+    highest = np.full(len(expirations), -np.inf)
+    np.minimum.at(lowest, group, x)
+    np.maximum.at(highest, group, x)
+    queries = np.clip(grid[None, :], lowest[:, None], highest[:, None]) + np.arange(len(expirations))[:, None] * band
+    total_variance = np.interp(queries, shifted, variance[order])
+    total_variance = np.maximum.accumulate(total_variance, axis=0)
+
+    surface = VolatilitySurface(expirations, expiry_times, grid, total_variance, float(spot), rate, dividend)
+    logger.debug("Built volatility surface from %s of %s contracts over %s expirations", int(usable.sum()), len(chain), len(expirations))
+    return {"surface": surface, "implied_volatility": implied}
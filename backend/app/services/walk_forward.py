@@ -0,0 +1,165 @@
+import functools
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import logging
+
+from .parameter_sweep import RANKING_METRICS, map_over_frame
+from .metrics import RETURN_METRICS, compute_metrics, infer_periods_per_year
+from .result_cache import normalize_parameters
+
+logger = logging.getLogger(__name__)
+
+WALK_FORWARD_METHODS = ("walk_forward", "purged_kfold")
+
+# Train and test sets as half-open [start, stop) bar ranges
+Split = Dict[str, Any]
+
+
+def walk_forward_splits(n: int, train_size: int, test_size: int, anchored: bool = False) -> List[Split]:
+    """
+    Consecutive train/test windows rolled forward by one test window at a time.
+
+    Args:
+        n: Number of bars
+        train_size: Bars in each train window (the first one, when anchored)
+        test_size: Bars in each test window; test windows tile the series without overlap
+        anchored: Grow the train window from the first bar instead of rolling it
+    """
+    if train_size < 1 or test_size < 1:
+        raise ValueError("train_size and test_size must be positive")
+    splits = []
+    test_start = train_size
+    while test_start < n:
+        test_stop = min(test_start + test_size, n)
+        train_start = 0 if anchored else test_start - train_size
+        splits.append({"train": [(train_start, test_start)], "test": (test_start, test_stop)})
+        test_start = test_stop
+    if not splits:
+        raise ValueError(f"Not enough data for walk-forward: {n} bars, train_size={train_size}")
+    return splits
+
+
+def purged_kfold_splits(n: int, n_splits: int, purge: int = 0) -> List[Split]:
+    """
+    K contiguous test folds, each trained on the rest of the series.
+
+    `purge` bars on each side of the test fold are also left out of training, so
+    indicator look-back windows spanning the boundary do not leak test data into the
+    train score.
+    """
+    if n_splits < 2:
+        raise ValueError("n_splits must be at least 2")
+    if purge < 0:
+        raise ValueError("purge must not be negative")
+    if n < n_splits:
+        raise ValueError(f"Not enough data for {n_splits} folds: {n} bars")
+    edges = np.linspace(0, n, n_splits + 1).astype(int)
+    splits = []
+    for test_start, test_stop in zip(edges[:-1], edges[1:]):
+        train = [
+            (start, stop)
+            for start, stop in ((0, test_start - purge), (test_stop + purge, n))
+            if stop > start
+        ]
+        if not train:
+            raise ValueError(f"purge={purge} leaves no training data for a fold")
+        splits.append({"train": train, "test": (int(test_start), int(test_stop))})
+    return splits
+
+
+def strategy_returns(service, df: pd.DataFrame, strategy_name: str, parameters: Dict[str, Any]) -> np.ndarray:
+    """Per-bar strategy returns over the whole series, NaN on the first bar"""
+    signals = service.strategies[strategy_name](df, parameters).fillna(0).to_numpy(dtype=np.float64)
+    return df["close"].pct_change().to_numpy() * signals
+
+
+def run_walk_forward(
+    df: pd.DataFrame,
+    strategy_name: str,
+    combinations: List[Dict[str, Any]],
+    splits: List[Split],
+    rank_by: str = "sharpe_ratio",
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Pick the best parameters on every train set and score them on the following test set.
+
+    Signals only depend on past bars, so each combination's signals are computed once
+    over the whole series and then scored on every fold's train ranges; combinations
+    are spread over worker processes. Each fold's winner is then applied to its test
+    range, and the test ranges are stitched into one out-of-sample equity curve.
+
+    Returns:
+        Dict with per-fold `folds` and the stitched out-of-sample `total_return`,
+        `sharpe_ratio`, `max_drawdown` and `equity_curve` (one point per test bar)
+    """
+    if rank_by not in RANKING_METRICS:
+        raise ValueError(f"Cannot rank by {rank_by}; choose one of {', '.join(RANKING_METRICS)}")
+
+    periods_per_year = infer_periods_per_year(df.index)
+    task = functools.partial(_score_combination, strategy_name=strategy_name, splits=splits, periods_per_year=periods_per_year)
+    scored = map_over_frame(df, task, combinations, max_workers)
+    valid = [row for row in scored if "error" not in row]
+    if not valid:
+        raise ValueError(f"Every parameter combination failed: {scored[0]['error']}")
+
+    winners = [max(valid, key=lambda row: row["train"][number][rank_by]) for number in range(len(splits))]
+    # The winners' returns are computed in the sweep pool too, once per distinct winner
+    distinct = {normalize_parameters(best["parameters"]): best["parameters"] for best in winners}
+    task = functools.partial(_combination_returns, strategy_name=strategy_name)
+    returns_by_parameters: Dict[str, np.ndarray] = dict(zip(distinct, map_over_frame(df, task, list(distinct.values()), max_workers)))
+
+    folds = []
+    stitched = []
+    for number, (split, best) in enumerate(zip(splits, winners)):
+        key = normalize_parameters(best["parameters"])
+        test_start, test_stop = split["test"]
+        test_returns = returns_by_parameters[key][test_start:test_stop]
+        stitched.append(test_returns)
+        folds.append({
+            "fold": number,
+            "train_ranges": [(df.index[start].to_pydatetime(), df.index[stop - 1].to_pydatetime()) for start, stop in split["train"]],
+            "test_start": df.index[test_start].to_pydatetime(),
+            "test_end": df.index[test_stop - 1].to_pydatetime(),
+            "parameters": best["parameters"],
+            "train_metrics": best["train"][number],
+            "test_metrics": _metrics(test_returns, periods_per_year),
+        })
+
+    oos_returns = np.concatenate(stitched)
+    logger.info("Walk-forward completed: %s folds, %s of %s combinations scored", len(splits), len(valid), len(combinations))
+    return {
+        "folds": folds,
+        **_metrics(oos_returns, periods_per_year),
+        "equity_curve": np.cumprod(1 + np.nan_to_num(oos_returns, nan=0.0)),
+    }
+
+
+def _score_combination(
+    service,
+    df: pd.DataFrame,
+    parameters: Dict[str, Any],
+    strategy_name: str,
+    splits: List[Split],
+    periods_per_year: float,
+) -> Dict[str, Any]:
+    try:
+        returns = strategy_returns(service, df, strategy_name, parameters)
+    except ValueError as e:
+        return {"parameters": parameters, "error": str(e)}
+    train = [
+        _metrics(np.concatenate([returns[start:stop] for start, stop in split["train"]]), periods_per_year)
+        for split in splits
+    ]
+    return {"parameters": parameters, "train": train}
+
+
+def _combination_returns(service, df: pd.DataFrame, parameters: Dict[str, Any], strategy_name: str) -> np.ndarray:
+    return strategy_returns(service, df, strategy_name, parameters)
+
+
+def _metrics(returns: np.ndarray, periods_per_year: float) -> Dict[str, float]:
+    metrics = compute_metrics(returns, periods_per_year=periods_per_year)
+    return {name: float(np.nan_to_num(metrics[name], nan=0.0, posinf=0.0, neginf=0.0)) for name in RETURN_METRICS}
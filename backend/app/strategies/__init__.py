@@ -0,0 +1,2 @@
+# Built-in strategies. Every module here declares a STRATEGIES list of StrategySpec,
+# found by the strategy registry's package scan.
@@ -0,0 +1,66 @@
+from typing import Any, Dict
+
+import numpy as np
+import logging
+
+from ..services.indicator_cache import cached_sma
+from ..services.strategy_registry import StrategySpec
+
+logger = logging.getLogger(__name__)
+
+
+def momentum_regression_signals(close: np.ndarray, parameters: Dict[str, Any]) -> np.ndarray:
+    """Position sized by the regression of returns on three SMAs; close is (n,) or (n, m)"""
+    from ..services.rolling_regression import rolling_ols
+
+    short = parameters.get("short_sma", 5)
+    mid = parameters.get("mid_sma", 20)
+    long = parameters.get("long_sma", 60)
+    reg_window = parameters.get("regression_window", 30)
+
+    logger.info("Running Momentum Regression strategy: short=%s, mid=%s, long=%s, reg_window=%s", short, mid, long, reg_window)
+
+    averages = cached_sma(close, [short, mid, long])
+    returns = np.full(close.shape, np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+
+    # Regress each bar's return on the SMAs over the preceding `reg_window` bars.
+    # The fit for row i-1 covers rows i-reg_window..i-1 and sizes the position at row i.
+    fit = rolling_ols(
+        returns,
+        averages,
+        window=reg_window,
+        min_nobs=max(reg_window // 2, 1),
+    )
+    alpha = fit["params"][..., 0]
+    sigma_squared = fit["sigma_squared"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gamma = np.clip(alpha / (sigma_squared + 1e-6), -1, 1)
+
+    weights = np.zeros(close.shape)
+    weights[reg_window:] = gamma[reg_window - 1:-1]
+    return np.nan_to_num(weights, nan=0.0)
+
+
+def _warmup(parameters: Dict[str, Any]) -> int:
+    # The slowest SMA must fill before the regression window can start collecting rows
+    slowest = max(parameters["short_sma"], parameters["mid_sma"], parameters["long_sma"])
+    return slowest + parameters["regression_window"]
+
+
+STRATEGIES = [
+    StrategySpec(
+        "momentum_regression",
+        "Momentum Regression",
+        momentum_regression_signals,
+        parameters={
+            "short_sma": {"type": "integer", "default": 5, "minimum": 1, "description": "Bars in the short SMA regressor"},
+            "mid_sma": {"type": "integer", "default": 20, "minimum": 1, "description": "Bars in the middle SMA regressor"},
+            "long_sma": {"type": "integer", "default": 60, "minimum": 1, "description": "Bars in the long SMA regressor"},
+            "regression_window": {"type": "integer", "default": 30, "minimum": 2, "description": "Bars in each rolling regression"},
+        },
+        warmup=_warmup,
+        label="Momentum regression",
+        flat_on_error=True,
+    ),
+]
@@ -0,0 +1,69 @@
+from typing import Any, Dict
+
+import numpy as np
+import logging
+
+from ..services.indicator_cache import cached_ema, cached_sma
+from ..services.indicators import EMA_TIE_TOLERANCE, crossover_signals, ema_alpha
+from ..services.strategy_registry import StrategySpec
+
+logger = logging.getLogger(__name__)
+
+
+def simple_moving_average_signals(close: np.ndarray, parameters: Dict[str, Any]) -> np.ndarray:
+    """Long when the short SMA is above the long SMA, short when below; close is (n,) or (n, m)"""
+    short = parameters.get('short_window', 20)
+    long = parameters.get('long_window', 50)
+    logger.info("Running SMA strategy: short=%s, long=%s", short, long)
+
+    if len(close) < long:
+        logger.error("Not enough data points for SMA strategy. Need at least %s points, got %s", long, len(close))
+        raise ValueError(f"Not enough data points for SMA strategy. Need at least {long} points")
+
+    averages = cached_sma(close, [short, long])
+    return crossover_signals(averages[..., :1], averages[..., 1:])[..., 0, 0].astype(np.int64)
+
+
+def exponential_moving_average_signals(close: np.ndarray, parameters: Dict[str, Any]) -> np.ndarray:
+    """Long when the short EMA is above the long EMA, short when below; close is (n,) or (n, m)"""
+    short = parameters.get('short_window', 8)
+    long = parameters.get('long_window', 20)
+    smoothing = parameters.get('smoothing', 2)
+    logger.info("Running EMA strategy: short=%s, long=%s, smoothing=%s", short, long, smoothing)
+
+    if len(close) < long:
+        logger.error("Not enough data points for EMA strategy. Need at least %s points, got %s", long, len(close))
+        raise ValueError(f"Not enough data points for EMA strategy. Need at least {long} points")
+
+    # Calculate alpha for EMA based on smoothing factor
+    # Alpha = smoothing/(1+days)
+    averages = cached_ema(close, ema_alpha([short, long], smoothing))
+    crossover = crossover_signals(averages[..., :1], averages[..., 1:], tolerance=EMA_TIE_TOLERANCE)
+    return crossover[..., 0, 0].astype(np.int64)
+
+
+STRATEGIES = [
+    StrategySpec(
+        "simple_moving_average",
+        "Simple Moving Average",
+        simple_moving_average_signals,
+        parameters={
+            "short_window": {"type": "integer", "default": 20, "minimum": 1, "description": "Bars in the fast average"},
+            "long_window": {"type": "integer", "default": 50, "minimum": 1, "description": "Bars in the slow average"},
+        },
+        warmup="long_window",
+        label="SMA",
+    ),
+    StrategySpec(
+        "exponential_moving_average",
+        "Exponential Moving Average",
+        exponential_moving_average_signals,
+        parameters={
+            "short_window": {"type": "integer", "default": 8, "minimum": 1, "description": "Span of the fast average"},
+            "long_window": {"type": "integer", "default": 20, "minimum": 1, "description": "Span of the slow average"},
+            "smoothing": {"type": "number", "default": 2, "minimum": 0, "description": "Alpha = smoothing / (1 + span)"},
+        },
+        warmup="long_window",
+        label="EMA",
+    ),
+]
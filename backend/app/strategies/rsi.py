@@ -0,0 +1,88 @@
+from typing import Any, Dict, Hashable, List, Tuple
+
+import numpy as np
+import logging
+
+from ..services.indicator_cache import indicator_cache
+from ..services.indicators import RSI_METHODS, rsi, threshold_signals
+from ..services.strategy_registry import StrategySpec
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_rsi(prices, period: int = 14, method: str = "sma"):
+    """RSI of a Series, or of every column of a DataFrame, with the same index and columns"""
+    values = rsi(prices.to_numpy(dtype=np.float64), [period], method)[..., 0]
+    logger.debug("RSI calculated with period=%s, method=%s", period, method)
+    if values.ndim == 2:
+        return type(prices)(values, index=prices.index, columns=prices.columns)
+    return type(prices)(values, index=prices.index, name=prices.name)
+
+
+def rsi_columns(close: np.ndarray, settings: List[Tuple[int, str]]) -> np.ndarray:
+    """RSI for each (period, method) setting, shape close.shape + (len(settings),)"""
+    out = np.empty(close.shape + (len(settings),))
+    for method in dict.fromkeys(method for _, method in settings):
+        # All periods of one method come out of a single pass over the prices
+        positions = [position for position, setting in enumerate(settings) if setting[1] == method]
+        out[..., positions] = rsi(close, [settings[position][0] for position in positions], method)
+    return out
+
+
+def _setting(parameters: Dict[str, Any]) -> Tuple[int, str]:
+    return parameters.get('period', 14), parameters.get('method', 'sma')
+
+
+def rsi_signals(close: np.ndarray, parameters: Dict[str, Any]) -> np.ndarray:
+    """Long below the oversold level, short above the overbought level; close is (n,) or (n, m)"""
+    period, method = _setting(parameters)
+    overbought = parameters.get('overbought', 70)
+    oversold = parameters.get('oversold', 30)
+
+    logger.info("Running RSI strategy: period=%s, method=%s, overbought=%s, oversold=%s", period, method, overbought, oversold)
+    values = indicator_cache.columns(close, "rsi", [(period, method)], rsi_columns)[..., 0]
+
+    # Overbought wins where both thresholds are crossed
+    return threshold_signals(values, overbought, oversold)[..., 0, 0].astype(np.int64)
+
+
+def rsi_sweep_signals(close: np.ndarray, combinations: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Positions of every parameter combination, shape (n, len(combinations)).
+
+    Each distinct (period, method) RSI is computed once, then every combination's
+    thresholds are applied to its RSI column by broadcasting.
+    """
+    settings: Dict[Hashable, int] = {}
+    columns = [settings.setdefault(_setting(parameters), len(settings)) for parameters in combinations]
+    values = indicator_cache.columns(close, "rsi", list(settings), rsi_columns)[:, columns]
+
+    overbought = np.array([parameters.get('overbought', 70) for parameters in combinations], dtype=np.float64)
+    oversold = np.array([parameters.get('oversold', 30) for parameters in combinations], dtype=np.float64)
+    logger.info("Running RSI sweep: %s combinations over %s RSI settings", len(combinations), len(settings))
+    return np.where(values > overbought, -1, np.where(values < oversold, 1, 0)).astype(np.int8)
+
+
+STRATEGIES = [
+    StrategySpec(
+        "rsi_strategy",
+        "RSI Strategy",
+        rsi_signals,
+        parameters={
+            "period": {"type": "integer", "default": 14, "minimum": 1, "description": "Bars in the RSI averages"},
+            "method": {
+                "type": "string",
+                "default": "sma",
+                "enum": list(RSI_METHODS),
+                "description": "Averaging of gains and losses: simple moving average or Wilder's smoothing",
+            },
+            "overbought": {"type": "number", "default": 70, "minimum": 0, "description": "RSI above which to go short"},
+            "oversold": {"type": "number", "default": 30, "minimum": 0, "description": "RSI below which to go long"},
+        },
+        # One bar for the first price change, then a full window of changes
+        warmup=lambda parameters: parameters["period"] + 1,
+        label="RSI",
+        flat_on_error=True,
+        sweep_signals=rsi_sweep_signals,
+    ),
+]
@@ -0,0 +1,195 @@
+"""
+Offline benchmarks for BacktestService strategies and metrics.
+
+Runs every registered strategy plus the Sharpe ratio and max drawdown calculations on
+synthetic OHLCV bars, and records the wall time and peak traced memory of each. Results
+are written as JSON so two runs can be compared:
+
+    cd backend
+    python -m benchmarks.bench_backtest --output before.json
+    python -m benchmarks.bench_backtest --output after.json --compare before.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.backtest_service import BacktestService  # noqa: E402
+from app.services.execution import simulate_execution  # noqa: E402
+from app.services.indicator_cache import indicator_cache  # noqa: E402
+from app.services.metrics import compute_metrics  # noqa: E402
+from app.services.bars import BarSeries  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+# Repeats are capped so the 1M-bar cases of slow strategies stay within a few minutes
+MAX_REPEAT_SECONDS = 30.0
+
+
+def synthetic_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """Geometric random-walk OHLCV bars, one per minute, as the read-only frame backtests receive"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    values = np.vstack([
+        open_,
+        np.maximum(open_, close) + spread,
+        np.minimum(open_, close) - spread,
+        close,
+        rng.integers(1_000, 100_000, n).astype(np.float64),
+        (open_ + close) / 2,
+        rng.integers(10, 1_000, n).astype(np.float64),
+    ])
+    timestamps = 1_577_836_800_000 + np.arange(n, dtype=np.int64) * 60_000
+    return BarSeries(timestamps, values).to_frame()
+
+
+def benchmark_cases(service: BacktestService, df: pd.DataFrame) -> Dict[str, Callable[[], Any]]:
+    """Callables to time against one set of bars, keyed by benchmark name"""
+    def cold(strategy: Callable[[pd.DataFrame, Dict[str, Any]], Any]) -> Callable[[], Any]:
+        # Time the indicator computation itself, not a hit in the shared indicator cache
+        def run() -> Any:
+            indicator_cache.clear()
+            return strategy(df, {})
+        return run
+
+    cases = {f"strategy.{name}": cold(strategy) for name, strategy in service.strategies.items()}
+    signals = service.strategies["simple_moving_average"](df, {})
+    returns = df["close"].pct_change() * signals
+    close, positions = df["close"].to_numpy(), signals.to_numpy(dtype=np.float64)
+    cases["execution.costs_and_stops"] = lambda: simulate_execution(
+        close, positions, {"commission_bps": 5, "slippage_bps": 2, "stop_loss": 0.05, "take_profit": 0.1}
+    )
+    cases["metric.sharpe_ratio"] = lambda: service.calculate_sharpe_ratio(returns)
+    cases["metric.max_drawdown"] = lambda: service.calculate_max_drawdown(returns)
+    cases["metric.all"] = lambda: compute_metrics(returns.to_numpy(), positions=positions, rolling_window=63)
+    return cases
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Wall time over `repeat` runs, then peak traced memory of one more run"""
+    times: List[float] = []
+    budget_start = time.perf_counter()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - budget_start > MAX_REPEAT_SECONDS:
+            break
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": len(times),
+        "wall_time_min": min(times),
+        "wall_time_median": statistics.median(times),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes: List[int], repeat: int = DEFAULT_REPEAT, only: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Time every benchmark case at each bar count.
+
+    Args:
+        sizes: Bar counts to generate
+        repeat: Timed runs per case
+        only: Substring filter on benchmark names
+    """
+    service = BacktestService()
+    results = []
+    for n in sizes:
+        df = synthetic_bars(n)
+        for name, func in benchmark_cases(service, df).items():
+            if only and only not in name:
+                continue
+            row = {"name": name, "bars": n, **measure(func, repeat)}
+            print(
+                f"{name:45s} {n:>9d} bars  {row['wall_time_min'] * 1000:10.2f} ms  "
+                f"{row['peak_memory_bytes'] / 2 ** 20:8.1f} MiB",
+                flush=True,
+            )
+            results.append(row)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines showing each benchmark's time and memory relative to a baseline run"""
+    previous = {(row["name"], row["bars"]): row for row in baseline["results"]}
+    lines = []
+    for row in current["results"]:
+        before = previous.get((row["name"], row["bars"]))
+        if before is None:
+            continue
+        time_ratio = row["wall_time_min"] / before["wall_time_min"] if before["wall_time_min"] else float("inf")
+        memory_ratio = row["peak_memory_bytes"] / before["peak_memory_bytes"] if before["peak_memory_bytes"] else float("inf")
+        lines.append(f"{row['name']:45s} {row['bars']:>9d} bars  time x{time_ratio:6.2f}  memory x{memory_ratio:6.2f}")
+    return lines
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Bar counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case")
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    # Strategies log every call at INFO, which would dominate the small cases
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = run_benchmarks(args.sizes, args.repeat, args.only)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} (commit {baseline.get('commit')}):")
+        for line in compare(report, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
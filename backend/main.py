@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from app.api.backtest import router as backtest_router
+from app.api.backtest import router as backtest_router, backtest_executor, job_service
+from app.api.volatility import router as volatility_router
+from app.api.metrics import ServerTimingMiddleware, router as metrics_router
+from app.models.database import init_db
+from app.services.parameter_sweep import shutdown_sweep_pool
 
 import os
 
@@ -15,6 +19,11 @@ app = FastAPI(
 )
 # This will include the backtest router where we define our endpoints
 app.include_router(backtest_router, prefix="/backtest")
+app.include_router(volatility_router, prefix="/volatility")
+app.include_router(metrics_router)
+
+# Per-stage durations of every response, for browser dev tools and tracing proxies
+app.add_middleware(ServerTimingMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -32,6 +41,18 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to VolatilityLab API"}
 
+@app.on_event("startup")
+async def startup_jobs():
+    init_db()
+    job_service.recover()
+    job_service.start_heartbeat()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    job_service.stop_heartbeat()
+    backtest_executor.shutdown()
+    shutdown_sweep_pool()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import websockets
+
+from app.services.alpaca_orders import AlpacaOrderClient, OrderBook
+from app.services.alpaca_service import AlpacaService
+
+
+class FakeAlpacaHandler(BaseHTTPRequestHandler):
+    """
+    Serves the trading API like Alpaca: duplicate client_order_ids are rejected with 422,
+    FLAKY's first submission is placed but answered with a 503, BROKE is always rejected
+    """
+
+    def do_POST(self):
+        order = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(0.05)
+        with self.server.lock:
+            self.server.in_flight -= 1
+            self.server.submissions.append(order["client_order_id"])
+            if order["symbol"] == "BROKE":
+                return self._reply(403, {"code": 40310000, "message": "insufficient buying power"})
+            if order["client_order_id"] in self.server.orders:
+                return self._reply(422, {"code": 40010001, "message": "client_order_id must be unique"})
+            placed = {
+                "id": str(uuid.uuid4()), "status": "new", "created_at": "2024-01-02T15:00:00Z",
+                "submitted_at": "2024-01-02T15:00:00Z", **order,
+            }
+            self.server.orders[order["client_order_id"]] = placed
+            if order["symbol"] == "FLAKY" and self.server.submissions.count(order["client_order_id"]) == 1:
+                return self._reply(503, {"message": "upstream timeout"})
+        self._reply(200, placed)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.reads.append(url.path)
+        if url.path == "/v2/orders:by_client_order_id":
+            order = self.server.orders.get(query["client_order_id"][0])
+            return self._reply(200, order) if order else self._reply(404, {"message": "order not found"})
+        if url.path == "/v2/orders":
+            return self._reply(200, [order for order in self.server.orders.values() if order["status"] == "new"])
+        if url.path == "/v2/positions":
+            return self._reply(200, self.server.positions)
+        self._reply(404, {"message": "not found"})
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_alpaca():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAlpacaHandler)
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    server.submissions, server.reads, server.orders = [], [], {}
+    server.positions = [
+        {"symbol": "AAPL", "qty": "10", "avg_entry_price": "150", "current_price": "160", "market_value": "1600", "unrealized_pl": "100"},
+    ]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def test_batch_orders_are_concurrent_and_idempotent(fake_alpaca):
+    """Orders go out in parallel, a retried or resubmitted order is never placed twice, rejections are reported"""
+    client = AlpacaOrderClient("key", "secret", f"http://127.0.0.1:{fake_alpaca.server_port}", requests_per_second=0, backoff_seconds=0.01)
+    orders = [{"symbol": symbol, "qty": 1, "side": "buy"} for symbol in ("AAPL", "MSFT", "FLAKY", "NVDA", "BROKE", "AMZN")]
+
+    first = client.submit_orders(orders, batch_id="rebalance-1")
+    again = client.submit_orders(orders, batch_id="rebalance-1")
+
+    assert fake_alpaca.max_in_flight > 1
+    assert [order["symbol"] for order in first["orders"]] == ["AAPL", "MSFT", "FLAKY", "NVDA", "AMZN"]
+    assert [order["client_order_id"] for order in first["orders"]][:2] == ["rebalance-1-0", "rebalance-1-1"]
+    assert first["errors"] == [{"index": 4, "client_order_id": "rebalance-1-4", "symbol": "BROKE", "error": "HTTP 403: insufficient buying power"}]
+    assert len(fake_alpaca.orders) == 5
+    assert [order["id"] for order in again["orders"]] == [order["id"] for order in first["orders"]]
+    with pytest.raises(ValueError):
+        client.submit_orders([{"symbol": "AAPL", "side": "buy"}])
+
+
+
+def test_reused_client_order_id_for_a_different_order_is_an_error(fake_alpaca):
+    """Resubmitting a batch id with different orders reports the clash instead of the old order"""
+    client = AlpacaOrderClient("key", "secret", f"http://127.0.0.1:{fake_alpaca.server_port}", requests_per_second=0)
+    first = client.submit_orders([{"symbol": "AAPL", "qty": 1, "side": "buy"}], batch_id="daily")
+    again = client.submit_orders([{"symbol": "AAPL", "qty": 1, "side": "buy"}, {"symbol": "TSLA", "qty": 2, "side": "buy"}], batch_id="daily")
+    changed = client.submit_orders([{"symbol": "MSFT", "qty": 7, "side": "sell"}], batch_id="daily")
+
+    assert [order["id"] for order in again["orders"]][:1] == [first["orders"][0]["id"]] and again["errors"] == []
+    assert changed["orders"] == []
+    assert changed["errors"] == [{"index": 0, "client_order_id": "daily-0", "symbol": "MSFT", "error": "client_order_id daily-0 reused for a different order"}]
+    assert [order["symbol"] for order in fake_alpaca.orders.values()] == ["AAPL", "TSLA"]
+
+
+async def _trade_updates(websocket, path, updates):
+    await websocket.recv()
+    await websocket.send(json.dumps({"stream": "authorization", "data": {"status": "authorized", "action": "authenticate"}}))
+    await websocket.recv()
+    await websocket.send(json.dumps({"stream": "listening", "data": {"streams": ["trade_updates"]}}))
+    for update in updates:
+        await websocket.send(json.dumps({"stream": "trade_updates", "data": update}))
+    await websocket.wait_closed()
+
+
+async def _serve_trade_updates(updates):
+    return await websockets.serve(lambda websocket, path: _trade_updates(websocket, path, updates), "127.0.0.1", 0)
+
+
+def test_order_book_is_served_locally_and_follows_trade_updates(fake_alpaca, monkeypatch):
+    """Reads hit the API only when the book is stale; stream fills and periodic diffs keep it current"""
+    updates = []
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    serve = asyncio.run_coroutine_threadsafe(_serve_trade_updates(updates), loop)
+    stream = serve.result(timeout=10)
+    monkeypatch.setenv("ALPACA_API_KEY", "key")
+    monkeypatch.setenv("ALPACA_SECRET_KEY", "secret")
+    monkeypatch.setenv("ALPACA_BASE_URL", f"http://127.0.0.1:{fake_alpaca.server_port}")
+    monkeypatch.setenv("ALPACA_STREAM_URL", f"http://127.0.0.1:{stream.sockets[0].getsockname()[1]}")
+    service = AlpacaService()
+    service.orders.rate_limiter.rate = 0
+
+    assert [position["qty"] for position in service.get_positions()] == [10.0]
+    submitted = service.submit_orders([{"symbol": "AAPL", "qty": 5, "side": "buy", "type": "limit", "limit_price": 150}])
+    assert [order["symbol"] for order in service.get_open_orders()] == ["AAPL"]
+    assert fake_alpaca.reads == ["/v2/positions", "/v2/orders"]
+
+    placed = fake_alpaca.orders[submitted["orders"][0]["client_order_id"]]
+    updates.append({"event": "fill", "order": dict(placed, status="filled"), "price": "150", "qty": "5", "position_qty": "15"})
+    try:
+        service.start_book_updates(interval=60)
+        deadline = time.monotonic() + 10
+        while service.get_open_orders() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert service.get_open_orders() == []
+        position = service.get_positions()[0]
+        assert position["qty"] == 15.0 and position["avg_entry_price"] == pytest.approx(150.0)
+
+        placed["status"] = "filled"
+        fake_alpaca.positions = []
+        assert service.sync_book() == {"positions_changed": [], "positions_closed": ["AAPL"], "orders_opened": [], "orders_closed": []}
+    finally:
+        service.stop_book_updates()
+        loop.call_soon_threadsafe(stream.close)
+
+
+def test_sync_keeps_trade_updates_that_arrive_while_listing():
+    """A fill applied between listing and replacing the book is not overwritten by the older listing"""
+    order = {"id": "o1", "symbol": "AAPL", "qty": "5", "side": "buy", "type": "market", "status": "new"}
+    position = {"symbol": "AAPL", "qty": "10", "avg_entry_price": "150", "current_price": "150", "market_value": "1500", "unrealized_pl": "0"}
+    book = OrderBook()
+    book.sync([position], [order])
+
+    since = book.listing_started()
+    listed = ([dict(position)], [dict(order)])
+    book.apply_trade_update({"event": "fill", "order": dict(order, status="filled"), "price": "150", "position_qty": "15"})
+    diff = book.sync(*listed, since=since)
+
+    assert book.open_orders() == [] and book.positions()[0]["qty"] == 15.0
+    assert diff == {"positions_changed": [], "positions_closed": [], "orders_opened": [], "orders_closed": []}
+    assert book.sync(*listed, since=book.listing_started())["orders_opened"] == ["o1"]
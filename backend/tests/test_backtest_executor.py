@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_executor import BacktestExecutor, ExecutorBusyError, run_backtest_job
+
+
+def test_compute_runs_in_worker_process():
+    """A backtest submitted to the pool returns the same result as a direct call"""
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 200))
+    data = pd.DataFrame({"close": close}, index=pd.date_range("2022-01-01", periods=200, freq="D", name="timestamp"))
+    executor = BacktestExecutor(max_workers=1, max_pending=1, timeout=60)
+
+    async def scenario():
+        return await executor.run_compute(run_backtest_job, data, "simple_moving_average", {})
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    expected = run_backtest_job(data, "simple_moving_average", {})
+    assert result["total_return"] == expected["total_return"]
+    np.testing.assert_array_equal(result["signals"], expected["signals"])
+
+
+def test_rejects_when_all_slots_are_busy():
+    """Work beyond max_pending is refused instead of queued, and slots are released afterwards"""
+    executor = BacktestExecutor(max_workers=1, max_pending=2, timeout=5)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run_compute(release.wait, in_process=False)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run_compute(time.sleep, 0, in_process=False)
+        release.set()
+        await asyncio.gather(*running)
+        return executor.in_flight
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_timed_out_work_keeps_its_slot_until_it_finishes():
+    """A timeout frees the request but not the slot of the still-running job"""
+    executor = BacktestExecutor(max_workers=1, max_pending=1, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await executor.run_compute(time.sleep, 0.3, in_process=False)
+        busy = executor.in_flight
+        await asyncio.sleep(0.4)
+        return busy, executor.in_flight
+
+    assert asyncio.run(scenario()) == (1, 0)
@@ -0,0 +1,118 @@
+import os
+from datetime import datetime, date, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import bar_cache
+from app.services.bar_cache import BarCache
+from app.services.bars import BAR_COLUMNS
+from app.services.bulk_fetcher import FetchError
+from app.services.polygon_service import PolygonService
+
+
+class FakePolygonClient:
+    """Stands in for polygon.RESTClient, serving one synthetic bar per calendar day"""
+
+    def __init__(self):
+        self.calls = []
+
+    def list_aggs(self, symbol, multiplier, timespan, from_, to, limit):
+        self.calls.append((symbol, from_, to))
+        start = datetime.strptime(from_, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        end = datetime.strptime(to, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        day_ms = 86_400_000
+        for ts in range(int(start.timestamp() * 1000), int(end.timestamp() * 1000) + 1, day_ms):
+            price = 100 + ts / day_ms % 7
+            yield SimpleNamespace(
+                timestamp=ts + 5 * 3_600_000,
+                open=price, high=price + 1, low=price - 1, close=price,
+                volume=1000.0, vwap=price, transactions=10,
+            )
+
+
+def test_cache_hit_makes_no_network_calls(tmp_path):
+    """A repeated request is served entirely from disk"""
+    client = FakePolygonClient()
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=client)
+
+    first = service.get_stock_bars("AAPL", datetime(2023, 1, 1), datetime(2023, 1, 31))
+    second = service.get_stock_bars("AAPL", datetime(2023, 1, 1), datetime(2023, 1, 31))
+
+    assert len(client.calls) == 1
+    assert len(first) == 31
+    np.testing.assert_array_equal(first.to_numpy(), second.to_numpy())
+    assert (second.index == first.index).all()
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    """Extending a cached range fetches just the uncovered days"""
+    client = FakePolygonClient()
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=client)
+
+    service.get_stock_bars("AAPL", datetime(2023, 1, 10), datetime(2023, 1, 20))
+    bars = service.get_stock_bars("AAPL", datetime(2023, 1, 1), datetime(2023, 1, 31))
+
+    assert client.calls[1:] == [("AAPL", "2023-01-01", "2023-01-09"), ("AAPL", "2023-01-21", "2023-01-31")]
+    assert len(bars) == 31
+    assert bars.index.is_monotonic_increasing
+    assert BarCache(str(tmp_path)).coverage("AAPL") == [(date(2023, 1, 1), date(2023, 1, 31))]
+
+
+def test_loaded_bars_are_memory_mapped_views(tmp_path):
+    """Loading does not copy the cached columns"""
+    cache = BarCache(str(tmp_path))
+    PolygonService(cache=cache, client=FakePolygonClient()).get_stock_bars(
+        "MSFT", datetime(2023, 3, 1), datetime(2023, 3, 10)
+    )
+
+    bars = cache.load("MSFT", date(2023, 3, 1), date(2023, 3, 10))
+
+    close = bars['close'].to_numpy()
+    assert not close.flags.owndata
+    assert not close.flags.writeable
+
+
+def test_failed_chunks_raise_instead_of_returning_gapped_bars(tmp_path):
+    """A chunk that fails to download is an error; the chunks that did arrive stay cached"""
+
+    class FailingClient(FakePolygonClient):
+        def list_aggs(self, symbol, multiplier, timespan, from_, to, limit):
+            if from_ == "2023-01-21":
+                raise ConnectionError("reset by peer")
+            return super().list_aggs(symbol, multiplier, timespan, from_, to, limit)
+
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=FailingClient())
+    service.get_stock_bars("AAPL", datetime(2023, 1, 10), datetime(2023, 1, 20))
+
+    with pytest.raises(FetchError, match="2023-01-21 to 2023-01-31"):
+        service.get_stock_bars("AAPL", datetime(2023, 1, 1), datetime(2023, 1, 31))
+    assert BarCache(str(tmp_path)).coverage("AAPL") == [(date(2023, 1, 1), date(2023, 1, 20))]
+
+
+def test_chunked_fills_rewrite_the_bar_file_once(tmp_path, monkeypatch):
+    """Stores only write their own bars; the next read merges them all in one rewrite, newest bars winning"""
+    saved = []
+    save = bar_cache._atomic_save
+    monkeypatch.setattr(bar_cache, "_atomic_save", lambda path, table: (saved.append((os.path.basename(path), table.shape[1])), save(path, table)))
+    client = FakePolygonClient()
+    cache = BarCache(str(tmp_path))
+    service = PolygonService(cache=cache, client=client)
+
+    for month in range(1, 7):
+        start, end = date(2023, month, 1), date(2023, month + 1, 1) - timedelta(days=1)
+        cache.store("AAPL", start, end, service._fetch_bars("AAPL", start, end))
+    revised = service._fetch_bars("AAPL", date(2023, 3, 1), date(2023, 3, 1))
+    revised.values[BAR_COLUMNS.index("close")] = -1.0
+    cache.store("AAPL", date(2023, 3, 1), date(2023, 3, 1), revised)
+
+    bars = cache.load("AAPL", date(2023, 1, 1), date(2023, 6, 30))
+    cache.load("AAPL", date(2023, 1, 1), date(2023, 6, 30))
+
+    assert [name for name, _ in saved if name == "bars.npy"] == ["bars.npy", "bars.npy"]
+    assert max(size for name, size in saved if name != "bars.npy") <= 31
+    assert len(bars) == 181 and bars.index.is_monotonic_increasing
+    assert (bars["close"] == -1.0).sum() == 1
+    assert bars.loc[bars["close"] == -1.0].index[0].date() == date(2023, 3, 1)
+    assert not [name for name in os.listdir(tmp_path / "day" / "AAPL") if name.startswith("segment-")]
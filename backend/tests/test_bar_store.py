@@ -0,0 +1,70 @@
+import asyncio
+import multiprocessing
+import pickle
+from datetime import date
+
+import numpy as np
+
+from app.services.backtest_executor import BacktestExecutor, run_backtest_job
+from app.services.backtest_service import BacktestService
+from app.services.bar_cache import BarCache
+from app.services.bar_store import MappedBars, restore, shareable
+from app.services.bars import BAR_COLUMNS, BarSeries
+
+DAY_MS = 86_400_000
+# Noon UTC on 2021-01-01
+FIRST_MS = 1_609_502_400_000
+
+
+def make_series(first_day: int, days: int) -> BarSeries:
+    """Daily bars whose close encodes the day number"""
+    day = np.arange(first_day, first_day + days)
+    values = np.tile(100.0 + day % 17, (len(BAR_COLUMNS), 1))
+    return BarSeries(FIRST_MS + day * DAY_MS, values)
+
+
+def _store_month(root: str, month: int, barrier) -> None:
+    barrier.wait()
+    BarCache(root).store("SPY", date(2021, month, 1), date(2021, month, 20), make_series((month - 1) * 31, 28))
+
+
+def test_concurrent_writers_from_several_processes_keep_every_bar(tmp_path):
+    """Stores racing from separate processes are serialized, so no merge drops another's bars"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(4)
+    writers = [context.Process(target=_store_month, args=(str(tmp_path), month, barrier)) for month in range(1, 5)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(timeout=60)
+        assert writer.exitcode == 0
+
+    cache = BarCache(str(tmp_path))
+    bars = cache.load("SPY", date(2021, 1, 1), date(2021, 12, 31))
+    assert len(bars) == 4 * 28 and bars.index.is_monotonic_increasing
+    assert cache.coverage("SPY") == [(date(2021, month, 1), date(2021, month, 20)) for month in range(1, 5)]
+
+
+def test_loaded_frames_reach_pool_workers_by_reference(tmp_path):
+    """Cached frames pickle as a file reference that maps the same bars, even after the file is replaced"""
+    cache = BarCache(str(tmp_path))
+    cache.store("QQQ", date(2021, 1, 1), date(2021, 12, 31), make_series(0, 300))
+    data = cache.load("QQQ", date(2021, 3, 1), date(2021, 8, 31))
+
+    mapped = shareable(data)
+    assert isinstance(mapped, MappedBars) and len(mapped) == len(data)
+    assert len(pickle.dumps(mapped)) < 500
+    assert shareable(data.iloc[5:]) is not mapped and shareable(data.copy()) is not mapped
+
+    executor = BacktestExecutor(max_workers=1, max_pending=1, timeout=60)
+    try:
+        pooled = asyncio.run(executor.run_compute(run_backtest_job, data, "rsi_strategy", {}))
+    finally:
+        executor.shutdown()
+    local = BacktestService().evaluate(data, "rsi_strategy", {})
+    np.testing.assert_array_equal(pooled["equity_curve"], local["equity_curve"])
+
+    cache.store("QQQ", date(2022, 1, 1), date(2022, 1, 31), make_series(365, 31))
+    restored = restore(pickle.loads(pickle.dumps(mapped)))
+    assert restored.index.equals(data.index)
+    np.testing.assert_array_equal(restored.to_numpy(), data.to_numpy())
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.bars import BAR_COLUMNS, BarBuffer, BarSeries
+
+
+def test_records_become_a_read_only_frame():
+    """Record lists build the same frame as the pandas constructor, without writable columns"""
+    records = [
+        {"timestamp": 1_672_531_200_000 + i * 86_400_000, "open": 1.0 + i, "high": 2.0 + i, "low": 0.5,
+         "close": 1.5 + i, "volume": 100.0, "vwap": None, "transactions": 3}
+        for i in range(5)
+    ]
+
+    df = BarSeries.from_records(records).to_frame()
+
+    expected = pd.DataFrame(records)
+    expected["timestamp"] = pd.to_datetime(expected["timestamp"], unit="ms")
+    expected = expected.set_index("timestamp").astype(np.float64)
+    pd.testing.assert_frame_equal(df, expected)
+    assert list(df.columns) == BAR_COLUMNS
+    with pytest.raises(ValueError):
+        df["close"].to_numpy()[0] = 0.0
+
+
+def test_buffer_grows_across_pages():
+    """Pages appended past the initial capacity are kept in order"""
+    buffer = BarBuffer(capacity=2)
+    for page in range(3):
+        buffer.append_aggs(
+            SimpleNamespace(timestamp=page * 10 + i, open=1.0, high=1.0, low=1.0, close=float(page * 10 + i),
+                            volume=1.0, vwap=None, transactions=None)
+            for i in range(3)
+        )
+
+    bars = buffer.finish()
+
+    assert len(bars) == 9
+    np.testing.assert_array_equal(bars.timestamps, [0, 1, 2, 10, 11, 12, 20, 21, 22])
+    np.testing.assert_array_equal(bars.column("close"), bars.timestamps.astype(np.float64))
+    assert np.isnan(bars.column("transactions")).all()
+    assert bars.values.flags.c_contiguous
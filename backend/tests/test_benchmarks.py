@@ -0,0 +1,14 @@
+from benchmarks.bench_backtest import compare, run_benchmarks
+from app.services.backtest_service import BacktestService
+
+
+def test_benchmarks_cover_every_strategy_offline():
+    """A tiny benchmark run times each strategy and metric and compares against itself"""
+    report = run_benchmarks([300], repeat=1)
+
+    names = {row["name"] for row in report["results"]}
+    assert names == {f"strategy.{name}" for name in BacktestService().strategies} | {
+        "metric.sharpe_ratio", "metric.max_drawdown", "metric.all", "execution.costs_and_stops"
+    }
+    assert all(row["wall_time_min"] > 0 and row["peak_memory_bytes"] >= 0 for row in report["results"])
+    assert len(compare(report, report)) == len(report["results"])
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from app.services.bar_cache import BarCache
+from app.services.bulk_fetcher import PolygonBulkFetcher
+from app.services.polygon_service import PolygonService
+from app.services.rate_limiter import TokenBucket
+from tests.test_bar_cache import FakePolygonClient
+
+DAY_MS = 86_400_000
+
+
+class StubPolygonHandler(BaseHTTPRequestHandler):
+    """
+    Serves /v2/aggs like Polygon: AAPL pages twice, FLAKY is rate limited once, DOWN always
+    fails, TRUNCATED's first body is cut short, GARBLED never sends valid JSON
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.split("/")
+        symbol, start, end = parts[4], parts[8], parts[9]
+        self.server.requests.append((symbol, start, end))
+        cursor = parse_qs(url.query).get("cursor", ["0"])[0]
+
+        if symbol == "DOWN":
+            return self._reply(503, {"status": "ERROR", "error": "unavailable"})
+        if symbol == "FLAKY" and self.server.requests.count((symbol, start, end)) == 1:
+            return self._reply(429, {"status": "ERROR", "error": "too many requests"}, {"Retry-After": "0"})
+        if symbol == "GARBLED" or symbol == "TRUNCATED" and self.server.requests.count((symbol, start, end)) == 1:
+            return self._reply(200, '{"status": "OK", "results": [{"t": 1')
+        if symbol == "EMPTY":
+            return self._reply(200, {"status": "OK", "resultsCount": 0})
+
+        first = int(datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+        last = int(datetime.strptime(end, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+        # Polygon stamps daily bars at midnight New York time (EST in these tests)
+        timestamps = [t + 5 * 3_600_000 for t in range(first, last + 1, DAY_MS)]
+        half = len(timestamps) // 2
+        page = timestamps[half:] if cursor == "1" else timestamps[:half] if symbol == "AAPL" else timestamps
+        body = {
+            "status": "OK",
+            "results": [{"t": t, "o": 1.0, "h": 2.0, "l": 0.5, "c": t / DAY_MS, "v": 10.0, "n": 3} for t in page],
+        }
+        if symbol == "AAPL" and cursor == "0":
+            body["next_url"] = f"http://{self.headers['Host']}{url.path}?cursor=1"
+        self._reply(200, body)
+
+    def _reply(self, status, body, headers=None):
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_polygon():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPolygonHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetcher(server, **kwargs):
+    return PolygonBulkFetcher(
+        api_key="test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        requests_per_second=0,
+        backoff_seconds=0.01,
+        max_retries=2,
+        **kwargs,
+    )
+
+
+def test_bulk_fetch_separates_errors_from_empty_results(stub_polygon):
+    """Pages are joined, 429s are retried, and exhausted retries are errors rather than empty bars"""
+    result = _fetcher(stub_polygon).fetch(["AAPL", "FLAKY", "EMPTY", "DOWN"], date(2023, 1, 1), date(2023, 1, 10))
+
+    assert set(result["bars"]) == {"AAPL", "FLAKY", "EMPTY"}
+    assert len(result["bars"]["AAPL"]) == 10
+    assert np.all(np.diff(result["bars"]["AAPL"].timestamps) == DAY_MS)
+    assert np.isnan(result["bars"]["AAPL"].column("vwap")).all()
+    assert len(result["bars"]["FLAKY"]) == 10
+    assert len(result["bars"]["EMPTY"]) == 0
+    assert "503" in result["errors"]["DOWN"]
+    assert stub_polygon.requests.count(("DOWN", "2023-01-01", "2023-01-10")) == 3
+
+
+def test_malformed_bodies_are_retried_and_reported_per_symbol(stub_polygon):
+    """A truncated body is retried, one that never parses fails only its own symbol, symbols are quoted"""
+    result = _fetcher(stub_polygon).fetch(["TRUNCATED", "GARBLED", "BRK/B"], date(2023, 1, 1), date(2023, 1, 10))
+
+    assert len(result["bars"]["TRUNCATED"]) == 10 and len(result["bars"]["BRK/B"]) == 10
+    assert list(result["errors"]) == ["GARBLED"] and "Malformed response" in result["errors"]["GARBLED"]
+    assert stub_polygon.requests.count(("GARBLED", "2023-01-01", "2023-01-10")) == 3
+    assert ("BRK%2FB", "2023-01-01", "2023-01-10") in stub_polygon.requests
+
+
+def test_bulk_downloads_over_the_rate_budget_are_refused(stub_polygon, tmp_path):
+    """A download that cannot finish within the time budget at the rate limit sends no requests"""
+    fetcher = _fetcher(stub_polygon, max_concurrency=1)
+    fetcher.rate_limiter = TokenBucket(rate=1, capacity=1)
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=FakePolygonClient(), bulk_fetcher=fetcher)
+    start, end = datetime(2023, 1, 1), datetime(2023, 1, 10)
+
+    with pytest.raises(ValueError):
+        service.get_bulk_stock_bars(["AAPL", "MSFT", "NVDA", "AMZN"], start, end, time_budget=2)
+    assert stub_polygon.requests == []
+    assert set(service.get_bulk_stock_bars(["MSFT", "NVDA"], start, end, time_budget=2)["bars"]) == {"MSFT", "NVDA"}
+
+
+def test_date_chunks_are_fetched_and_stitched_in_order(stub_polygon):
+    """A range split into chunks comes back as one ordered series"""
+    result = _fetcher(stub_polygon).fetch(["MSFT"], date(2023, 1, 1), date(2023, 3, 31), chunk_days=30)
+
+    bars = result["bars"]["MSFT"]
+    assert len([r for r in stub_polygon.requests if r[0] == "MSFT"]) == 3
+    assert len(bars) == 90
+    assert np.all(np.diff(bars.timestamps) == DAY_MS)
+
+
+def test_bulk_bars_go_through_the_bar_cache(stub_polygon, tmp_path):
+    """Cached ranges are not requested again and failed symbols stay uncached"""
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=FakePolygonClient(), bulk_fetcher=_fetcher(stub_polygon))
+
+    first = service.get_bulk_stock_bars(["MSFT", "DOWN"], datetime(2023, 1, 1), datetime(2023, 1, 31))
+    sent = len(stub_polygon.requests)
+    second = service.get_bulk_stock_bars(["MSFT"], datetime(2023, 1, 1), datetime(2023, 1, 31))
+
+    assert len(first["bars"]["MSFT"]) == 31 and "DOWN" in first["errors"]
+    assert len(stub_polygon.requests) == sent
+    np.testing.assert_array_equal(first["bars"]["MSFT"].to_numpy(), second["bars"]["MSFT"].to_numpy())
+    assert BarCache(str(tmp_path)).coverage("DOWN") == []
+
+
+def test_token_bucket_limits_sustained_rate():
+    """After the burst, acquisitions are spaced by 1 / rate"""
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start >= 10 / 50 * 0.9
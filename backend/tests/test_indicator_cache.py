@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from app.services.backtest_service import BacktestService
+from app.services.indicator_cache import IndicatorCache, cached_sma, indicator_cache
+from app.services.indicators import sma
+
+
+def test_columns_compute_only_missing_settings_and_stay_bounded():
+    """Shared settings are computed once, results equal the kernel's, and memory stays under budget"""
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, (500, 3)), axis=0)
+    cache = IndicatorCache(max_bytes=10 * close.nbytes)
+    requested = []
+
+    def counted(values, windows):
+        requested.append(list(windows))
+        return sma(values, windows)
+
+    first = cache.columns(close, "sma", [20, 50], counted)
+    second = cache.columns(close, "sma", [5, 20, 60, 5], counted)
+    assert requested == [[20, 50], [5, 60]]
+    np.testing.assert_array_equal(first, sma(close, [20, 50]))
+    np.testing.assert_array_equal(second, sma(close, [5, 20, 60, 5]))
+    assert second.flags.writeable
+
+    shifted = close + 1
+    cache.columns(shifted, "sma", [20], counted)
+    assert requested[-1] == [20]
+    for window in range(100, 130):
+        cache.columns(close, "sma", [window], counted)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes and stats["evictions"] > 0
+    assert stats["hits"] == 1 and stats["misses"] == 2 + 2 + 1 + 30
+
+
+def test_strategies_share_indicators_through_the_cache():
+    """Momentum regression reuses the 20-bar SMA the SMA strategy computed on the same bars"""
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, 400)))
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2022-01-01", periods=400, name="timestamp"))
+    service = BacktestService()
+    indicator_cache.clear()
+    before = indicator_cache.stats()
+
+    service.strategies["simple_moving_average"](df, {"short_window": 20, "long_window": 60})
+    service.strategies["momentum_regression"](df, {"short_sma": 5, "mid_sma": 20, "long_sma": 60})
+    after = indicator_cache.stats()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 3
+    np.testing.assert_array_equal(cached_sma(close, [60, 20]), sma(close, [60, 20]))
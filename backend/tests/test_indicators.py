@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from app.services.backtest_service import BacktestService
+from app.services.indicators import crossover_signals, ema, ema_alpha, rsi, sma, threshold_signals
+
+
+def make_close(n: int = 1500, seed: int = 11) -> np.ndarray:
+    """Build a synthetic close series with a flat stretch"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[400:480] = close[400]
+    return close
+
+
+def test_sma_matches_pandas_rolling_mean():
+    """Each window column equals Series.rolling(window).mean(), exactly on flat runs"""
+    close = make_close()
+    windows = [1, 3, 20, 50]
+
+    averages = sma(close, windows)
+
+    assert averages.shape == (len(close), len(windows))
+    for j, window in enumerate(windows):
+        expected = pd.Series(close).rolling(window).mean().to_numpy()
+        np.testing.assert_allclose(averages[:, j], expected, rtol=1e-10, equal_nan=True)
+        np.testing.assert_array_equal(averages[450:480, j], expected[450:480])
+
+
+def test_ema_matches_pandas_ewm():
+    """Each alpha column equals Series.ewm(alpha, adjust=False).mean()"""
+    close = make_close()
+    alphas = ema_alpha(np.array([8, 20, 200]))
+
+    averages = ema(close, alphas)
+
+    for j, alpha in enumerate(alphas):
+        expected = pd.Series(close).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        np.testing.assert_allclose(averages[:, j], expected, rtol=1e-12)
+
+
+def test_kernels_batch_over_columns():
+    """A (bars x symbols) input gives the same result as one call per symbol"""
+    prices = np.stack([make_close(seed=1), make_close(seed=2)], axis=1)
+
+    np.testing.assert_allclose(sma(prices, [5, 30])[:, 1], sma(prices[:, 1], [5, 30]), equal_nan=True)
+    np.testing.assert_allclose(ema(prices, [0.1, 0.5])[:, 0], ema(prices[:, 0], [0.1, 0.5]))
+
+
+def test_crossover_grid_matches_single_strategy_runs():
+    """Every (short, long) pair in the broadcast grid equals a single strategy run"""
+    close = make_close()
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2020-01-01", periods=len(close), freq="D"))
+    shorts, longs = [5, 10, 20], [50, 100]
+
+    grid = crossover_signals(sma(close, shorts), sma(close, longs))
+
+    service = BacktestService()
+    for i, short in enumerate(shorts):
+        for j, long in enumerate(longs):
+            single = service.simple_moving_average_strategy(df, {"short_window": short, "long_window": long})
+            np.testing.assert_array_equal(grid[:, i, j], single.to_numpy())
+
+
+def test_strategies_match_pandas_signals():
+    """SMA and EMA strategies still produce the signals of the pandas rolling/ewm implementation"""
+    close = pd.Series(make_close())
+    df = pd.DataFrame({"close": close.to_numpy()}, index=pd.date_range("2020-01-01", periods=len(close), freq="D"))
+    service = BacktestService()
+
+    short, long = close.rolling(20).mean(), close.rolling(50).mean()
+    expected = np.where(short > long, 1, np.where(short < long, -1, 0))
+    signals = service.simple_moving_average_strategy(df, {"short_window": 20, "long_window": 50})
+    np.testing.assert_array_equal(signals.to_numpy(), expected)
+
+    short = close.ewm(alpha=2 / 9, adjust=False).mean()
+    long = close.ewm(alpha=2 / 21, adjust=False).mean()
+    expected = np.where(short > long, 1, np.where(short < long, -1, 0))
+    signals = service.exponential_moving_average_strategy(df, {"short_window": 8, "long_window": 20})
+    np.testing.assert_array_equal(signals.to_numpy(), expected)
+
+
+def test_rsi_matches_pandas_and_wilder_recursion():
+    """Simple-average RSI equals the rolling-mean formula; Wilder RSI equals the textbook recursion"""
+    close = make_close()
+    close[900:905] = np.nan
+    delta = pd.Series(close).diff()
+    gain, loss = delta.where(delta > 0, 0), -delta.where(delta < 0, 0)
+    periods = [2, 14, 30]
+
+    simple, wilder = rsi(close, periods), rsi(close, periods, "wilder")
+
+    assert simple.shape == wilder.shape == (len(close), 3)
+    for j, period in enumerate(periods):
+        expected = (100 - 100 / (1 + gain.rolling(period).mean() / loss.rolling(period).mean())).to_numpy()
+        np.testing.assert_allclose(simple[:, j], expected, rtol=1e-9, equal_nan=True)
+
+        averages = np.full((len(close), 2), np.nan)
+        changes = np.stack([gain.fillna(0), loss.fillna(0)], axis=1)
+        averages[period] = changes[1:period + 1].mean(axis=0)
+        for t in range(period + 1, len(close)):
+            averages[t] = averages[t - 1] + (changes[t] - averages[t - 1]) / period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = 100 - 100 / (1 + averages[:, 0] / averages[:, 1])
+        np.testing.assert_allclose(wilder[:, j], expected, rtol=1e-9, equal_nan=True)
+
+
+def test_rsi_threshold_grid_matches_single_strategy_runs():
+    """Every (period, overbought, oversold) cell of the broadcast grid equals a single strategy run"""
+    close = make_close()
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2020-01-01", periods=len(close), freq="D"))
+    periods, overbought, oversold = [7, 14], [65, 70, 80], [20, 35]
+
+    grid = threshold_signals(rsi(close, periods), overbought, oversold)
+
+    assert grid.shape == (len(close), 2, 3, 2)
+    service = BacktestService()
+    for i, period in enumerate(periods):
+        for j, upper in enumerate(overbought):
+            for k, lower in enumerate(oversold):
+                parameters = {"period": period, "overbought": upper, "oversold": lower}
+                single = service.strategies["rsi_strategy"](df, parameters)
+                np.testing.assert_array_equal(grid[:, i, j, k], single.to_numpy())
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_executor import BacktestExecutor, run_profiled_backtest_job
+from app.services.instrumentation import Histogram, collecting, server_timing, stage_seconds, timed
+from app.services.profiling import SamplingProfiler
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    """Observations fall in the first bucket at or above them, and buckets are cumulative"""
+    histogram = Histogram("demo_seconds", "Demo", "stage", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe("fetch", seconds)
+
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP demo_seconds Demo", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{stage="fetch",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="fetch",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{stage="fetch",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="fetch"} 4' in lines
+    assert histogram.snapshot()["fetch"]["sum"] == pytest.approx(3.65)
+
+
+def test_stage_timings_reach_the_request_from_worker_processes():
+    """Stages timed inside a pool worker are merged into the caller's timings and histograms"""
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 300))
+    data = pd.DataFrame({"close": close}, index=pd.date_range("2022-01-01", periods=300, name="timestamp"))
+    executor = BacktestExecutor(max_workers=1, max_pending=1, timeout=60)
+    before = stage_seconds.snapshot().get("strategy", {"count": 0})["count"]
+
+    async def scenario():
+        with collecting() as timings:
+            with timed("serialize"):
+                time.sleep(0.002)
+            profiled = await executor.run_compute(run_profiled_backtest_job, data, "momentum_regression", {}, None, 0.0005)
+        return timings, profiled
+
+    try:
+        timings, profiled = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert set(timings) == {"serialize", "strategy", "metrics"}
+    assert timings["serialize"] >= 0.002
+    assert stage_seconds.snapshot()["strategy"]["count"] == before + 1
+    header = server_timing(timings, total=0.5)
+    assert header.startswith("serialize;dur=") and header.endswith("total;dur=500.00")
+    assert profiled["results"]["strategy_display_name"] == "Momentum Regression"
+    assert profiled["samples"] == sum(int(line.rsplit(" ", 1)[1]) for line in profiled["profile"].splitlines())
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_folds_stacks_by_function():
+    """Samples land on the function doing the work, under its callers, root first"""
+    with SamplingProfiler(interval=0.0005) as profiler:
+        _spin(0.05)
+
+    stack, count = profiler.folded().splitlines()[0].rsplit(" ", 1)
+    assert stack == f"{__name__}.test_sampling_profiler_folds_stacks_by_function;{__name__}._spin"
+    assert int(count) > 10
+    with pytest.raises(ValueError):
+        SamplingProfiler(interval=1.0)
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.backtest import Base, BacktestResult
+from app.models.database import add_missing_columns
+from app.services.backtest_executor import BacktestExecutor
+from app.services.bar_cache import BarCache
+from app.services.job_service import COMPLETED_JOB_REUSE_SECONDS, JOB_COMPLETED, JOB_FAILED, JOB_RUNNING, JOB_STALE_SECONDS, JobService
+from app.services.polygon_service import PolygonService
+from tests.test_bar_cache import FakePolygonClient
+
+
+def make_job_service(tmp_path):
+    """Job service backed by a throwaway SQLite file and the fake Polygon client"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    client = FakePolygonClient()
+    polygon_service = PolygonService(cache=BarCache(str(tmp_path / "bars")), client=client)
+    executor = BacktestExecutor(max_workers=1, max_pending=2, timeout=60)
+    return JobService(sessionmaker(bind=engine, expire_on_commit=False), executor, polygon_service), client
+
+
+def test_identical_jobs_are_deduplicated(tmp_path):
+    """A second identical submission reuses the stored job instead of recomputing"""
+    jobs, client = make_job_service(tmp_path)
+    request = ("AAPL", datetime(2022, 1, 1), datetime(2022, 6, 30), "simple_moving_average", {"short_window": 5})
+
+    async def scenario():
+        first = await jobs.submit(*request)
+        while jobs.get(first["job_id"])["status"] not in (JOB_COMPLETED, JOB_FAILED):
+            await asyncio.sleep(0.05)
+        second = await jobs.submit(*request)
+        return first, second
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        jobs.executor.shutdown()
+
+    stored = jobs.get(first["job_id"])
+    assert stored["status"] == JOB_COMPLETED
+    assert len(stored["results"]["signals"]) == 181
+    assert second["job_id"] == first["job_id"]
+    assert second["deduplicated"]
+    assert len(client.calls) == 1
+
+
+def test_failed_jobs_are_retried_and_recovered(tmp_path):
+    """Failed jobs are not reused, and jobs left active by a restart are marked failed"""
+    jobs, _ = make_job_service(tmp_path)
+    request = ("AAPL", datetime(2022, 1, 1), datetime(2022, 1, 10), "simple_moving_average", {})
+
+    async def scenario():
+        first = await jobs.submit(*request)
+        while jobs.get(first["job_id"])["status"] not in (JOB_COMPLETED, JOB_FAILED):
+            await asyncio.sleep(0.05)
+        # Not enough bars for the 50-bar window, so the job fails and a resubmission starts over
+        second = await jobs.submit(*request)
+        return first, second
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        jobs.executor.shutdown()
+
+    assert jobs.get(first["job_id"])["status"] == JOB_FAILED
+    assert "Not enough data points" in jobs.get(first["job_id"])["error"]
+    assert second["job_id"] != first["job_id"]
+    assert jobs.recover() == 1
+    assert jobs.get(second["job_id"])["error"] == "Interrupted by a server restart"
+
+
+def test_recovery_leaves_jobs_of_live_workers_alone(tmp_path):
+    """Another worker's job is failed only once its heartbeat is stale"""
+    jobs, _ = make_job_service(tmp_path)
+    now = datetime.utcnow()
+    with jobs.session_factory() as session:
+        for owner, heartbeat_at in (("other-host:1", now), ("other-host:2", now - timedelta(seconds=2 * JOB_STALE_SECONDS)), (None, None)):
+            session.add(BacktestResult(symbol="AAPL", status=JOB_RUNNING, owner=owner, heartbeat_at=heartbeat_at))
+        session.commit()
+
+    assert jobs.recover() == 2
+    assert [jobs.get(job_id)["status"] for job_id in (1, 2, 3)] == [JOB_RUNNING, JOB_FAILED, JOB_FAILED]
+    jobs.executor.shutdown()
+
+
+def test_missing_columns_are_added_to_an_existing_table(tmp_path):
+    """A database created before the job columns existed is altered in place and keeps its rows"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE backtest_results (id INTEGER PRIMARY KEY, symbol VARCHAR, strategy_name VARCHAR)"))
+        connection.execute(text("INSERT INTO backtest_results (symbol, strategy_name) VALUES ('SPY', 'rsi_strategy')"))
+
+    added = add_missing_columns(engine)
+
+    assert "backtest_results.request_hash" in added and "backtest_results.heartbeat_at" in added
+    assert "ix_backtest_results_status" in {index["name"] for index in inspect(engine).get_indexes("backtest_results")}
+    assert add_missing_columns(engine) == []
+    with sessionmaker(bind=engine)() as session:
+        assert session.query(BacktestResult).filter(BacktestResult.status.is_(None)).one().symbol == "SPY"
+
+
+def test_completed_jobs_are_only_reused_while_final(tmp_path):
+    """Jobs that ran before their last day was over, or too long ago, are recomputed"""
+    jobs, _ = make_job_service(tmp_path)
+    now = datetime.utcnow()
+    cases = {
+        "final": (datetime(2022, 6, 30), now),
+        "forming": (now.replace(hour=0, minute=0) + timedelta(days=1), now),
+        "expired": (datetime(2022, 6, 30), now - timedelta(seconds=COMPLETED_JOB_REUSE_SECONDS + 60)),
+    }
+    with jobs.session_factory() as session:
+        for key, (end_date, completed_at) in cases.items():
+            session.add(BacktestResult(symbol="AAPL", request_hash=key, status=JOB_COMPLETED, end_date=end_date, completed_at=completed_at))
+        session.commit()
+
+    reused = {key: not jobs._find_or_create(key, "AAPL", datetime(2022, 1, 1), end_date, "rsi_strategy", {})[1] for key, (end_date, _) in cases.items()}
+
+    assert reused == {"final": True, "forming": False, "expired": False}
+    jobs.executor.shutdown()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_service import BacktestService
+from app.services.metrics import compute_metrics, infer_periods_per_year
+
+
+def _returns(n, seed):
+    returns = np.random.default_rng(seed).normal(0.0005, 0.01, n)
+    returns[0] = np.nan
+    return returns
+
+
+def test_metrics_match_pandas_and_reference_formulas():
+    """Sharpe, drawdown and total return agree with the pandas metrics; the rest with direct formulas"""
+    service = BacktestService()
+    returns = _returns(1000, 1)
+    positions = np.sign(np.random.default_rng(2).normal(size=1000))
+    series = pd.Series(returns)
+
+    metrics = compute_metrics(returns, positions=positions, rolling_window=60)
+
+    assert metrics["sharpe_ratio"] == service.calculate_sharpe_ratio(series)
+    assert metrics["max_drawdown"] == service.calculate_max_drawdown(series)
+    assert metrics["total_return"] == pytest.approx((1 + series).prod() - 1, rel=1e-12)
+
+    valid = returns[1:]
+    downside = np.sqrt(np.mean(np.minimum(valid, 0) ** 2))
+    assert metrics["sortino_ratio"] == pytest.approx(np.sqrt(252) * valid.mean() / downside)
+    assert metrics["volatility"] == pytest.approx(valid.std(ddof=1) * np.sqrt(252))
+    assert metrics["cagr"] == pytest.approx((1 + metrics["total_return"]) ** (252 / 999) - 1)
+    assert metrics["calmar_ratio"] == pytest.approx(metrics["cagr"] / -metrics["max_drawdown"])
+    assert metrics["win_rate"] == pytest.approx((valid > 0).mean())
+    assert metrics["exposure"] == 1.0
+
+    equity = np.cumprod(1 + np.nan_to_num(returns))
+    underwater = np.maximum.accumulate(equity) > equity
+    longest = max(len(run) for run in "".join("1" if flag else "0" for flag in underwater).split("0"))
+    assert metrics["max_drawdown_duration"] == longest
+
+    expected = (series.rolling(60).mean() / series.rolling(60).std() * np.sqrt(252)).to_numpy()
+    np.testing.assert_allclose(metrics["rolling_sharpe"], expected, rtol=1e-9, atol=1e-12)
+
+
+def test_matrix_columns_match_single_series():
+    """Each column of a returns matrix gets the metrics of that series on its own"""
+    matrix = np.column_stack([_returns(300, 3), _returns(300, 4), np.full(300, np.nan)])
+    matrix[:100, 1] = np.nan
+    positions = np.where(np.isnan(matrix), 0.0, 1.0)
+
+    metrics = compute_metrics(matrix, positions=positions, periods_per_year=98_280, rolling_window=20)
+
+    for column in range(2):
+        single = compute_metrics(matrix[:, column], positions=positions[:, column], periods_per_year=98_280, rolling_window=20)
+        for name, value in single.items():
+            np.testing.assert_allclose(metrics[name][..., column], value, rtol=1e-12, err_msg=name)
+    assert metrics["sharpe_ratio"][2] == 0.0 and metrics["total_return"][2] == 0.0
+
+
+def test_periods_per_year_follow_bar_spacing():
+    """Daily bars annualize with 252 periods, intraday bars with 252 sessions of bars"""
+    assert infer_periods_per_year(pd.date_range("2022-01-03", periods=300, freq="B")) == 252
+    minutes = pd.date_range("2022-01-03 14:30", periods=390, freq="min").append(pd.date_range("2022-01-04 14:30", periods=390, freq="min"))
+    assert infer_periods_per_year(minutes) == 252 * 390
+    # 04:00 to 20:00 New York time, which runs past midnight UTC
+    extended = pd.DatetimeIndex([]).append([pd.date_range(f"2022-01-{day:02d} 09:00", periods=960, freq="min") for day in (3, 4, 5)])
+    assert infer_periods_per_year(extended) == 252 * 960
+    assert infer_periods_per_year(pd.date_range("2022-01-03", periods=100, freq="W")) == pytest.approx(52.18, abs=0.01)
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.option_chain import OptionChain, occ_symbols, years_to_expiry
+from app.services.option_pricing import black_scholes_greeks, black_scholes_price, implied_volatility
+
+
+def _grid(n, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        "spot": rng.uniform(50, 150, n),
+        "strike": rng.uniform(30, 200, n),
+        "time": rng.uniform(1 / 365, 3, n),
+        "volatility": rng.uniform(0.05, 1.5, n),
+        "is_call": rng.random(n) < 0.5,
+        "rate": rng.uniform(0, 0.08, n),
+        "dividend": rng.uniform(0, 0.04, n),
+    }
+
+
+def test_prices_and_greeks_are_consistent():
+    """Put-call parity holds, and the Greeks match finite differences of the price"""
+    grid = _grid(2000, 1)
+    args = (grid["spot"], grid["strike"], grid["time"], grid["volatility"])
+    carry = (grid["rate"], grid["dividend"])
+    calls = black_scholes_price(*args, True, *carry)
+    puts = black_scholes_price(*args, False, *carry)
+    parity = grid["spot"] * np.exp(-grid["dividend"] * grid["time"]) - grid["strike"] * np.exp(-grid["rate"] * grid["time"])
+    np.testing.assert_allclose(calls - puts, parity, atol=1e-9)
+
+    greeks = black_scholes_greeks(*args, grid["is_call"], *carry)
+    price = lambda **bump: black_scholes_price(**{**grid, **bump})
+    h = 1e-4
+    np.testing.assert_allclose(greeks["price"], price(), atol=1e-10)
+    np.testing.assert_allclose(greeks["delta"], (price(spot=grid["spot"] + h) - price(spot=grid["spot"] - h)) / (2 * h), atol=1e-6)
+    np.testing.assert_allclose(greeks["vega"], (price(volatility=grid["volatility"] + h) - price(volatility=grid["volatility"] - h)) / (2 * h), rtol=1e-6, atol=1e-4)
+    np.testing.assert_allclose(greeks["rho"], (price(rate=grid["rate"] + h) - price(rate=grid["rate"] - h)) / (2 * h), rtol=1e-6, atol=1e-4)
+    dt = grid["time"] * 1e-5
+    np.testing.assert_allclose(greeks["theta"], -(price(time=grid["time"] + dt) - price(time=grid["time"] - dt)) / (2 * dt), rtol=1e-5, atol=1e-4)
+    h = 1e-2
+    second = (price(spot=grid["spot"] + h) - 2 * price() + price(spot=grid["spot"] - h)) / h ** 2
+    np.testing.assert_allclose(greeks["gamma"], second, atol=1e-5)
+
+
+def test_implied_volatility_round_trips_and_rejects_arbitrage():
+    """Solved volatilities reprice every option; prices outside the no-arbitrage bounds give NaN"""
+    grid = _grid(10_000, 2)
+    prices = black_scholes_price(**grid)
+    solved = implied_volatility(prices, grid["spot"], grid["strike"], grid["time"], grid["is_call"], grid["rate"], grid["dividend"])
+
+    # Options with no time value left have no recoverable volatility; the rest all solve
+    vega = black_scholes_greeks(**grid)["vega"]
+    identifiable = (vega > 1e-6 * prices) & (prices > 1e-8)
+    assert np.isfinite(solved[identifiable]).all()
+    repriced = black_scholes_price(**{**grid, "volatility": solved})
+    finite = np.isfinite(solved)
+    np.testing.assert_allclose(repriced[finite], prices[finite], rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(solved[identifiable & (vega > 1e-2)], grid["volatility"][identifiable & (vega > 1e-2)], rtol=1e-5)
+
+    # Below intrinsic, above the underlying, and expired
+    bad = implied_volatility([5.0, 101.0, 3.0], 100.0, [90.0, 100.0, 100.0], [1.0, 1.0, 0.0], True)
+    assert np.isnan(bad).all()
+
+
+def test_occ_symbols_match_single_contract_format():
+    """Vectorized OCC symbols agree with the per-contract format, rounding strikes instead of truncating"""
+    symbols = occ_symbols(["aapl", "SPY", "F"], ["2024-01-19", "2025-12-31", "2023-03-03"], [True, False, True], [190.0, 432.5, 4.35])
+    assert list(symbols) == ["AAPL240119C00190000", "SPY251231P00432500", "F230303C00004350"]
+    assert occ_symbols("AAPL", "2024-01-19", False, 1.5)[0] == "AAPL240119P00001500"
+    with pytest.raises(ValueError):
+        occ_symbols("AAPL", "2024-01-19", True, 100_000.0)
+
+
+def test_chain_is_indexed_by_underlying_and_expiry():
+    """Contracts are sorted into contiguous slices, and chain pricing and IV work on whole slices"""
+    contracts = [
+        {"symbol": f"O:{occ}", "strike_price": strike, "expiration_date": expiry, "contract_type": kind, "shares_per_contract": 100}
+        for underlying in ("MSFT", "AAPL")
+        for expiry in ("2024-02-16", "2024-01-19")
+        for kind in ("put", "call")
+        for strike in (200.0, 180.0, 190.0)
+        for occ in occ_symbols(underlying, expiry, kind == "call", strike)
+    ]
+    chain = OptionChain.from_contracts(contracts)
+    assert len(chain) == 24 and chain.underlying_symbols() == ["AAPL", "MSFT"]
+    assert sorted(chain.symbols) == sorted(contract["symbol"][2:] for contract in contracts)
+
+    january = chain.select("aapl", "2024-01-19")
+    assert len(january) == 6 and set(january.underlyings) == {"AAPL"}
+    assert list(january.strikes) == [180.0, 190.0, 200.0, 180.0, 190.0, 200.0]
+    assert list(january.is_call) == [False] * 3 + [True] * 3
+    assert list(chain.expiration_dates("MSFT")) == [np.datetime64("2024-01-19"), np.datetime64("2024-02-16")]
+    assert len(chain.select("TSLA")) == 0
+
+    as_of = datetime(2024, 1, 2, 15, 0)
+    # Expiry is the 16:00 New York close, 21:00 UTC in January
+    assert january.years_to_expiry(as_of)[0] == pytest.approx((17 + 6 / 24) / 365)
+    prices = january.prices(190.0, 0.3, as_of, rate=0.05)
+    np.testing.assert_allclose(january.implied_volatility(prices, 190.0, as_of, rate=0.05), 0.3, rtol=1e-8)
+    np.testing.assert_allclose(january.greeks(190.0, 0.3, as_of, rate=0.05)["price"], prices)
+    assert years_to_expiry(np.array(["2024-07-19"], dtype="datetime64[D]"), "2024-07-19 20:00:00")[0] == 0
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import backtest_service, parameter_sweep
+from app.services.backtest_executor import BacktestExecutor
+from app.services.backtest_service import BacktestService
+from app.services.parameter_sweep import expand_parameter_grid, map_over_frame, sample_parameter_grid
+
+
+def make_bars(n: int = 400, seed: int = 3) -> pd.DataFrame:
+    """Build a synthetic daily close series"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    index = pd.date_range("2021-01-01", periods=n, freq="D", name="timestamp")
+    return pd.DataFrame({"close": close, "volume": 1000.0}, index=index)
+
+
+def test_grid_expansion_and_sampling():
+    """Sampling draws distinct combinations from the full grid"""
+    grid = {"short_window": [5, 10, 20], "long_window": [50, 100]}
+    combinations = expand_parameter_grid(grid)
+    assert len(combinations) == 6
+
+    sampled = sample_parameter_grid(grid, 4, seed=0)
+    assert len(sampled) == 4
+    assert all(combination in combinations for combination in sampled)
+    assert len({tuple(c.items()) for c in sampled}) == 4
+
+
+def test_sweep_matches_single_backtests():
+    """Each ranked row carries the same metrics as a standalone run_backtest"""
+    service = BacktestService()
+    df = make_bars()
+    grid = {"short_window": [5, 10], "long_window": [30, 60]}
+
+    sweep = service.run_sweep(df, "simple_moving_average", grid, max_workers=2)
+
+    assert sweep["combinations"] == 4
+    sharpes = [row["sharpe_ratio"] for row in sweep["results"]]
+    assert sharpes == sorted(sharpes, reverse=True)
+    for row in sweep["results"]:
+        single = service.run_backtest(df, "simple_moving_average", row["parameters"])
+        assert row["total_return"] == pytest.approx(single["total_return"])
+        assert row["max_drawdown"] == pytest.approx(single["max_drawdown"])
+        assert "signals" not in row
+
+
+def test_sweep_reports_failed_combinations():
+    """Combinations the strategy rejects are listed separately instead of aborting the sweep"""
+    sweep = BacktestService().run_sweep(
+        make_bars(100), "simple_moving_average", {"long_window": [50, 500]}, max_workers=1, include_signals=True
+    )
+
+    assert [row["parameters"] for row in sweep["results"]] == [{"long_window": 50}]
+    assert len(sweep["results"][0]["signals"]) == 100
+    assert [row["parameters"] for row in sweep["errors"]] == [{"long_window": 500}]
+
+
+def test_batched_rsi_sweep_matches_single_backtests(monkeypatch):
+    """The RSI sweep runs as one batch, in chunks, and each row matches a standalone backtest"""
+    monkeypatch.setattr(parameter_sweep, "SWEEP_BATCH_MAX_ELEMENTS", 400 * 5)
+    monkeypatch.setattr(backtest_service, "run_parameter_sweep", None)
+    service = BacktestService()
+    df = make_bars()
+    grid = {"period": [7, 14], "method": ["sma", "wilder"], "overbought": [60, 70], "oversold": [30, 40]}
+
+    sweep = service.run_sweep(df, "rsi_strategy", grid, include_signals=True)
+
+    assert sweep["combinations"] == 16 and len(sweep["results"]) == 16
+    for row in sweep["results"]:
+        single = service.run_backtest(df, "rsi_strategy", row["parameters"])
+        assert row["signals"] == single["signals"]
+        for name in ("total_return", "sharpe_ratio", "max_drawdown", "max_drawdown_duration", "exposure"):
+            assert row[name] == pytest.approx(single[name])
+
+
+def _slow_item(service, df, item):
+    time.sleep(0.2)
+    return item
+
+
+def test_abandoned_sweep_stops_instead_of_finishing_the_grid():
+    """When the request times out the sweep's queued chunks are cancelled and its slot freed"""
+    executor = BacktestExecutor(max_workers=1, max_pending=1, timeout=60)
+    data = make_bars(50)
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await executor.run_compute(map_over_frame, data, _slow_item, list(range(80)), 2, in_process=False, timeout=1)
+        abandoned = time.monotonic()
+        while executor.in_flight:
+            await asyncio.sleep(0.05)
+        return time.monotonic() - abandoned
+
+    # Uncancelled, the grid takes 8s: 8 chunks of 2s on 2 workers
+    assert asyncio.run(scenario()) < 2
+
+
+def _worker_pid(service, df, item):
+    return os.getpid()
+
+
+def test_sweeps_share_one_bounded_pool(monkeypatch):
+    """Consecutive sweeps reuse the same worker processes, never more than the pool size"""
+    parameter_sweep.shutdown_sweep_pool()
+    monkeypatch.setenv("SWEEP_MAX_WORKERS", "2")
+    data = make_bars(50)
+    try:
+        first = set(map_over_frame(data, _worker_pid, list(range(40)), 8))
+        second = set(map_over_frame(data.iloc[:30], _worker_pid, list(range(40)), 8))
+    finally:
+        parameter_sweep.shutdown_sweep_pool()
+
+    assert len(first | second) <= 2
+    assert first & second and os.getpid() not in first
+
+
+def test_single_worker_sweeps_still_leave_the_calling_process():
+    """With one worker, or one item, the work still runs in the sweep pool rather than a thread of the API process"""
+    data = make_bars(50)
+
+    assert set(map_over_frame(data, _worker_pid, list(range(5)), 1)) != {os.getpid()}
+    assert map_over_frame(data, _worker_pid, [0]) != [os.getpid()]
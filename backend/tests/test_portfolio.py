@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_service import BacktestService
+from app.services.portfolio import align_closes, left_align, restore_alignment
+from app.services.strategy_registry import StrategyRegistry, StrategySpec
+
+
+def _bars(n, seed, start="2022-01-03"):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return pd.DataFrame({"close": close}, index=pd.date_range(start, periods=n, freq="D", name="timestamp"))
+
+
+@pytest.mark.parametrize("strategy_name", list(BacktestService().strategies))
+def test_portfolio_metrics_match_single_symbol_backtests(strategy_name):
+    """Each column of a portfolio run scores the same as backtesting that symbol alone"""
+    service = BacktestService()
+    frames = {"AAA": _bars(400, 1), "BBB": _bars(400, 2), "LATE": _bars(250, 3, start="2022-06-02")}
+
+    results = service.run_portfolio(align_closes(frames), strategy_name, {})
+
+    assert [row["symbol"] for row in results["symbols"]] == ["AAA", "BBB", "LATE"]
+    for row in results["symbols"]:
+        single = service.evaluate(frames[row["symbol"]], strategy_name, {})
+        assert row["bars"] == len(frames[row["symbol"]])
+        for metric in ("total_return", "sharpe_ratio", "max_drawdown"):
+            assert row[metric] == pytest.approx(single[metric], rel=1e-9, abs=1e-12)
+    assert len(results["equity_curve"]) == 400
+
+
+def test_portfolio_applies_each_symbols_warmup_and_error_policy():
+    """A symbol too short for the strategy is rejected on its own; flat-on-error strategies go flat"""
+    def fail_on_short(close, parameters):
+        if len(close) < 100:
+            raise ValueError("too short")
+        return np.ones_like(close)
+
+    registry = StrategyRegistry(package=None, entry_point_group=None)
+    registry.register(StrategySpec("strict", "Strict", fail_on_short))
+    registry.register(StrategySpec("lenient", "Lenient", fail_on_short, flat_on_error=True))
+    service = BacktestService(registry=registry)
+    frames = {"AAA": _bars(400, 1), "NEW": _bars(60, 3, start="2023-01-06")}
+    closes = align_closes(frames)
+
+    strict = service.run_portfolio(closes, "strict", {})
+    lenient = service.run_portfolio(closes, "lenient", {})
+
+    assert [row["symbol"] for row in strict["symbols"]] == ["AAA"]
+    assert "too short" in strict["errors"]["NEW"]
+    assert strict["total_return"] == pytest.approx(frames["AAA"]["close"].iloc[-1] / frames["AAA"]["close"].iloc[0] - 1)
+    assert lenient["errors"] == {}
+    assert lenient["symbols"][1]["total_return"] == 0.0
+    with pytest.raises(ValueError, match="too short"):
+        service.run_portfolio(align_closes({"NEW": frames["NEW"]}), "strict", {})
+
+
+def test_alignment_fills_gaps_and_round_trips():
+    """Missing bars carry the last close forward and left alignment is reversible"""
+    frames = {"A": _bars(5, 1), "B": _bars(5, 2).drop(pd.Timestamp("2022-01-05")), "C": _bars(2, 3, start="2022-01-06")}
+
+    closes = align_closes(frames)
+
+    assert closes.shape == (5, 3)
+    assert closes.loc["2022-01-05", "B"] == closes.loc["2022-01-04", "B"]
+    assert closes["C"].isna().sum() == 3
+    shifted, first = left_align(closes.to_numpy())
+    np.testing.assert_array_equal(first, [0, 0, 3])
+    np.testing.assert_array_equal(shifted[:2, 2], closes["C"].dropna().to_numpy())
+    np.testing.assert_array_equal(restore_alignment(shifted, first), closes.to_numpy())
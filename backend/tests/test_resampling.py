@@ -0,0 +1,87 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.bar_cache import BarCache
+from app.services.bars import BAR_COLUMNS, BarSeries
+from app.services.polygon_service import PolygonService
+from app.services.resampling import parse_interval, resample_bars, resample_chunks
+
+
+def _minute_bars(start, end):
+    """Regular-session minute bars plus a late after-hours bar for each weekday, in UTC"""
+    sessions = []
+    for day in pd.bdate_range(start, end):
+        session = pd.date_range(f"{day.date()} 09:30", f"{day.date()} 15:59", freq="min", tz="America/New_York")
+        sessions.append(session.append(pd.DatetimeIndex([pd.Timestamp(f"{day.date()} 19:59", tz="America/New_York")])))
+    index = sessions[0].append(sessions[1:]) if sessions else pd.DatetimeIndex([], tz="UTC")
+    timestamps = index.tz_convert("UTC").asi8 // 1_000_000
+    rng = np.random.default_rng(len(timestamps))
+    close = 100 + np.cumsum(rng.normal(0, 0.1, len(timestamps)))
+    values = np.vstack([close + 0.01, close + 0.2, close - 0.2, close, rng.integers(1, 100, len(close)), close, rng.integers(1, 5, len(close))]).astype(np.float64)
+    return BarSeries(timestamps.astype(np.int64), values)
+
+
+class FakeMinuteClient:
+    """Stands in for polygon.RESTClient, serving synthetic minute bars"""
+
+    def __init__(self):
+        self.calls = []
+
+    def list_aggs(self, symbol, multiplier, timespan, from_, to, limit):
+        self.calls.append((symbol, timespan, from_, to))
+        assert timespan == "minute"
+        bars = _minute_bars(from_, to)
+        for i, ts in enumerate(bars.timestamps):
+            yield SimpleNamespace(timestamp=int(ts), **{name: bars.values[row, i] for row, name in enumerate(BAR_COLUMNS)})
+
+
+def _pandas_resample(bars, rule):
+    local = bars.to_frame().tz_localize("UTC").tz_convert("America/New_York")
+    grouped = local.assign(traded=local["vwap"] * local["volume"]).resample(rule)
+    frame = grouped.agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "traded": "sum", "transactions": "sum"})
+    frame = frame[grouped.size() > 0]
+    frame["vwap"] = frame.pop("traded") / frame["volume"]
+    return frame[BAR_COLUMNS], frame.index.tz_convert("UTC").tz_localize(None)
+
+
+@pytest.mark.parametrize("interval, rule", [("5m", "5min"), ("15m", "15min"), ("1h", "1h"), ("1d", "1D")])
+def test_resampling_matches_pandas_across_chunks_and_dst(interval, rule):
+    """Chunked resampling reproduces pandas' wall-clock-aligned OHLCV aggregation"""
+    bars = _minute_bars("2023-03-09", "2023-03-14")
+    expected, index = _pandas_resample(bars, rule)
+
+    chunks = [BarSeries(bars.timestamps[i:i + 777], bars.values[:, i:i + 777]) for i in range(0, len(bars), 777)]
+    resampled = resample_chunks(chunks, interval)
+
+    np.testing.assert_array_equal(resampled.to_frame().index, index)
+    np.testing.assert_allclose(resampled.values, expected.to_numpy().T, rtol=1e-12)
+    np.testing.assert_array_equal(resample_bars(bars, interval).values, resampled.values)
+
+
+def test_intervals_are_validated():
+    """Intervals must divide a day, and day bars are single days"""
+    assert parse_interval("15m") == (15, "minute") and parse_interval("1d") == (1, "day")
+    for interval in ("7m", "2d", "0h", "5x", "m"):
+        with pytest.raises(ValueError):
+            parse_interval(interval)
+
+
+def test_intraday_intervals_share_one_minute_cache(tmp_path):
+    """Minute bars are fetched once; other intervals and after-hours bars come from the cache"""
+    client = FakeMinuteClient()
+    service = PolygonService(cache=BarCache(str(tmp_path)), client=client)
+
+    five = service.get_stock_bars("AAPL", datetime(2023, 1, 2), datetime(2023, 2, 10), interval="5m")
+    hourly = service.get_stock_bars("AAPL", datetime(2023, 1, 2), datetime(2023, 2, 10), interval="1h")
+    minutes = service.get_stock_bars("AAPL", datetime(2023, 1, 6), datetime(2023, 1, 6), interval="1m")
+
+    assert [call[2:] for call in client.calls] == [("2023-01-02", "2023-01-31"), ("2023-02-01", "2023-02-10")]
+    assert len(five) == 30 * 78 + 30 and len(hourly) == 30 * 8
+    assert hourly["volume"].sum() == five["volume"].sum()
+    # The 19:59 New York bar is past midnight UTC but still belongs to Jan 6
+    assert len(minutes) == 391
+    assert minutes.index[-1] == pd.Timestamp("2023-01-07 00:59")
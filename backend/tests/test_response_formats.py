@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.api.formats import ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, RAW_MEDIA_TYPE, encode_raw, negotiate_media_type
+from app.services.downsampling import lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """Downsampling keeps the first/last points and the spikes a stride would miss"""
+    values = np.ones(10_000)
+    values[3_333] = 5.0
+    values[7_777] = -3.0
+
+    index = lttb_indices(values, 100)
+
+    assert len(index) == 100
+    assert index[0] == 0 and index[-1] == len(values) - 1
+    assert np.all(np.diff(index) > 0)
+    assert 3_333 in index and 7_777 in index
+
+
+def test_lttb_returns_everything_when_short():
+    """Series that already fit are returned whole"""
+    np.testing.assert_array_equal(lttb_indices(np.arange(5.0), 10), np.arange(5))
+
+
+def test_accept_header_negotiation():
+    """The highest-q supported type wins and JSON is the fallback"""
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type("*/*") == JSON_MEDIA_TYPE
+    assert negotiate_media_type("text/html") == JSON_MEDIA_TYPE
+    assert negotiate_media_type(ARROW_MEDIA_TYPE) == ARROW_MEDIA_TYPE
+    assert negotiate_media_type(f"{JSON_MEDIA_TYPE};q=0.5, {RAW_MEDIA_TYPE};q=0.9") == RAW_MEDIA_TYPE
+
+
+def test_raw_encoding_round_trips():
+    """Raw buffers decode with the layout given in X-Columns"""
+    columns = {"index": np.array([0, 5, 9]), "equity_curve": np.array([1.0, 1.5, 0.75], dtype=np.float32)}
+
+    payload, layout = encode_raw(columns)
+
+    assert layout == "index:int64,equity_curve:float32"
+    np.testing.assert_array_equal(np.frombuffer(payload[:24], "<i8"), columns["index"])
+    np.testing.assert_array_equal(np.frombuffer(payload[24:], "<f4"), columns["equity_curve"])
@@ -0,0 +1,152 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from app.services import parameter_sweep, result_cache
+from app.services.backtest_service import BacktestService
+from app.services.parameter_sweep import run_parameter_sweep
+from app.services.result_cache import ResultCache
+
+
+def make_bars(n: int = 300, seed: int = 5) -> pd.DataFrame:
+    """Build a synthetic daily close series"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range("2021-01-01", periods=n, freq="D", name="timestamp")
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def counting_service(cache: ResultCache):
+    """BacktestService whose SMA strategy counts how often it actually runs"""
+    service = BacktestService(result_cache=cache)
+    calls = []
+    strategy = service.strategies["simple_moving_average"]
+
+    def counted(df, parameters):
+        calls.append(parameters)
+        return strategy(df, parameters)
+
+    service.strategies["simple_moving_average"] = counted
+    return service, calls
+
+
+def test_repeated_backtest_is_served_from_cache():
+    """The second identical run does not recompute, and equivalent parameters share an entry"""
+    service, calls = counting_service(ResultCache())
+    df = make_bars()
+
+    first = service.run_backtest(df, "simple_moving_average", {"short_window": 10, "long_window": 30})
+    second = service.run_backtest(df.copy(), "simple_moving_average", {"long_window": 30.0, "short_window": 10})
+
+    assert len(calls) == 1
+    assert first == second
+    assert service.result_cache.stats()["hits"] == 1
+
+
+def test_changed_bars_invalidate_the_cache():
+    """Any change to the bar data produces a new key"""
+    service, calls = counting_service(ResultCache())
+    df = make_bars()
+    service.run_backtest(df, "simple_moving_average", {})
+
+    changed = df.copy()
+    changed.iloc[-1, 0] *= 1.01
+    service.run_backtest(changed, "simple_moving_average", {})
+
+    assert len(calls) == 2
+
+
+def test_lru_eviction_by_size():
+    """The least recently used entry goes first once the byte budget is exceeded"""
+    entry = {"signals": np.zeros(1000)}
+    cache = ResultCache(max_bytes=2 * (8000 + 1024))
+
+    cache.put("a", entry)
+    cache.put("b", entry)
+    cache.get("a")
+    cache.put("c", entry)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_layer_is_shared_between_instances(tmp_path):
+    """A fresh process-local cache finds results written by another one on disk"""
+    df = make_bars()
+    writer, _ = counting_service(ResultCache(disk_dir=str(tmp_path)))
+    expected = writer.run_backtest(df, "simple_moving_average", {})
+
+    reader, calls = counting_service(ResultCache(disk_dir=str(tmp_path)))
+    result = reader.run_backtest(df, "simple_moving_average", {})
+
+    assert calls == []
+    assert result == expected
+    assert reader.result_cache.stats()["disk_hits"] == 1
+
+
+class Payload:
+    """Runs code when unpickled"""
+
+    def __reduce__(self):
+        return (os.system, ("touch pwned",))
+
+
+def test_disk_entries_are_not_pickles(tmp_path, monkeypatch):
+    """Entries round-trip as npz without pickle, and a planted pickle is never loaded"""
+    cache = ResultCache(disk_dir=str(tmp_path / "cache"))
+    key = "ab" + "0" * 38
+    cache.put(key, {"total_return": 0.5, "strategy_display_name": "SMA", "trades": np.int64(3), "signals": np.arange(4.0)})
+
+    stored = ResultCache(disk_dir=str(tmp_path / "cache")).get(key)
+    assert stored["total_return"] == 0.5 and stored["trades"] == 3 and stored["strategy_display_name"] == "SMA"
+    np.testing.assert_array_equal(stored["signals"], np.arange(4.0))
+    assert not stored["signals"].flags.writeable
+
+    planted = "cd" + "0" * 38
+    cache = ResultCache(disk_dir=str(tmp_path / "cache"))
+    os.makedirs(os.path.dirname(cache._disk_path(planted)))
+    with open(cache._disk_path(planted), "wb") as f:
+        pickle.dump(Payload(), f)
+    monkeypatch.chdir(tmp_path)
+    assert cache.get(planted) is None
+    assert not (tmp_path / "pwned").exists()
+
+
+def test_disk_layer_is_only_walked_when_over_budget(tmp_path, monkeypatch):
+    """Writes keep a running total; the directory is scanned once up front and then only to evict"""
+    walks = []
+    evict = ResultCache._evict_disk
+    monkeypatch.setattr(ResultCache, "_evict_disk", lambda self: (walks.append(1), evict(self)))
+    entry = {"signals": np.zeros(1000)}
+    probe = ResultCache(disk_dir=str(tmp_path / "probe"))
+    probe.put("00" + "0" * 38, entry)
+    cache = ResultCache(disk_dir=str(tmp_path / "cache"), max_disk_bytes=5 * probe._disk_bytes)
+    walks.clear()
+
+    for number in range(5):
+        cache.put(f"{number:02d}" + "0" * 38, entry)
+    assert len(walks) == 1
+    for number in range(5, 8):
+        cache.put(f"{number:02d}" + "0" * 38, entry)
+
+    sizes = [os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path / "cache") for name in names]
+    assert len(walks) == 4 and len(sizes) == 5
+    assert cache._disk_bytes == sum(sizes)
+
+
+def test_sweeps_fingerprint_the_bars_once(monkeypatch):
+    """Every combination of a sweep is keyed from one hash of the bars"""
+    hashed = []
+    fingerprint = result_cache.bar_fingerprint
+    monkeypatch.setattr(result_cache, "bar_fingerprint", lambda df: (hashed.append(1), fingerprint(df))[1])
+    monkeypatch.setattr(parameter_sweep, "bar_fingerprint", result_cache.bar_fingerprint)
+
+    combinations = [{"short_window": short, "long_window": 30} for short in (5, 10, 15, 20)]
+    rows = run_parameter_sweep(make_bars(), "simple_moving_average", combinations, max_workers=1)
+
+    assert len(rows) == 4 and all("error" not in row for row in rows)
+    assert len(hashed) == 1
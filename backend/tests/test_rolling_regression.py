@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from app.services.backtest_service import BacktestService
+from app.services.rolling_regression import rolling_ols
+
+
+def make_bars(n: int, seed: int = 7) -> pd.DataFrame:
+    """Build a synthetic daily close series"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def reference_momentum_weights(df: pd.DataFrame, short: int, mid: int, long: int, reg_window: int) -> pd.Series:
+    """Per-window statsmodels fit, as momentum_regression_strategy originally computed it"""
+    df = df.copy()
+    df['SMA_short'] = df['close'].rolling(window=short).mean()
+    df['SMA_mid'] = df['close'].rolling(window=mid).mean()
+    df['SMA_long'] = df['close'].rolling(window=long).mean()
+    df['return'] = df['close'].pct_change()
+
+    weights = pd.Series(0.0, index=df.index)
+    for i in range(reg_window, len(df)):
+        window_df = df.iloc[i - reg_window:i]
+        X = window_df[['SMA_short', 'SMA_mid', 'SMA_long']].dropna()
+        y = window_df['return'].loc[X.index]
+        if len(X) < reg_window // 2 or X.empty or y.empty:
+            continue
+        model = sm.OLS(y, sm.add_constant(X)).fit()
+        alpha = model.params.get('const', 0.0)
+        sigma_squared = np.var(model.resid) if len(model.resid) > 0 else 1e-6
+        weights.iloc[i] = np.clip(alpha / (sigma_squared + 1e-6), -1, 1)
+    return weights.fillna(0)
+
+
+def test_rolling_ols_matches_statsmodels():
+    """Every window's coefficients and residual variance match a statsmodels fit"""
+    rng = np.random.default_rng(1)
+    n, window = 120, 25
+    X = rng.normal(size=(n, 2))
+    X[:10, 1] = np.nan
+    y = X[:, 0] * 0.5 - 0.2 + rng.normal(scale=0.1, size=n)
+
+    fit = rolling_ols(y, X, window=window, min_nobs=10)
+
+    for t in range(window - 1, n):
+        rows = slice(t - window + 1, t + 1)
+        mask = np.isfinite(X[rows]).all(axis=1)
+        if mask.sum() < 10:
+            assert np.isnan(fit["params"][t]).all()
+            continue
+        model = sm.OLS(y[rows][mask], sm.add_constant(X[rows][mask])).fit()
+        np.testing.assert_allclose(fit["params"][t], model.params, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(fit["sigma_squared"][t], np.var(model.resid), rtol=1e-8)
+        assert fit["nobs"][t] == mask.sum()
+
+
+def test_rolling_ols_batches_independent_series():
+    """A (n, m) input gives the same fits as m separate calls"""
+    rng = np.random.default_rng(2)
+    n, m, window = 80, 3, 20
+    X = rng.normal(size=(n, m, 2))
+    y = rng.normal(size=(n, m))
+
+    batched = rolling_ols(y, X, window=window)
+    for j in range(m):
+        single = rolling_ols(y[:, j], X[:, j], window=window)
+        np.testing.assert_allclose(batched["params"][:, j], single["params"], equal_nan=True)
+
+
+@pytest.mark.parametrize("params", [(5, 20, 60, 30), (3, 10, 15, 12), (2, 4, 8, 1)])
+def test_momentum_regression_matches_statsmodels_loop(params):
+    """The vectorized strategy gives the same gamma weights as the per-window OLS loop"""
+    short, mid, long, reg_window = params
+    df = make_bars(300)
+    expected = reference_momentum_weights(df, short, mid, long, reg_window)
+
+    weights = BacktestService().momentum_regression_strategy(df.copy(), {
+        "short_sma": short,
+        "mid_sma": mid,
+        "long_sma": long,
+        "regression_window": reg_window,
+    })
+
+    np.testing.assert_allclose(weights.to_numpy(), expected.to_numpy(), rtol=1e-6, atol=1e-9)
+
+
+def test_momentum_regression_flat_prices():
+    """A constant SMA column makes statsmodels skip the intercept, so the weight stays 0"""
+    df = make_bars(150)
+    df.iloc[60:110, df.columns.get_loc("close")] = 123.0
+    expected = reference_momentum_weights(df, 5, 20, 30, 15)
+
+    weights = BacktestService().momentum_regression_strategy(df.copy(), {
+        "short_sma": 5,
+        "mid_sma": 20,
+        "long_sma": 30,
+        "regression_window": 15,
+    })
+
+    np.testing.assert_allclose(weights.to_numpy(), expected.to_numpy(), rtol=1e-6, atol=1e-9)
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import strategy_registry as registry_module
+from app.services.backtest_service import BacktestService
+from app.services.strategy_registry import StrategyRegistry, StrategySpec, strategy_registry
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _plugin_signals(close, parameters):
+    return np.where(close > parameters.get("level", 100), 1, -1)
+
+
+def _plugin():
+    # Signal code named by path, so the registry imports it only when the strategy runs
+    return StrategySpec(
+        "threshold",
+        "Threshold",
+        "tests.test_strategy_registry:_plugin_signals",
+        parameters={"level": {"type": "number", "default": 100}},
+        warmup=1,
+    )
+
+
+
+def test_builtin_schemas_match_the_signal_defaults():
+    """Every built-in declares defaults its signal function actually uses, and a warm-up length"""
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 300)))
+    assert set(strategy_registry.names()) == {"simple_moving_average", "exponential_moving_average", "rsi_strategy", "momentum_regression"}
+    for name in strategy_registry.names():
+        spec = strategy_registry.get(name)
+        np.testing.assert_array_equal(spec.load()(close, spec.defaults()), spec.load()(close, {}), err_msg=name)
+
+    service = BacktestService()
+    assert service.get_strategy_schemas()["simple_moving_average"]["warmup_bars"] == 50
+    assert service.warmup_bars("momentum_regression", {"long_sma": 100}) == 130
+    assert service.warmup_bars("rsi_strategy", {}) == 15
+    with pytest.raises(ValueError):
+        service.warmup_bars("nope", {})
+
+
+def test_plugins_are_discovered_and_loaded_on_first_use(monkeypatch):
+    """Entry point plugins are listed without importing their signal code, and run through the service"""
+    spec = _plugin()
+    entry_point = SimpleNamespace(name="threshold", load=lambda: [spec])
+    broken = EntryPoint("broken", "tests.missing_module:STRATEGIES", registry_module.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: [entry_point, broken])
+
+    registry = StrategyRegistry()
+    assert registry.describe()["threshold"] == {"display_name": "Threshold", "parameters": spec.parameters, "warmup_bars": 1}
+    assert "simple_moving_average" in registry and not spec.loaded
+
+    service = BacktestService(registry=registry)
+    df = pd.DataFrame({"close": [99.0, 101.0, 102.0]}, index=pd.date_range("2022-01-01", periods=3, name="timestamp"))
+    assert service.strategies["threshold"](df, {}).tolist() == [-1, 1, 1]
+    assert spec.loaded
+    closes = pd.DataFrame({"A": np.linspace(90, 110, 60), "B": np.linspace(110, 90, 60)}, index=pd.date_range("2022-01-01", periods=60))
+    assert service.run_portfolio(closes, "threshold", {"level": 100})["strategy_display_name"] == "Threshold"
+
+
+def test_app_imports_without_credentials_or_heavy_dependencies():
+    """The API loads with no Polygon key, and without scipy or the polygon client"""
+    env = {key: value for key, value in os.environ.items() if key != "POLYGON_API_KEY"}
+    env.setdefault("DATABASE_URL", "sqlite://")
+    script = "import sys, main; print(sorted(m for m in ('scipy', 'polygon') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_service import BacktestService
+from app.services.indicators import rsi
+from app.services.streaming import STREAMING_STRATEGIES, StreamingRSI, StreamingStrategy, create_streaming_strategy
+
+SHORT_PARAMETERS = {
+    "short_window": 3, "long_window": 7, "period": 5, "overbought": 60, "oversold": 40,
+    "short_sma": 2, "mid_sma": 4, "long_sma": 8, "regression_window": 6,
+}
+
+
+def _prices(seed, n=300):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    close[40:120] = close[40]
+    close[200:210] = close[200]
+    return close
+
+
+@pytest.mark.parametrize("parameters", [{}, SHORT_PARAMETERS, {**SHORT_PARAMETERS, "method": "wilder"}])
+@pytest.mark.parametrize("strategy_name", list(STREAMING_STRATEGIES))
+def test_streaming_signals_match_batch(strategy_name, parameters):
+    """Bar-by-bar updates reproduce the batch strategy's signals exactly, flat stretches included"""
+    service = BacktestService()
+    for seed in range(3):
+        close = _prices(seed)
+        df = pd.DataFrame({"close": close}, index=pd.date_range("2022-01-01", periods=len(close), name="timestamp"))
+
+        batch = service.strategies[strategy_name](df, parameters).to_numpy(dtype=np.float64)
+        streamed = create_streaming_strategy(strategy_name, parameters).update_many([{"close": c} for c in close])
+
+        np.testing.assert_array_equal(streamed, batch)
+
+
+def test_streaming_registry_covers_every_strategy():
+    """Each batch strategy has an incremental evaluator"""
+    assert set(STREAMING_STRATEGIES) == set(BacktestService().strategies)
+    with pytest.raises(ValueError):
+        create_streaming_strategy("nope", {})
+
+
+def test_incomplete_streaming_strategy_cannot_be_created():
+    """A subclass without `_update` fails when instantiated, not on its first bar"""
+
+    class Incomplete(StreamingStrategy):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete({})
+
+
+def test_streaming_rsi_values_match_the_batch_kernel():
+    """Per-bar RSI equals `indicators.rsi`: bit for bit for simple averages, to a few ulps for Wilder's"""
+    for seed in range(5):
+        close = _prices(seed, 500)
+        for period in (1, 2, 5, 14, 50):
+            batch = rsi(close, [period], "sma")[:, 0]
+            streaming = StreamingRSI(period, "sma")
+            np.testing.assert_array_equal([streaming.update(c) for c in close], batch)
+
+            batch = rsi(close, [period], "wilder")[:, 0]
+            streaming = StreamingRSI(period, "wilder")
+            np.testing.assert_allclose([streaming.update(c) for c in close], batch, rtol=1e-12, atol=1e-9)
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.option_chain import OptionChain
+from app.services.option_pricing import black_scholes_price
+from app.services.volatility import REALIZED_ESTIMATORS, RealizedVolatility, realized_volatility
+from app.services.volatility_cache import VolatilityCache
+from app.services.volatility_surface import build_surface
+
+
+def _ohlc(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * np.exp(rng.normal(0, 0.004, n))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.005, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.005, n)))
+    index = pd.date_range("2021-01-04", periods=n, freq="B", name="timestamp")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+
+
+def _pandas_estimates(df, window):
+    log = np.log
+    returns = log(df["close"]).diff()
+    range_squared = log(df["high"] / df["low"]) ** 2
+    open_close = log(df["close"] / df["open"])
+    overnight = log(df["open"] / df["close"].shift())
+    rogers_satchell = log(df["high"] / df["close"]) * log(df["high"] / df["open"]) + log(df["low"] / df["close"]) * log(df["low"] / df["open"])
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    variances = {
+        "close_to_close": returns.rolling(window).var(),
+        "parkinson": (range_squared / (4 * np.log(2))).rolling(window).mean(),
+        "garman_klass": (0.5 * range_squared - (2 * np.log(2) - 1) * open_close ** 2).rolling(window).mean(),
+        "yang_zhang": overnight.rolling(window).var() + k * open_close.rolling(window).var() + (1 - k) * rogers_satchell.rolling(window).mean(),
+    }
+    return {name: np.sqrt(variance * 252).to_numpy() for name, variance in variances.items()}
+
+
+def test_estimators_match_pandas_rolling_formulas():
+    """Every estimator, for several windows at once, matches its pandas rolling definition"""
+    df = _ohlc(600, 1)
+    windows = [5, 21, 63]
+    for estimator in REALIZED_ESTIMATORS:
+        estimates = realized_volatility(df, windows, estimator)
+        assert estimates.shape == (600, 3)
+        for column, window in enumerate(windows):
+            expected = _pandas_estimates(df, window)[estimator]
+            np.testing.assert_allclose(estimates[:, column], expected, rtol=1e-9, atol=1e-12, err_msg=f"{estimator} {window}")
+    with pytest.raises(ValueError):
+        realized_volatility(df, [1], "parkinson")
+    with pytest.raises(ValueError):
+        realized_volatility(df, [20], "atr")
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    """Appending bars one at a time, or in overlapping batches, gives the full-history estimates"""
+    df = _ohlc(400, 2)
+    state = RealizedVolatility()
+    assert state.update(df.iloc[:250]) == 250
+    assert state.update(df.iloc[200:300]) == 50
+    for i in range(300, 400):
+        assert state.update(df.iloc[i - 1:i + 1]) == 1
+
+    full = realized_volatility(df, [10, 30], "yang_zhang")
+    np.testing.assert_allclose(state.estimate([10, 30], "yang_zhang"), full, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(state.latest([10, 30], "yang_zhang"), full[-1], rtol=1e-9)
+    assert state.index.equals(df.index)
+
+    cache = VolatilityCache()
+    assert len(cache.realized("AAPL", "1d", df.iloc[:300])) == 300
+    assert len(cache.realized("aapl", "1d", df)) == 400
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] *= 1.01
+    rebuilt = cache.realized("AAPL", "1d", revised)
+    np.testing.assert_allclose(rebuilt.latest([10]), realized_volatility(revised, [10])[-1])
+    assert cache.stats()["updates"] == 1 and cache.stats()["misses"] == 2
+
+    # A returned state is a snapshot: a later request extending the series leaves it as it was
+    earlier = cache.realized("MSFT", "1d", df.iloc[:300])
+    assert len(cache.realized("MSFT", "1d", df)) == 400
+    assert len(earlier) == 300 and earlier.index.equals(df.index[:300])
+    np.testing.assert_allclose(earlier.latest([10, 30], "yang_zhang"), realized_volatility(df.iloc[:300], [10, 30], "yang_zhang")[-1], rtol=1e-9)
+
+
+def _smile_chain(as_of, spot, rate, jitter=0.0):
+    expirations = np.array(["2024-02-16", "2024-03-15", "2024-06-21", "2024-12-20"], dtype="datetime64[D]")
+    strikes = np.arange(60.0, 141.0, 2.5)
+    expiry, strike, is_call = (a.ravel() for a in np.meshgrid(expirations, strikes, [True, False], indexing="ij"))
+    chain = OptionChain(["SPY"] * len(strike), expiry, is_call, strike)
+    time = chain.years_to_expiry(as_of)
+    moneyness = np.log(chain.strikes / spot) - rate * time
+    volatility = 0.2 + 0.3 * moneyness ** 2 - 0.05 * moneyness + 0.02 * np.sqrt(time)
+    chain.quotes = black_scholes_price(spot, chain.strikes, time, volatility, chain.is_call, rate) * (1 + jitter)
+    return chain, volatility
+
+
+def test_surface_reproduces_the_smile_and_is_cached():
+    """The surface recovers the quoted smile, and unchanged quotes are served from the cache"""
+    as_of = datetime(2024, 1, 2, 20, 0)
+    chain, volatility = _smile_chain(as_of, 100.0, 0.04)
+    built = build_surface(chain, 100.0, as_of, rate=0.04, moneyness=np.linspace(-0.2, 0.2, 9))
+    surface = built["surface"]
+
+    solved = np.isfinite(built["implied_volatility"])
+    np.testing.assert_allclose(built["implied_volatility"][solved], volatility[solved], rtol=1e-7)
+    assert surface.volatilities.shape == (4, 9)
+    # Grid points fall between quoted strikes; linear interpolation of a quadratic smile is close
+    time = chain.years_to_expiry(as_of)
+    expected = 0.2 + 0.3 * surface.moneyness ** 2 - 0.05 * surface.moneyness + 0.02 * np.sqrt(np.unique(time))[:, None]
+    np.testing.assert_allclose(surface.volatilities, expected, atol=2e-3)
+    # Between expirations, total variance is interpolated linearly
+    middle = surface.volatility(0.0, surface.times[1:3].mean())
+    assert surface.volatilities[1, 4] < middle < surface.volatilities[2, 4]
+
+    cache = VolatilityCache()
+    first, _ = cache.surface("SPY", chain, 100.0, as_of, rate=0.04)
+    again, _ = cache.surface("SPY", chain, 100.0, as_of, rate=0.04)
+    assert again is first and cache.stats()["hits"] == 1
+
+    moved, _ = _smile_chain(as_of, 100.0, 0.04, jitter=0.01)
+    warm, warm_implied = cache.surface("SPY", moved, 100.0, as_of, rate=0.04)
+    cold = build_surface(moved, 100.0, as_of, rate=0.04)
+    assert cache.stats()["updates"] == 1
+    np.testing.assert_allclose(warm_implied, cold["implied_volatility"], rtol=1e-8)
+    np.testing.assert_allclose(warm.volatilities, cold["surface"].volatilities, rtol=1e-8)
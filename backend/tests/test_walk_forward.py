@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_service import BacktestService
+from app.services.walk_forward import purged_kfold_splits, strategy_returns, walk_forward_splits
+
+
+def _bars(n=1200, seed=0):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return pd.DataFrame({"close": close}, index=pd.date_range("2020-01-01", periods=n, freq="D", name="timestamp"))
+
+
+def test_splits_tile_the_test_windows():
+    """Walk-forward test windows follow their train windows; k-fold train sets skip the purged bars"""
+    rolling = walk_forward_splits(100, train_size=40, test_size=25)
+    assert [split["test"] for split in rolling] == [(40, 65), (65, 90), (90, 100)]
+    assert [split["train"] for split in rolling] == [[(0, 40)], [(25, 65)], [(50, 90)]]
+    assert walk_forward_splits(100, 40, 25, anchored=True)[2]["train"] == [(0, 90)]
+
+    folds = purged_kfold_splits(100, n_splits=4, purge=5)
+    assert [split["test"] for split in folds] == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    assert folds[0]["train"] == [(30, 100)]
+    assert folds[1]["train"] == [(0, 20), (55, 100)]
+    with pytest.raises(ValueError):
+        walk_forward_splits(10, train_size=10, test_size=5)
+
+
+def test_folds_pick_the_best_train_parameters_and_stitch_test_returns():
+    """Each fold's parameters win on its train window, and the equity compounds the test returns"""
+    service = BacktestService()
+    df = _bars()
+    grid = {"short_window": [5, 10, 20], "long_window": [30, 60]}
+
+    results = service.run_walk_forward(df, "simple_moving_average", grid, train_size=400, test_size=200, max_workers=1)
+    parallel = service.run_walk_forward(df, "simple_moving_average", grid, train_size=400, test_size=200, max_workers=2)
+
+    assert results["combinations"] == 6 and len(results["folds"]) == 4
+    returns = {
+        (short, long): strategy_returns(service, df, "simple_moving_average", {"short_window": short, "long_window": long})
+        for short in grid["short_window"] for long in grid["long_window"]
+    }
+    stitched = []
+    for fold, split in zip(results["folds"], walk_forward_splits(len(df), 400, 200)):
+        (train_start, train_stop), = split["train"]
+        sharpe = {
+            key: service.safe_float(service.calculate_sharpe_ratio(pd.Series(series[train_start:train_stop])))
+            for key, series in returns.items()
+        }
+        chosen = (fold["parameters"]["short_window"], fold["parameters"]["long_window"])
+        assert sharpe[chosen] == pytest.approx(max(sharpe.values()))
+        stitched.append(returns[chosen][slice(*split["test"])])
+    np.testing.assert_allclose(results["equity_curve"], np.cumprod(1 + np.concatenate(stitched)))
+    np.testing.assert_array_equal(parallel["equity_curve"], results["equity_curve"])